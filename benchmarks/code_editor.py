@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Code editor benchmark for C0lorNote
+
+Opens one large generated Python file in the code editor used before
+(a QTextEdit) and in the current CodeEditor (a QPlainTextEdit with a line
+number gutter), both shown on the offscreen Qt platform with the same font,
+and compares:
+
+    open      set the text and show the first screen
+    scroll    jump to random positions and repaint
+    typing    key presses in the middle of the file, repainted each time
+
+The syntax highlighter costs the same in both editors and dominates the open
+time of large files, so it is left out unless --highlight is given.
+
+Usage:
+    python benchmarks/code_editor.py [--size MB] [--scrolls N] [--keys N] [--highlight] [--output FILE]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import datetime
+import platform
+import statistics
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Keep the benchmark away from the user's display and notes
+from generate_notebook import WORDS, isolate_environment
+isolate_environment()
+
+
+def make_code(rng, size):
+    """Build Python source of about size characters"""
+    lines = []
+    length = 0
+    number = 0
+    while length < size:
+        name = f"{rng.choice(WORDS)}_{number}"
+        words = " ".join(rng.choices(WORDS, k=rng.randint(3, 10)))
+        function = [
+            f"def {name}(items, limit={rng.randint(1, 99)}):",
+            f'    """{words.capitalize()}"""',
+            "    total = 0",
+            "    for item in items:",
+            f"        if item > limit:  # {words}",
+            f"            total += item * {rng.randint(2, 9)}",
+            f"    return {{'name': '{name}', 'total': total}}",
+            "",
+        ]
+        lines.extend(function)
+        length += sum(len(line) + 1 for line in function)
+        number += 1
+    return "\n".join(lines)
+
+
+def summarize(values):
+    """Return median, mean and max of a list of seconds in milliseconds"""
+    return {
+        "median_ms": statistics.median(values) * 1000,
+        "mean_ms": statistics.mean(values) * 1000,
+        "max_ms": max(values) * 1000,
+        "samples": len(values),
+    }
+
+
+def measure(app, editor, make_document, code, args):
+    """Open code in editor, then time scrolling and typing"""
+    from PyQt6.QtCore import Qt, QEvent
+    from PyQt6.QtGui import QKeyEvent, QTextCursor
+
+    editor.resize(900, 700)
+    editor.show()
+    app.processEvents()
+
+    # Open: build the document, show it and paint the first screen
+    start = time.perf_counter()
+    document = make_document()
+    document.setPlainText(code)
+    editor.setDocument(document)
+    app.processEvents()
+    editor.viewport().repaint()
+    open_seconds = time.perf_counter() - start
+
+    # Scroll: jump to random positions, including both ends
+    rng = random.Random(args.seed)
+    scroll_bar = editor.verticalScrollBar()
+    positions = [scroll_bar.maximum(), 0]
+    positions += [rng.randint(0, scroll_bar.maximum()) for _ in range(args.scrolls - 2)]
+    scroll_samples = []
+    for position in positions:
+        start = time.perf_counter()
+        scroll_bar.setValue(position)
+        app.processEvents()
+        editor.viewport().repaint()
+        scroll_samples.append(time.perf_counter() - start)
+
+    # Typing: key presses in the middle of the file
+    cursor = editor.textCursor()
+    cursor.setPosition(len(code) // 2)
+    cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+    editor.setTextCursor(cursor)
+    editor.ensureCursorVisible()
+    app.processEvents()
+    key_samples = []
+    for _ in range(args.keys):
+        start = time.perf_counter()
+        app.sendEvent(editor, QKeyEvent(QEvent.Type.KeyPress, Qt.Key.Key_A, Qt.KeyboardModifier.NoModifier, "a"))
+        app.processEvents()
+        editor.viewport().repaint()
+        key_samples.append(time.perf_counter() - start)
+
+    editor.hide()
+    return {
+        "open_ms": open_seconds * 1000,
+        "scroll": summarize(scroll_samples),
+        "typing": summarize(key_samples),
+        "lines": document.blockCount(),
+    }
+
+
+def main():
+    """Run the benchmark and print the results as JSON"""
+    parser = argparse.ArgumentParser(description="Compare C0lorNote's code editor with a QTextEdit on a large file")
+    parser.add_argument("--size", type=float, default=10, help="file size in MB")
+    parser.add_argument("--scrolls", type=int, default=50, help="scroll jumps to time")
+    parser.add_argument("--keys", type=int, default=50, help="key presses to time")
+    parser.add_argument("--highlight", action="store_true", help="include the syntax highlighter")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    from PyQt6.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+    from PyQt6.QtGui import QTextDocument
+    from PyQt6.QtWidgets import QApplication, QTextEdit, QPlainTextDocumentLayout
+    from modern_colornote import Theme, ThemeType, SyntaxHighlighter, CodeEditor
+
+    app = QApplication(sys.argv[:1])
+    theme = Theme(ThemeType.MATRIX)
+    font = theme.font('code_font_family', 12)
+    code = make_code(random.Random(args.seed), int(args.size * 1024 * 1024))
+
+    def document_factory(plain_layout):
+        def make_document():
+            document = QTextDocument()
+            if plain_layout:
+                document.setDocumentLayout(QPlainTextDocumentLayout(document))
+            document.setDefaultFont(font)
+            if args.highlight:
+                document.highlighter = SyntaxHighlighter(document, theme)
+            return document
+        return make_document
+
+    editors = {}
+    text_edit = QTextEdit()
+    text_edit.setFont(font)
+    editors["qtextedit"] = measure(app, text_edit, document_factory(False), code, args)
+    code_editor = CodeEditor()
+    code_editor.setFont(font)
+    editors["code_editor"] = measure(app, code_editor, document_factory(True), code, args)
+
+    results = {
+        "benchmark": "code_editor",
+        "timestamp": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "size_bytes": len(code.encode("utf-8")),
+        "highlight": args.highlight,
+        "editors": editors,
+        "speedup": {
+            "open": editors["qtextedit"]["open_ms"] / editors["code_editor"]["open_ms"],
+            "scroll": editors["qtextedit"]["scroll"]["median_ms"] / editors["code_editor"]["scroll"]["median_ms"],
+            "typing": editors["qtextedit"]["typing"]["median_ms"] / editors["code_editor"]["typing"]["median_ms"],
+        },
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
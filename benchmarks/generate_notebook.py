@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Synthetic notebook generator for C0lorNote
+
+Writes notes.json-compatible notebooks so production-sized notebooks can be
+reproduced locally. Notes are streamed to the file one at a time, so even
+million-note notebooks are written without holding them all in memory.
+
+Body sizes follow a log-normal distribution by default (most notes are short,
+a few are very long); --body-dist uniform or fixed can be used instead.
+
+Usage:
+    python benchmarks/generate_notebook.py --count 100000 --output notes.json
+        [--code-ratio 0.25] [--body-dist lognormal] [--body-median 400]
+        [--body-sigma 1.0] [--body-max 200000] [--categories 20] [--tags 200]
+        [--max-tags-per-note 4] [--recent-ratio 0.1] [--seed 0]
+"""
+
+import os
+import sys
+import json
+import math
+import uuid
+import atexit
+import random
+import shutil
+import argparse
+import datetime
+import tempfile
+from dataclasses import dataclass
+
+WORDS = (
+    "note idea meeting project plan draft review summary todo release bug fix "
+    "design research budget client schedule report update feature test deploy "
+    "python data query cache layout theme editor search filter export import"
+).split()
+
+CODE_LINES = (
+    "import os",
+    "def process(items):",
+    "    result = []",
+    "    for item in items:",
+    "        if item is None:",
+    "            continue",
+    "        result.append(item * 2)",
+    "    return result",
+    "class Handler:",
+    "    def __init__(self, name):",
+    "        self.name = name  # keep the name around",
+    "print(\"value:\", process([1, 2, 3]))",
+)
+
+
+@dataclass
+class NotebookOptions:
+    """Shape of a generated notebook"""
+    count: int = 1000
+    code_ratio: float = 0.25
+    body_dist: str = "lognormal"  # lognormal, uniform or fixed
+    body_median: int = 400  # characters
+    body_sigma: float = 1.0  # spread of the log-normal distribution
+    body_max: int = 200000
+    categories: int = 20
+    tags: int = 200
+    max_tags_per_note: int = 4
+    recent_ratio: float = 0.1  # share of notes modified within the last week
+    seed: int = 0
+
+
+def body_size(rng, options):
+    """Draw a body size in characters"""
+    if options.body_dist == "fixed":
+        size = options.body_median
+    elif options.body_dist == "uniform":
+        size = rng.randint(1, 2 * options.body_median)
+    else:
+        size = int(rng.lognormvariate(math.log(max(options.body_median, 1)), options.body_sigma))
+    return max(1, min(size, options.body_max))
+
+
+def make_text(rng, size):
+    """Build rich text HTML with about size characters of text"""
+    paragraphs = []
+    length = 0
+    while length < size:
+        words = rng.choices(WORDS, k=rng.randint(8, 40))
+        if rng.random() < 0.2:
+            words[0] = f"<b>{words[0]}</b>"
+        sentence = " ".join(words).capitalize() + "."
+        paragraphs.append(f"<p>{sentence}</p>")
+        length += len(sentence)
+    return "".join(paragraphs)
+
+
+def make_code(rng, size):
+    """Build Python source with about size characters"""
+    lines = []
+    length = 0
+    while length < size:
+        line = rng.choice(CODE_LINES)
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def generate_notes(options):
+    """Yield note dictionaries in the notes.json format"""
+    rng = random.Random(options.seed)
+    # Ids come from their own generator so the notes themselves do not change
+    id_rng = random.Random(f"{options.seed}-ids")
+    now = datetime.datetime.now()
+    categories = category_names(options)
+    tags = tag_names(options)
+
+    for i in range(options.count):
+        is_code = rng.random() < options.code_ratio
+        size = body_size(rng, options)
+        content = make_code(rng, size) if is_code else make_text(rng, size)
+
+        # Recent notes land within the last week, the rest up to two years back
+        if rng.random() < options.recent_ratio:
+            age = datetime.timedelta(seconds=rng.randint(0, 6 * 24 * 3600))
+        else:
+            age = datetime.timedelta(days=rng.randint(8, 730), seconds=rng.randint(0, 86399))
+        modified = now - age
+        created = modified - datetime.timedelta(days=rng.randint(0, 30))
+
+        tag_count = rng.randint(0, min(options.max_tags_per_note, len(tags)))
+        yield {
+            "id": uuid.UUID(int=id_rng.getrandbits(128), version=4).hex,
+            "title": f"{' '.join(rng.choices(WORDS, k=3)).title()} {i}",
+            "content": content,
+            "is_code": is_code,
+            "tags": rng.sample(tags, tag_count),
+            "category": rng.choice(categories) if categories and rng.random() < 0.9 else None,
+            "created_date": created.isoformat(),
+            "modified_date": modified.isoformat(),
+        }
+
+
+def isolate_environment():
+    """Keep a benchmark away from the user's display and notes; return its temporary home
+
+    The offscreen Qt platform is used unless another is requested, and HOME
+    (APPDATA on Windows) points at a fresh folder that is deleted on exit,
+    together with any notebooks generated in it.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    home = tempfile.mkdtemp(prefix="c0lornote_bench_")
+    atexit.register(shutil.rmtree, home, True)
+    os.environ["HOME"] = home
+    os.environ["APPDATA"] = home
+    return home
+
+
+def category_names(options):
+    """Return the category names used by a notebook"""
+    return [f"Category {i}" for i in range(options.categories)]
+
+
+def tag_names(options):
+    """Return the tag names used by a notebook"""
+    return [f"tag{i}" for i in range(options.tags)]
+
+
+def write_notebook(path, options):
+    """Stream a generated notebook to path and return the number of bytes written"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"notes": [')
+        for i, note in enumerate(generate_notes(options)):
+            if i:
+                f.write(",\n")
+            f.write(json.dumps(note))
+        f.write("],\n")
+        f.write(f'"categories": {json.dumps(category_names(options))},\n')
+        f.write(f'"tags": {json.dumps(tag_names(options))}}}\n')
+        return f.tell()
+
+
+def parse_arguments(argv):
+    """Parse command line options into NotebookOptions and an output path"""
+    defaults = NotebookOptions()
+    parser = argparse.ArgumentParser(description="Generate a synthetic C0lorNote notebook")
+    parser.add_argument("--count", type=int, default=defaults.count, help="number of notes")
+    parser.add_argument("--output", default="notes.json", help="file to write")
+    parser.add_argument("--code-ratio", type=float, default=defaults.code_ratio,
+                        help="share of code notes (0-1)")
+    parser.add_argument("--body-dist", choices=("lognormal", "uniform", "fixed"),
+                        default=defaults.body_dist, help="distribution of body sizes")
+    parser.add_argument("--body-median", type=int, default=defaults.body_median,
+                        help="median body size in characters")
+    parser.add_argument("--body-sigma", type=float, default=defaults.body_sigma,
+                        help="spread of the log-normal body size distribution")
+    parser.add_argument("--body-max", type=int, default=defaults.body_max,
+                        help="largest body size in characters")
+    parser.add_argument("--categories", type=int, default=defaults.categories,
+                        help="number of distinct categories")
+    parser.add_argument("--tags", type=int, default=defaults.tags, help="number of distinct tags")
+    parser.add_argument("--max-tags-per-note", type=int, default=defaults.max_tags_per_note,
+                        help="most tags on a single note")
+    parser.add_argument("--recent-ratio", type=float, default=defaults.recent_ratio,
+                        help="share of notes modified within the last week")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="random seed")
+    args = parser.parse_args(argv)
+    options = NotebookOptions(
+        count=args.count,
+        code_ratio=args.code_ratio,
+        body_dist=args.body_dist,
+        body_median=args.body_median,
+        body_sigma=args.body_sigma,
+        body_max=args.body_max,
+        categories=args.categories,
+        tags=args.tags,
+        max_tags_per_note=args.max_tags_per_note,
+        recent_ratio=args.recent_ratio,
+        seed=args.seed,
+    )
+    return options, args.output
+
+
+def main():
+    """Generate a notebook from the command line"""
+    options, output = parse_arguments(sys.argv[1:])
+    size = write_notebook(output, options)
+    print(f"Wrote {options.count} notes ({size / 1024 / 1024:.1f} MiB) to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rich text storage benchmark for C0lorNote
+
+Builds rich text notes with the formatting the editor toolbar applies (bold,
+italic, underline and color), stores each one both as QTextEdit.toHtml()
+output and in the compact format from rich_text.py, and compares:
+
+    size          bytes per note in notes.json for each format
+    compact       rich_text.compact_html per note
+    get_content   NoteEditor.get_content (toHtml, plus compaction)
+    set_content   NoteEditor.set_content for each format
+    to_text       html_convert.html_to_text for each format, uncached
+    lossless      notes whose compact form does not load back to the same document
+
+Usage:
+    python benchmarks/rich_text_storage.py [--notes N] [--size CHARS] [--repeat N] [--output FILE]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import datetime
+import platform
+import statistics
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Keep the benchmark away from the user's display and notes
+from generate_notebook import WORDS, isolate_environment
+isolate_environment()
+
+COLORS = ["#ff0000", "#00aa00", "#0000ff", "#ff8800", "#8800ff"]
+
+
+def make_formatted(rng, size):
+    """Build HTML of about size characters using the toolbar's formatting"""
+    lines = []
+    length = 0
+    while length < size:
+        words = []
+        for word in rng.choices(WORDS, k=rng.randint(4, 20)):
+            roll = rng.random()
+            if roll < 0.08:
+                word = f"<b>{word}</b>"
+            elif roll < 0.14:
+                word = f"<i>{word}</i>"
+            elif roll < 0.18:
+                word = f"<u>{word}</u>"
+            elif roll < 0.22:
+                word = f'<span style="color:{rng.choice(COLORS)}">{word}</span>'
+            words.append(word)
+        lines.append("<p>" + " ".join(words) + "</p>")
+        length += sum(len(word) + 1 for word in words)
+        if rng.random() < 0.1:
+            lines.append("<p><br></p>")
+    return "".join(lines)
+
+
+def summarize(values):
+    """Return median, mean, min and max of a list of seconds in microseconds"""
+    return {
+        "median_us": statistics.median(values) * 1e6,
+        "mean_us": statistics.mean(values) * 1e6,
+        "min_us": min(values) * 1e6,
+        "max_us": max(values) * 1e6,
+        "samples": len(values),
+    }
+
+
+def time_each(function, items, repeat):
+    """Time function on every item, repeat times, and summarize per call"""
+    samples = []
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter()
+            function(item)
+            samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def main():
+    """Run the benchmark and print the results as JSON"""
+    parser = argparse.ArgumentParser(description="Benchmark C0lorNote's rich text storage formats")
+    parser.add_argument("--notes", type=int, default=200, help="number of notes")
+    parser.add_argument("--size", type=int, default=600, help="approximate characters of text per note")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the notes per measurement")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    from PyQt6.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+    from PyQt6.QtWidgets import QApplication, QTextEdit
+    import html_convert
+    from rich_text import STYLE_SHEET, compact_html
+    from modern_colornote import MainWindow
+
+    app = QApplication(sys.argv[:1])
+    window = MainWindow()
+    editor = window.note_editor
+    rng = random.Random(args.seed)
+
+    # Notes as the editor used to store them
+    source = QTextEdit()
+    legacy = []
+    for _ in range(args.notes):
+        source.setHtml(make_formatted(rng, args.size))
+        legacy.append(source.toHtml())
+    compact = [compact_html(content) for content in legacy]
+
+    # A note is stored losslessly if it loads back to the same document
+    reader = QTextEdit()
+    reader.document().setDefaultStyleSheet(STYLE_SHEET)
+    mismatches = 0
+    for original, small in zip(legacy, compact):
+        reader.setHtml(original)
+        expected = reader.toHtml()
+        reader.setHtml(small)
+        if reader.toHtml() != expected:
+            mismatches += 1
+
+    def stored_size(contents):
+        return [len(json.dumps(content).encode("utf-8")) for content in contents]
+
+    legacy_sizes = stored_size(legacy)
+    compact_sizes = stored_size(compact)
+
+    # get_content on each note, loaded beforehand
+    get_samples = []
+    for _ in range(args.repeat):
+        for content in legacy:
+            editor.set_content(content)
+            start = time.perf_counter()
+            editor.get_content()
+            get_samples.append(time.perf_counter() - start)
+
+    def uncached_text(content):
+        html_convert.clear_cache()
+        return html_convert.html_to_text(content)
+
+    results = {
+        "benchmark": "rich_text_storage",
+        "timestamp": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "notes": args.notes,
+        "size": args.size,
+        "repeat": args.repeat,
+        "size_bytes": {
+            "qt_html": {"total": sum(legacy_sizes), "mean": statistics.mean(legacy_sizes)},
+            "compact": {"total": sum(compact_sizes), "mean": statistics.mean(compact_sizes)},
+            "ratio": sum(compact_sizes) / sum(legacy_sizes),
+        },
+        "compact": time_each(compact_html, legacy, args.repeat),
+        "get_content": summarize(get_samples),
+        "set_content": {
+            "qt_html": time_each(editor.set_content, legacy, args.repeat),
+            "compact": time_each(editor.set_content, compact, args.repeat),
+        },
+        "to_text": {
+            "qt_html": time_each(uncached_text, legacy, args.repeat),
+            "compact": time_each(uncached_text, compact, args.repeat),
+        },
+        "lossless": {"checked": len(legacy), "mismatches": mismatches},
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
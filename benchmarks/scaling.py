@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Scaling benchmark for C0lorNote's hot paths
+
+Generates notebooks of increasing size (see generate_notebook.py) and times
+every hot path of MainWindow on the offscreen Qt platform:
+
+    load_notes, save_notes, filter_notes (every filter type), search_notes,
+    update_list, scroll_list and handle_note_selection
+
+For each operation the log-log slope of time against notebook size is fitted
+by least squares, giving an empirical complexity exponent (about 0 for
+constant time, 1 for linear, 2 for quadratic).
+
+Usage:
+    python benchmarks/scaling.py [--sizes 1000,10000,100000,1000000]
+        [--repeat N] [--budget SECONDS] [--json] [--output FILE]
+
+Sizes whose predicted run time exceeds --budget are skipped and reported as
+such, so the default size list can be used on slower machines.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import datetime
+import platform
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's display and notes
+from generate_notebook import NotebookOptions, isolate_environment, write_notebook
+isolate_environment()
+
+from PyQt6.QtWidgets import QApplication
+
+from modern_colornote import MainWindow, detect_platform
+
+
+def time_call(app, func, repeat):
+    """Call func repeat times, processing events after each, and return the samples"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        app.processEvents()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def operations(window):
+    """Return the (name, callable) pairs to time on a loaded window"""
+    note_list = window.note_list
+    notes = window.repository.notes
+    category = "Category 0"
+    tag = "tag0"
+    first = notes[0].id
+    middle = notes[len(notes) // 2].id
+
+    def show_all():
+        note_list.filter = ("all", "")
+        note_list.update_list()
+
+    def scroll_list():
+        # Page down through the list, wrapping at the end, and paint the rows on screen
+        view = note_list.list_view
+        scroll_bar = view.verticalScrollBar()
+        scroll_bar.setValue((scroll_bar.value() + view.viewport().height()) % (scroll_bar.maximum() + 1))
+        view.viewport().repaint()
+
+    def select_notes():
+        # Alternate between two notes so every call switches the editor
+        window.handle_note_selection(first)
+        window.handle_note_selection(middle)
+
+    return [
+        ("save_notes", window.save_notes),
+        ("filter_notes[all]", lambda: note_list.filter_notes("all", "")),
+        ("filter_notes[recent]", lambda: note_list.filter_notes("recent", "")),
+        ("filter_notes[code]", lambda: note_list.filter_notes("code", "")),
+        ("filter_notes[category]", lambda: note_list.filter_notes("category", category)),
+        ("filter_notes[tag]", lambda: note_list.filter_notes("tag", tag)),
+        ("filter_notes[search]", lambda: note_list.filter_notes("search", "release")),
+        ("search_notes[hit]", lambda: note_list.search_notes("draft")),
+        ("search_notes[miss]", lambda: note_list.search_notes("zzzz-no-match")),
+        ("search_notes[clear]", lambda: note_list.search_notes("")),
+        ("update_list", show_all),
+        ("scroll_list", scroll_list),
+        ("handle_note_selection", select_notes),
+    ]
+
+
+def fit_slope(points):
+    """Least-squares slope of log(time) against log(size)"""
+    points = [(size, seconds) for size, seconds in points if seconds > 0]
+    if len(points) < 2:
+        return None
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(seconds) for _, seconds in points]
+    mean_x = statistics.mean(xs)
+    mean_y = statistics.mean(ys)
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    if denominator == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator
+
+
+def describe_slope(slope):
+    """Name the complexity class closest to an empirical exponent"""
+    if slope is None:
+        return "n/a"
+    if slope < 0.3:
+        return "O(1)"
+    if slope < 0.8:
+        return "sublinear"
+    if slope < 1.3:
+        return "O(n)"
+    if slope < 1.8:
+        return "superlinear"
+    return "O(n^2) or worse"
+
+
+def main():
+    """Run the scaling suite and print the results"""
+    parser = argparse.ArgumentParser(description="Time C0lorNote hot paths against notebook size")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="comma-separated notebook sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="samples per operation and size")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="skip sizes predicted to take longer than this many seconds")
+    parser.add_argument("--body-median", type=int, default=NotebookOptions.body_median,
+                        help="median body size of generated notes in characters")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the notebooks")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(",") if size)
+
+    app = QApplication(sys.argv[:1])
+    config_dir = detect_platform()["config_dir"]
+    notes_file = os.path.join(config_dir, "notes.json")
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+
+    timings = {}  # operation -> {size: median seconds}
+    per_size = {}
+    skipped = []
+    previous = None  # (size, seconds) of the last completed size
+
+    for size in sizes:
+        if args.budget and previous:
+            predicted = previous[1] * size / previous[0]
+            if predicted > args.budget:
+                skipped.append({"size": size, "predicted_s": predicted})
+                print(f"Skipping {size} notes (predicted {predicted:.0f}s > budget)", file=sys.stderr)
+                continue
+
+        size_start = time.perf_counter()
+        options = NotebookOptions(count=size, body_median=args.body_median, seed=args.seed)
+        file_bytes = write_notebook(notes_file, options)
+        print(f"{size} notes ({file_bytes / 1024 / 1024:.1f} MiB)...", file=sys.stderr)
+
+        window.current_note = None
+        results = {"load_notes": time_call(app, window.load_notes, args.repeat)}
+        for name, func in operations(window):
+            results[name] = time_call(app, func, args.repeat)
+        window.current_note = None
+
+        per_size[str(size)] = {"file_bytes": file_bytes, "operations": {}}
+        for name, samples in results.items():
+            median = statistics.median(samples)
+            timings.setdefault(name, {})[size] = median
+            per_size[str(size)]["operations"][name] = {
+                "median_ms": median * 1000,
+                "min_ms": min(samples) * 1000,
+                "max_ms": max(samples) * 1000,
+            }
+        previous = (size, time.perf_counter() - size_start)
+
+    complexity = {}
+    for name, points in timings.items():
+        slope = fit_slope(sorted(points.items()))
+        complexity[name] = {
+            "slope": slope,
+            "class": describe_slope(slope),
+            "ms_by_size": {str(size): seconds * 1000 for size, seconds in sorted(points.items())},
+        }
+
+    report = {
+        "benchmark": "scaling",
+        "timestamp": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "sizes": per_size,
+        "skipped": skipped,
+        "complexity": complexity,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    measured = [size for size in sizes if str(size) in per_size]
+    header = f"{'Operation':<26}" + "".join(f"{size:>12}" for size in measured)
+    print(header + f"{'slope':>8}  class")
+    for name, info in complexity.items():
+        row = f"{name:<26}"
+        for size in measured:
+            row += f"{info['ms_by_size'].get(str(size), float('nan')):>10.1f}ms"
+        slope = info["slope"]
+        row += f"{slope:>8.2f}" if slope is not None else f"{'-':>8}"
+        print(f"{row}  {info['class']}")
+
+
+if __name__ == "__main__":
+    main()
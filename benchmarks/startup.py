@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Startup benchmark suite for C0lorNote
+
+Measures cold-start costs on the offscreen Qt platform (unless another
+platform is requested through QT_QPA_PLATFORM) and prints the results as JSON
+so they can be compared from run to run:
+
+    import        importing PyQt6 and modern_colornote in a fresh interpreter
+    construct     MainWindow() construction, eager and deferred
+    first_paint   show() until the first Paint event, and until notes are loaded
+    load_notes    MainWindow.load_notes for notebooks of several sizes
+    theme_switch  MainWindow.change_theme for every theme
+
+Usage:
+    python benchmarks/startup.py [--repeat N] [--sizes 100,1000,10000] [--output FILE]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import platform
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import generate_notebook
+from generate_notebook import NotebookOptions, isolate_environment
+
+# Keep the benchmark away from the user's display and notes
+isolate_environment()
+
+# Runs in a fresh interpreter so nothing is already imported or cached
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import PyQt6.QtCore, PyQt6.QtGui, PyQt6.QtWidgets
+qt_done = time.perf_counter()
+import modern_colornote
+done = time.perf_counter()
+print(json.dumps({"qt": qt_done - start, "module": done - qt_done, "total": done - start}))
+"""
+
+
+def summarize(values):
+    """Return median, mean, min and max of a list of seconds in milliseconds"""
+    return {
+        "median_ms": statistics.median(values) * 1000,
+        "mean_ms": statistics.mean(values) * 1000,
+        "min_ms": min(values) * 1000,
+        "max_ms": max(values) * 1000,
+        "samples": len(values),
+    }
+
+
+def measure_import(repeat):
+    """Time the imports in a fresh interpreter repeat times"""
+    samples = {"qt": [], "module": [], "total": []}
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        for key, value in json.loads(output.splitlines()[-1]).items():
+            samples[key].append(value)
+    return {key: summarize(values) for key, values in samples.items()}
+
+
+def write_notebook(config_dir, count):
+    """Write a generated notebook where MainWindow.load_notes will find it"""
+    generate_notebook.write_notebook(
+        os.path.join(config_dir, "notes.json"), NotebookOptions(count=count)
+    )
+
+
+def wait_until(app, condition, timeout=10.0):
+    """Process events until condition() is true and return the elapsed seconds"""
+    start = time.perf_counter()
+    while not condition():
+        if time.perf_counter() - start > timeout:
+            raise TimeoutError("condition not reached")
+        app.processEvents()
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the suite and print the results as JSON"""
+    parser = argparse.ArgumentParser(description="Benchmark C0lorNote startup")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per measurement")
+    parser.add_argument("--sizes", default="100,1000,10000",
+                        help="comma-separated notebook sizes for load_notes")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+
+    results = {
+        "benchmark": "startup",
+        "timestamp": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "qpa_platform": os.environ["QT_QPA_PLATFORM"],
+        "repeat": args.repeat,
+        "import": measure_import(args.repeat),
+    }
+
+    from PyQt6.QtCore import QObject, QEvent, PYQT_VERSION_STR, QT_VERSION_STR
+    from PyQt6.QtWidgets import QApplication
+    import modern_colornote
+    from modern_colornote import MainWindow, ThemeType, detect_platform
+
+    results["qt"] = QT_VERSION_STR
+    results["pyqt"] = PYQT_VERSION_STR
+    app = QApplication(sys.argv[:1])
+    config_dir = detect_platform()["config_dir"]
+    write_notebook(config_dir, 100)
+
+    # MainWindow() construction, both the full build and the deferred shell
+    construct = {"eager": [], "deferred": []}
+    for _ in range(args.repeat):
+        for mode in construct:
+            start = time.perf_counter()
+            window = MainWindow(defer_startup=(mode == "deferred"))
+            construct[mode].append(time.perf_counter() - start)
+            window.deleteLater()
+            app.processEvents()
+    results["construct"] = {mode: summarize(values) for mode, values in construct.items()}
+
+    # From show() to the first painted frame, and on to the loaded notebook
+    class PaintWatcher(QObject):
+        painted = False
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint:
+                self.painted = True
+            return False
+
+    first_paint = {"first_paint": [], "ready": []}
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        window = MainWindow(defer_startup=True)
+        watcher = PaintWatcher()
+        window.installEventFilter(watcher)
+        window.show()
+        wait_until(app, lambda: watcher.painted)
+        first_paint["first_paint"].append(time.perf_counter() - start)
+        wait_until(app, lambda: window.note_editor.code_editor is not None and len(window.repository))
+        first_paint["ready"].append(time.perf_counter() - start)
+        window.removeEventFilter(watcher)
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+    results["first_paint"] = {phase: summarize(values) for phase, values in first_paint.items()}
+
+    # load_notes for several notebook sizes
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+    results["load_notes"] = {}
+    for size in sizes:
+        write_notebook(config_dir, size)
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            window.load_notes()
+            app.processEvents()
+            samples.append(time.perf_counter() - start)
+        results["load_notes"][str(size)] = summarize(samples)
+
+    # Theme switches, with a small notebook loaded
+    write_notebook(config_dir, 100)
+    window.load_notes()
+    themes = list(ThemeType)
+    for theme in themes:
+        window.change_theme(theme)
+    app.processEvents()
+    samples = []
+    for _ in range(args.repeat):
+        for theme in themes:
+            start = time.perf_counter()
+            window.change_theme(theme)
+            app.processEvents()
+            samples.append(time.perf_counter() - start)
+    results["theme_switch"] = summarize(samples)
+    results["module"] = modern_colornote.__file__
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
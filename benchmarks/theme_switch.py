@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Theme switch latency harness for C0lorNote
+
+Builds a MainWindow on the offscreen Qt platform (unless another platform is
+requested through QT_QPA_PLATFORM) and times MainWindow.change_theme for every
+theme, including the event processing that repolishes the widget tree.
+
+Usage:
+    python benchmarks/theme_switch.py [--rounds N] [--json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the user's display and notes
+from generate_notebook import isolate_environment
+isolate_environment()
+
+from PyQt6.QtWidgets import QApplication
+
+import modern_colornote
+from modern_colornote import MainWindow, ThemeType
+
+
+def time_switch(app, window, theme_type):
+    """Switch to theme_type and return the elapsed seconds"""
+    start = time.perf_counter()
+    window.change_theme(theme_type)
+    app.processEvents()
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the harness and print the results"""
+    parser = argparse.ArgumentParser(description="Time C0lorNote theme switches")
+    parser.add_argument("--rounds", type=int, default=10, help="switches per theme")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+
+    themes = list(ThemeType)
+    first = {}
+    samples = {theme.name: [] for theme in themes}
+
+    # The first switch to each theme includes building anything cached per theme
+    for theme in themes:
+        first[theme.name] = time_switch(app, window, theme)
+
+    for _ in range(args.rounds):
+        for theme in themes:
+            samples[theme.name].append(time_switch(app, window, theme))
+
+    results = {
+        "benchmark": "theme_switch",
+        "module": modern_colornote.__file__,
+        "rounds": args.rounds,
+        "themes": {
+            name: {
+                "first_ms": first[name] * 1000,
+                "median_ms": statistics.median(values) * 1000,
+                "mean_ms": statistics.mean(values) * 1000,
+                "max_ms": max(values) * 1000,
+            }
+            for name, values in samples.items()
+        }
+    }
+    all_samples = [value for values in samples.values() for value in values]
+    results["overall_median_ms"] = statistics.median(all_samples) * 1000
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'Theme':<12} {'first':>9} {'median':>9} {'mean':>9} {'max':>9}")
+        for name, stats in results["themes"].items():
+            print(f"{name:<12} {stats['first_ms']:>7.2f}ms {stats['median_ms']:>7.2f}ms "
+                  f"{stats['mean_ms']:>7.2f}ms {stats['max_ms']:>7.2f}ms")
+        print(f"Overall median: {results['overall_median_ms']:.2f}ms per switch")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+C0lorNote Code Runner
+
+Helpers for executing code notes in a child Python interpreter.
+This module does not depend on PyQt6, so it can be used by the GUI as well as
+by headless tools.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import datetime
+from collections import OrderedDict
+
+# subprocess, tempfile and concurrent.futures are imported inside the functions
+# that use them so that importing this module stays cheap at GUI startup
+
+
+# Bootstrap executed by the child interpreter. It applies the resource limits
+# (where the platform supports them) and then runs the snippet as __main__.
+# When a profile output path is given the snippet runs under cProfile (and
+# optionally tracemalloc) and the statistics are written there as JSON.
+_BOOTSTRAP = """
+import os, sys, runpy
+cpu_limit, memory_limit, script = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3]
+profile_path, trace_memory, top_n = sys.argv[4], sys.argv[5] == "1", int(sys.argv[6])
+try:
+    import resource
+except ImportError:
+    resource = None
+if resource is not None:
+    for limit, value in ((resource.RLIMIT_CPU, cpu_limit), (resource.RLIMIT_AS, memory_limit)):
+        if value > 0:
+            try:
+                resource.setrlimit(limit, (value, value))
+            except (ValueError, OSError):
+                pass
+# Import what the profiler needs before the snippet's folder goes on sys.path
+if profile_path:
+    import json, cProfile, pstats, tracemalloc
+sys.argv = [script]
+# The script's folder is private to this run (see write_run_script)
+sys.path[0] = os.path.dirname(script)
+if not profile_path:
+    runpy.run_path(script, run_name="__main__")
+else:
+    if trace_memory:
+        tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        # Keep the snippet's namespace alive so its allocations show up below
+        namespace = runpy.run_path(script, run_name="__main__")
+    finally:
+        profiler.disable()
+        report = {"functions": [], "peak_memory": None, "allocations": []}
+        if trace_memory:
+            report["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            snapshot = snapshot.filter_traces([
+                tracemalloc.Filter(False, module.__file__)
+                for module in (tracemalloc, cProfile, runpy)
+            ] + [tracemalloc.Filter(False, "<frozen *>")])
+            for stat in snapshot.statistics("lineno")[:top_n]:
+                frame = stat.traceback[0]
+                report["allocations"].append({
+                    "file": frame.filename, "line": frame.lineno,
+                    "size": stat.size, "count": stat.count
+                })
+        skip = (runpy.__file__, "<string>")
+        stats = pstats.Stats(profiler).stats
+        rows = [(key, value) for key, value in stats.items() if key[0] not in skip]
+        rows.sort(key=lambda row: row[1][2], reverse=True)
+        for (filename, line, function), (primitive, calls, own, cumulative, _) in rows[:top_n]:
+            report["functions"].append({
+                "function": function, "file": filename, "line": line, "calls": calls,
+                "primitive_calls": primitive, "total_time": own, "cumulative_time": cumulative
+            })
+        with open(profile_path, "w", encoding="utf-8") as f:
+            json.dump(report, f)
+"""
+
+
+class RunLimits:
+    """Resource limits applied to a single code run"""
+
+    def __init__(self, wall_time=30.0, cpu_time=10, memory_mb=512):
+        self.wall_time = wall_time    # Seconds before the run is killed (0 = unlimited)
+        self.cpu_time = cpu_time      # CPU seconds for the child process (0 = unlimited)
+        self.memory_mb = memory_mb    # Address space limit in MiB (0 = unlimited)
+
+    def __repr__(self):
+        return (f"RunLimits(wall_time={self.wall_time}, cpu_time={self.cpu_time}, "
+                f"memory_mb={self.memory_mb})")
+
+
+class RunRecord:
+    """Timing and outcome of a single code run, kept in the run history"""
+
+    def __init__(self, title=""):
+        self.title = title or "Untitled"
+        self.queued_at = datetime.datetime.now()
+        self.started_at = None
+        self.duration = None    # Wall-clock seconds, set once the run ends
+        self.exit_code = None
+        self.status = "queued"  # queued, running, finished, cached, timed out, stopped, failed, cancelled
+
+    @property
+    def wait_time(self):
+        """Seconds spent waiting in the run queue"""
+        if self.started_at is None:
+            return None
+        return (self.started_at - self.queued_at).total_seconds()
+
+    def describe(self):
+        """Return a short human readable summary of the run"""
+        if self.status == "finished":
+            return f"Finished with exit code {self.exit_code} in {self.duration:.2f}s"
+        if self.status == "cached":
+            return f"Cached result: exit code {self.exit_code}, originally took {self.duration:.2f}s"
+        if self.status in ("timed out", "stopped") and self.duration is not None:
+            return f"{self.status.capitalize()} after {self.duration:.2f}s"
+        return self.status.capitalize()
+
+
+def default_parallel_runs():
+    """Number of code runs allowed to execute at the same time"""
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def write_run_script(code):
+    """Write code to a file in a private temp folder and return its path
+
+    Every run gets its own folder, created readable by the current user only,
+    so concurrent runs never share a path, read-only install directories are
+    not a problem, and the folder the child puts on sys.path holds nothing but
+    the snippet.
+    """
+    import tempfile
+    folder = tempfile.mkdtemp(prefix="c0lornote_run_")
+    path = os.path.join(folder, "snippet.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(code)
+    return path
+
+
+def remove_run_script(path):
+    """Delete a script written by write_run_script and its folder"""
+    try:
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+    except OSError:
+        pass
+
+
+class ProfileOptions:
+    """Settings for a profiled run"""
+
+    def __init__(self, trace_memory=False, top_n=30):
+        self.trace_memory = trace_memory  # Also record allocations with tracemalloc
+        self.top_n = top_n                # Number of functions/allocations to keep
+
+
+class ProfileReport:
+    """Structured profiling data returned by a profiled run"""
+
+    def __init__(self, functions=None, peak_memory=None, allocations=None):
+        self.functions = functions or []      # Dicts sorted by total (self) time
+        self.peak_memory = peak_memory        # Peak traced memory in bytes, or None
+        self.allocations = allocations or []  # Largest allocation sites
+
+    @classmethod
+    def from_file(cls, path):
+        """Read the report written by the child interpreter"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("functions"), data.get("peak_memory"), data.get("allocations"))
+
+    def to_dict(self):
+        """Convert the report to a dictionary for serialization"""
+        return {
+            "functions": self.functions,
+            "peak_memory": self.peak_memory,
+            "allocations": self.allocations
+        }
+
+
+def make_profile_path():
+    """Reserve a temp file for a profiled run to write its report to"""
+    import tempfile
+    fd, path = tempfile.mkstemp(prefix="c0lornote_profile_", suffix=".json")
+    os.close(fd)
+    return path
+
+
+def remove_profile_file(path):
+    """Delete a report file made by make_profile_path (it lives in the shared temp folder)"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def build_command(script_path, limits: RunLimits, profile_path=None, profile: ProfileOptions = None):
+    """Return the argv list that runs script_path under the given limits
+
+    If profile_path is given the snippet runs under cProfile and its report is
+    written to that file.
+    """
+    memory_bytes = int(limits.memory_mb) * 1024 * 1024
+    profile = profile or ProfileOptions()
+    return [
+        sys.executable, "-u", "-c", _BOOTSTRAP,
+        str(int(limits.cpu_time)), str(memory_bytes), script_path,
+        profile_path or "", "1" if profile.trace_memory else "0", str(profile.top_n)
+    ]
+
+
+class RunCache:
+    """Opt-in cache of run results keyed by code hash and interpreter version
+
+    Entries hold stdout, stderr, exit code and the original run time. The cache
+    is bounded by the total size of the stored output and evicts the least
+    recently used entries first. It is persisted as a single JSON file.
+    """
+
+    def __init__(self, path=None, max_bytes=8 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> entry dict, least recently used first
+        self.total_bytes = 0
+        self.loaded = path is None
+
+    @staticmethod
+    def make_key(code):
+        """Hash the code together with the interpreter version that runs it"""
+        data = f"{sys.version}\0{code}".encode("utf-8")
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def entry_size(entry):
+        """Approximate the memory taken by an entry"""
+        return len(entry["stdout"].encode("utf-8")) + len(entry["stderr"].encode("utf-8")) + 128
+
+    @staticmethod
+    def valid_entry(entry):
+        """Return True if a stored entry has every field a cached run needs"""
+        return (isinstance(entry, dict) and isinstance(entry.get("key"), str)
+                and isinstance(entry.get("stdout"), str) and isinstance(entry.get("stderr"), str)
+                and isinstance(entry.get("exit_code"), int)
+                and isinstance(entry.get("duration"), (int, float)))
+
+    def load(self):
+        """Read the cache file on first use"""
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        entries = data.get("entries", []) if isinstance(data, dict) else []
+        for entry in entries if isinstance(entries, list) else []:
+            # Skip entries a damaged or hand-edited file left incomplete
+            if not self.valid_entry(entry):
+                continue
+            self.store(entry.pop("key"), entry)
+        self.evict()
+
+    def save(self):
+        """Write the cache file"""
+        if self.path is None:
+            return
+        data = {"entries": [dict(entry, key=key) for key, entry in self.entries.items()]}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        except OSError:
+            pass
+
+    def get(self, code):
+        """Return the cached entry for code, or None"""
+        self.load()
+        key = self.make_key(code)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, code, stdout, stderr, exit_code, duration):
+        """Cache the result of a completed run"""
+        self.load()
+        entry = {
+            "stdout": stdout,
+            "stderr": stderr,
+            "exit_code": exit_code,
+            "duration": duration,
+            "created": datetime.datetime.now().isoformat()
+        }
+        if self.entry_size(entry) > self.max_bytes:
+            return  # Too large to ever fit
+        self.store(self.make_key(code), entry)
+        self.evict()
+        self.save()
+
+    def store(self, key, entry):
+        """Insert or replace an entry as the most recently used one"""
+        if key in self.entries:
+            self.total_bytes -= self.entry_size(self.entries.pop(key))
+        self.entries[key] = entry
+        self.total_bytes += self.entry_size(entry)
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        while self.entries and self.total_bytes > self.max_bytes:
+            _, entry = self.entries.popitem(last=False)
+            self.total_bytes -= self.entry_size(entry)
+
+    def clear(self):
+        """Remove every entry"""
+        self.entries.clear()
+        self.total_bytes = 0
+        self.loaded = True
+        self.save()
+
+
+def child_environment():
+    """Environment for child interpreters, forcing UTF-8 output"""
+    env = dict(os.environ)
+    env["PYTHONIOENCODING"] = "utf-8"
+    return env
+
+
+class SnippetResult:
+    """Captured output of a snippet run to completion"""
+
+    def __init__(self, title, status, exit_code, stdout, stderr, duration):
+        self.title = title
+        self.status = status  # finished, timed out, cancelled, failed
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+
+    @property
+    def ok(self):
+        """True if the snippet finished with exit code 0"""
+        return self.status == "finished" and self.exit_code == 0
+
+    @property
+    def digest(self):
+        """Short hash of the captured output, handy for spotting changed results"""
+        data = self.stdout.encode("utf-8") + b"\0" + self.stderr.encode("utf-8")
+        return hashlib.sha256(data).hexdigest()[:12]
+
+    def to_dict(self):
+        """Convert the result to a dictionary for JSON reports"""
+        return {
+            "title": self.title,
+            "status": self.status,
+            "exit_code": self.exit_code,
+            "duration": round(self.duration, 4),
+            "digest": self.digest,
+            "stdout": self.stdout,
+            "stderr": self.stderr
+        }
+
+
+def run_snippet(code, limits: RunLimits, title="", cancel_event=None):
+    """Run code to completion in a child interpreter and capture its output
+
+    This blocks the calling thread, so the GUI only calls it from worker
+    threads. The wall-clock limit from limits is enforced here, and setting
+    cancel_event kills the child early.
+    """
+    import subprocess
+    start = time.perf_counter()
+    try:
+        script_path = write_run_script(code)
+    except OSError as e:
+        return SnippetResult(title, "failed", None, "", str(e), 0.0)
+
+    try:
+        process = subprocess.Popen(
+            build_command(script_path, limits),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            env=child_environment()
+        )
+    except OSError as e:
+        remove_run_script(script_path)
+        return SnippetResult(title, "failed", None, "", str(e), 0.0)
+
+    status = "finished"
+    try:
+        while True:
+            try:
+                stdout, stderr = process.communicate(timeout=0.1)
+                break
+            except subprocess.TimeoutExpired:
+                if cancel_event is not None and cancel_event.is_set():
+                    status = "cancelled"
+                elif limits.wall_time > 0 and time.perf_counter() - start > limits.wall_time:
+                    status = "timed out"
+                else:
+                    continue
+                process.kill()
+                stdout, stderr = process.communicate()
+                break
+    finally:
+        remove_run_script(script_path)
+
+    return SnippetResult(
+        title,
+        status,
+        process.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+        time.perf_counter() - start
+    )
+
+
+class BatchJob:
+    """Snapshot of a code note queued for a batch run"""
+
+    def __init__(self, title, code):
+        self.title = title or "Untitled"
+        self.code = code
+
+
+def select_code_notes(notes, tag=None, category=None):
+    """Return batch jobs for every code note matching the optional filters"""
+    jobs = []
+    for note in notes:
+        if not note.is_code or not note.content.strip():
+            continue
+        if tag and tag not in note.tags:
+            continue
+        if category and note.category != category:
+            continue
+        jobs.append(BatchJob(note.title, note.content))
+    return jobs
+
+
+def run_batch(jobs, limits: RunLimits, max_workers=None, progress=None, cancel_event=None):
+    """Run a list of BatchJobs in parallel and return results in job order
+
+    Every job runs in its own child interpreter; a thread pool of max_workers
+    bounds how many of them exist at once. progress(done, total, result) is
+    called as jobs complete, one call at a time, from the thread that called
+    run_batch (not from the pool's worker threads).
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    max_workers = max_workers or default_parallel_runs()
+    results = [None] * len(jobs)
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for index, job in enumerate(jobs):
+            futures[executor.submit(_run_job, job, limits, cancel_event)] = index
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            done += 1
+            if progress is not None:
+                progress(done, len(jobs), result)
+    return results
+
+
+def _run_job(job, limits, cancel_event):
+    """Run a single batch job unless the batch has been cancelled"""
+    if cancel_event is not None and cancel_event.is_set():
+        return SnippetResult(job.title, "cancelled", None, "", "", 0.0)
+    return run_snippet(job.code, limits, job.title, cancel_event)
+
+
+def format_report(results):
+    """Format batch results as a plain text summary table"""
+    title_width = max([len("Note")] + [len(r.title) for r in results])
+    title_width = min(title_width, 40)
+    lines = [
+        f"{'#':>4}  {'Note':<{title_width}}  {'Exit':>4}  {'Status':<9}  {'Time':>8}  Digest",
+        "-" * (title_width + 46)
+    ]
+    for index, result in enumerate(results, 1):
+        exit_code = "-" if result.exit_code is None else str(result.exit_code)
+        lines.append(
+            f"{index:>4}  {result.title[:title_width]:<{title_width}}  {exit_code:>4}  "
+            f"{result.status:<9}  {result.duration:>7.2f}s  {result.digest}"
+        )
+    passed = sum(1 for r in results if r.ok)
+    total_time = sum(r.duration for r in results)
+    lines.append("-" * (title_width + 46))
+    lines.append(f"{passed}/{len(results)} passed, {len(results) - passed} failed, "
+                 f"{total_time:.2f}s of run time")
+    return "\n".join(lines)
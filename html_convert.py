@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTML to plain text and Markdown conversion for C0lorNote
+
+Converts the rich text HTML the editor stores (QTextEdit.toHtml() output)
+without loading it into a widget, using a streaming html.parser. A parser is
+created per conversion, so the functions are safe to call from worker
+threads. Results are kept in an LRU cache keyed by a hash of the content, so
+search, previews and export only convert each note once.
+
+This module does not import PyQt6.
+"""
+
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from html.parser import HTMLParser
+
+# Converted text kept in the cache, in characters
+CACHE_CHARS = 64 * 1024 * 1024
+
+# Elements whose content is never shown
+_HIDDEN = {"head", "style", "script", "title"}
+
+# Elements that start a new line
+_BLOCKS = {"p", "div", "pre", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "dt", "dd"}
+
+# Inline elements that may carry formatting
+_INLINE = {"a", "b", "strong", "i", "em", "code", "tt", "span"}
+
+# Characters with a meaning in Markdown
+_MARKDOWN_SPECIAL = re.compile(r"([\\`*_\[\]])")
+
+_FONT_WEIGHT = re.compile(r"font-weight:\s*(\d+|bold)")
+_LIST_INDENT = re.compile(r"-qt-list-indent:\s*(\d+)")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_SOURCE_INDENT = re.compile(r"^[ \t]*[\r\n]\s*")
+
+
+def _inline_markers(tag, style):
+    """Return the Markdown markers for an inline element"""
+    if tag in ("b", "strong"):
+        return ["**"]
+    if tag in ("i", "em"):
+        return ["*"]
+    if tag in ("code", "tt"):
+        return ["`"]
+
+    # Qt writes formatting as span styles
+    markers = []
+    weight = _FONT_WEIGHT.search(style)
+    if weight and (weight.group(1) == "bold" or int(weight.group(1)) >= 600):
+        markers.append("**")
+    if "font-style:italic" in style.replace(" ", ""):
+        markers.append("*")
+    if "monospace" in style or "courier" in style.lower():
+        markers.append("`")
+    return markers
+
+
+class _Converter(HTMLParser):
+    """Collects the blocks of a document as (kind, text) pairs"""
+
+    def __init__(self, markdown):
+        super().__init__(convert_charrefs=True)
+        self.markdown = markdown
+        self.blocks = []  # (kind, text): kind is "p", "li", "pre", "hr", or "row" with a list of cells
+        self.kind = None  # Kind of the block being collected, None between blocks
+        self.prefix = ""  # Bullet or heading marker of the current block
+        self.parts = []
+        self.hidden = 0
+        self.inline = []  # (tag, index of the opening marker, closing marker, is code)
+        self.lists = []  # [tag, items so far, depth] for each open list
+        self.cells = None  # Cells of the table row being collected
+        self.code = 0  # Depth of code elements
+        self.heading = False  # Headings are bold already
+        self.collected = 0  # Characters of text seen so far
+        self.has_text = False  # Whether the current block has any visible text yet
+
+    def start_block(self, kind, prefix=""):
+        """Finish the current block and start a new one"""
+        self.end_block()
+        self.kind = kind
+        self.prefix = prefix
+        self.parts = []
+        self.heading = prefix.startswith("#")
+        self.has_text = False
+
+    def end_block(self):
+        """Finish the current block"""
+        if self.kind is None:
+            return
+        text = "".join(self.parts)
+        if self.kind != "pre":
+            # Leading spaces are the note's indentation; only trailing ones go
+            text = self.prefix + text.rstrip()
+        if self.cells is not None:
+            self.cells.append(text)
+        else:
+            self.blocks.append((self.kind, text))
+        self.kind = None
+        self.parts = []
+        self.inline = []
+
+    def list_prefix(self):
+        """Return the bullet or number for the next list item"""
+        if not self.lists:
+            return "- "
+        entry = self.lists[-1]
+        entry[1] += 1
+        marker = f"{entry[1]}." if entry[0] == "ol" else "-"
+        return "  " * entry[2] + marker + " "
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _HIDDEN:
+            self.hidden += 1
+            return
+        if self.hidden:
+            return
+        attrs = dict(attrs)
+
+        if tag in ("ul", "ol"):
+            self.end_block()
+            # Qt writes the nesting level as a style instead of nesting lists
+            indent = _LIST_INDENT.search(attrs.get("style") or "")
+            depth = int(indent.group(1)) - 1 if indent else len(self.lists)
+            self.lists.append([tag, 0, max(depth, 0)])
+        elif tag == "li":
+            self.start_block("li", self.list_prefix())
+        elif tag == "tr":
+            self.end_block()
+            self.cells = []
+        elif tag in ("td", "th"):
+            self.start_block("p")
+        elif tag in _BLOCKS:
+            if self.cells is not None and self.kind is not None:
+                # Paragraphs inside a table cell stay in the cell
+                if self.has_text:
+                    self.parts.append(" ")
+                return
+            prefix = ""
+            if self.markdown and tag[0] == "h" and tag[1:].isdigit():
+                prefix = "#" * int(tag[1:]) + " "
+            elif self.markdown and tag == "blockquote":
+                prefix = "> "
+            self.start_block("pre" if tag == "pre" else "p", prefix)
+        elif tag == "br":
+            if self.cells is not None:
+                self.text(" ", raw=True)
+            elif self.markdown and self.kind != "pre":
+                # A hard line break in Markdown
+                self.text("  \n", raw=True)
+            else:
+                self.text("\n", raw=True)
+        elif tag == "hr":
+            self.end_block()
+            self.blocks.append(("hr", "---" if self.markdown else ""))
+        elif tag == "img":
+            alt = attrs.get("alt") or ""
+            if self.markdown and attrs.get("src"):
+                self.text(f"![{alt}]({attrs['src']})", raw=True)
+            else:
+                self.text(alt)
+        elif tag in _INLINE:
+            self.open_inline(tag, attrs)
+
+    def open_inline(self, tag, attrs):
+        """Start an inline element, writing its opening Markdown marker"""
+        if tag == "a":
+            href = attrs.get("href")
+            markdown_link = self.markdown and href and not self.code and self.kind != "pre"
+            opening, closing, is_code = ("[", f"]({href})", False) if markdown_link else ("", "", False)
+        else:
+            markers = _inline_markers(tag, attrs.get("style") or "")
+            is_code = "`" in markers
+            if not self.markdown or self.kind == "pre" or self.code:
+                markers = []
+            elif self.heading and "**" in markers:
+                markers.remove("**")
+            elif is_code:
+                # Nothing is formatted inside code
+                markers = ["`"]
+            opening, closing = "".join(markers), "".join(reversed(markers))
+
+        if self.kind is None:
+            self.start_block("p")
+        self.parts.append(opening)
+        self.inline.append((tag, len(self.parts) - 1, closing, is_code))
+        if is_code:
+            self.code += 1
+
+    def close_inline(self, tag):
+        """End the innermost open inline element with this tag"""
+        for position in range(len(self.inline) - 1, -1, -1):
+            if self.inline[position][0] == tag:
+                break
+        else:
+            return
+        # Elements left open inside this one end with it
+        while len(self.inline) > position + 1:
+            self.close_inline(self.inline[-1][0])
+        _, index, closing, is_code = self.inline.pop()
+        if is_code:
+            self.code = max(self.code - 1, 0)
+        if not closing:
+            return
+
+        text = "".join(self.parts[index + 1:])
+        if not text.strip():
+            # Markers around nothing would show up literally
+            self.parts[index] = ""
+            return
+        if tag == "a":
+            self.parts.append(closing)
+            return
+        # Markdown needs the markers next to the text, not next to spaces
+        stripped = text.rstrip()
+        trailing = text[len(stripped):]
+        leading = stripped[:len(stripped) - len(stripped.lstrip())]
+        del self.parts[index + 1:]
+        self.parts[index] = leading + self.parts[index]
+        self.parts.append(stripped.lstrip() + closing + trailing)
+
+    def handle_endtag(self, tag):
+        if tag in _HIDDEN:
+            self.hidden = max(self.hidden - 1, 0)
+            return
+        if self.hidden:
+            return
+
+        if tag in ("ul", "ol"):
+            self.end_block()
+            if self.lists:
+                self.lists.pop()
+        elif tag == "tr":
+            self.end_block()
+            if self.cells is not None:
+                self.blocks.append(("row", self.cells))
+            self.cells = None
+        elif tag in ("td", "th"):
+            self.end_block()
+        elif tag in _BLOCKS or tag == "li":
+            if self.cells is None:
+                self.end_block()
+        elif tag in _INLINE:
+            self.close_inline(tag)
+
+    def handle_data(self, data):
+        if self.hidden:
+            return
+        if self.kind is None and not data.strip():
+            # Whitespace between blocks is source formatting
+            return
+        self.text(data)
+
+    def text(self, data, raw=False):
+        """Add text to the current block"""
+        if not data:
+            return
+        if self.kind is None:
+            self.start_block("p")
+        if not raw:
+            if self.kind != "pre":
+                if not self.has_text:
+                    # A line break and indent before the first text is source formatting
+                    data = _SOURCE_INDENT.sub("", data)
+                data = data.replace("\r", "").replace("\n", " ")
+            if self.markdown and self.kind != "pre" and not self.code:
+                data = _MARKDOWN_SPECIAL.sub(r"\\\1", data)
+            self.collected += len(data)
+        if data.strip():
+            self.has_text = True
+        self.parts.append(data)
+
+    def result(self):
+        """Join the blocks into the converted document"""
+        self.end_block()
+        lines = []
+        previous = None
+        header_done = False
+        for kind, text in self.blocks:
+            if kind == "row":
+                if self.markdown:
+                    row = "| " + " | ".join(cell.replace("|", "\\|") for cell in text) + " |"
+                    if not header_done:
+                        row += "\n|" + "---|" * len(text)
+                        header_done = True
+                else:
+                    row = "\t".join(text)
+                text = row
+            else:
+                header_done = False
+
+            if self.markdown and kind == "pre":
+                # Qt writes one <pre> per line; keep consecutive lines in one fence
+                if previous == "pre":
+                    lines[-1] = lines[-1][:-len("\n```")] + "\n" + text + "\n```"
+                else:
+                    if lines:
+                        lines.append("")
+                    lines.append("```\n" + text + "\n```")
+            elif self.markdown and lines and not (kind == previous and kind in ("li", "row")):
+                # Markdown paragraphs are separated by a blank line
+                lines.append("")
+                lines.append(text)
+            else:
+                lines.append(text)
+            previous = kind
+
+        text = "\n".join(lines).strip("\n")
+        if self.markdown:
+            text = _BLANK_LINES.sub("\n\n", text)
+        return text + "\n" if text else ""
+
+
+class _Cache:
+    """Thread-safe LRU cache of conversions, bounded by the characters it holds"""
+
+    def __init__(self, max_chars):
+        self.max_chars = max_chars
+        self.entries = OrderedDict()
+        self.chars = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = value
+            self.chars += len(value)
+            while self.chars > self.max_chars and self.entries:
+                _, evicted = self.entries.popitem(last=False)
+                self.chars -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.chars = 0
+            self.hits = 0
+            self.misses = 0
+
+
+_cache = _Cache(CACHE_CHARS)
+
+
+def content_key(content):
+    """Return a hash identifying content"""
+    return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _convert(content, markdown):
+    """Convert HTML, going through the cache"""
+    if not content:
+        return ""
+    key = (markdown, content_key(content))
+    text = _cache.get(key)
+    if text is None:
+        converter = _Converter(markdown)
+        converter.feed(content)
+        converter.close()
+        text = converter.result()
+        _cache.put(key, text)
+    return text
+
+
+def html_to_text(content):
+    """Return the plain text of rich text HTML, one line per paragraph"""
+    return _convert(content, markdown=False)
+
+
+def html_to_markdown(content):
+    """Return rich text HTML as Markdown"""
+    return _convert(content, markdown=True)
+
+
+def plain_text(content, is_code=False):
+    """Return the text of a note's content: code as is, rich text converted"""
+    return content if is_code else html_to_text(content)
+
+
+def preview(content, is_code=False, length=50):
+    """Return the start of a note's text on one line"""
+    if is_code:
+        text = " ".join(content[:length * 4].split())
+    else:
+        key = ("preview", length, content_key(content))
+        text = _cache.get(key)
+        if text is not None:
+            return text
+        # Only parse as much of the HTML as the preview needs
+        converter = _Converter(markdown=False)
+        for start in range(0, len(content), 1024):
+            converter.feed(content[start:start + 1024])
+            if converter.collected > length:
+                break
+        text = " ".join(converter.result().split())
+    text = text[:length] + "..." if len(text) > length else text
+    if not is_code:
+        _cache.put(key, text)
+    return text
+
+
+def cache_info():
+    """Return (hits, misses, entries, characters) for the conversion cache"""
+    with _cache.lock:
+        return _cache.hits, _cache.misses, len(_cache.entries), _cache.chars
+
+
+def clear_cache():
+    """Forget all cached conversions"""
+    _cache.clear()
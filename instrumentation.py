@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hot-path instrumentation for C0lorNote
+
+Opt-in timers and counters for the operations that make the app feel slow.
+Functions are wrapped with @timed("name"); while recording is off the wrapper
+only checks a flag before calling through. While it is on, every call is
+added to a latency histogram for its name and to a bounded list of trace
+events that can be written out in Chrome's trace event format
+(chrome://tracing, Perfetto).
+
+StallDetector is a watchdog thread for the event loop: the GUI calls beat()
+from a short Qt timer, and when no beat arrives within the threshold the
+watchdog samples the main thread's Python stack until the loop recovers.
+
+This module has no Qt dependency so it can be used from the command line
+tools and the benchmarks as well as from the GUI.
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import logging
+import threading
+import functools
+import traceback
+from collections import deque, Counter
+from logging.handlers import RotatingFileHandler
+
+# Environment variable that switches recording on at startup
+ENV_VAR = "C0LORNOTE_INSTRUMENT"
+
+# Environment variable that sets the stall detector threshold in milliseconds
+STALL_ENV_VAR = "C0LORNOTE_STALL_MS"
+
+# Histogram bucket upper bounds in microseconds: 1us, 2us, 4us ... about 67s
+BUCKET_BOUNDS_US = [2 ** i for i in range(27)]
+
+# Most trace events kept in memory; older ones are dropped first
+MAX_TRACE_EVENTS = 200000
+
+# Stacks are attributed to the innermost frame from this directory
+APP_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+class LatencyStats:
+    """Count, total, extremes and a log2 histogram of one operation's latency"""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.last = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_US) + 1)
+
+    def add(self, seconds):
+        """Record one call that took seconds"""
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_US, seconds * 1e6)] += 1
+
+    def percentile(self, fraction):
+        """Estimate a percentile in seconds from the histogram's bucket bounds"""
+        if not self.count:
+            return 0.0
+        wanted = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= wanted:
+                if index < len(BUCKET_BOUNDS_US):
+                    return min(BUCKET_BOUNDS_US[index] / 1e6, self.max)
+                break
+        return self.max
+
+    def to_dict(self):
+        """Convert the statistics to a dictionary for JSON output"""
+        histogram = {}
+        for index, bucket_count in enumerate(self.buckets):
+            if bucket_count:
+                bound = f"<={BUCKET_BOUNDS_US[index]}us" if index < len(BUCKET_BOUNDS_US) else "more"
+                histogram[bound] = bucket_count
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "min_ms": (self.min or 0.0) * 1000,
+            "max_ms": self.max * 1000,
+            "last_ms": self.last * 1000,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p90_ms": self.percentile(0.9) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "histogram": histogram,
+        }
+
+
+class Recorder:
+    """Collects latency statistics, counters and trace events"""
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self.lock:
+            self.stats = {}
+            self.counters = {}
+            self.events = deque(maxlen=MAX_TRACE_EVENTS)
+            self.recent = deque(maxlen=8)  # names of the latest spans, newest last
+
+    def enable(self, enabled=True):
+        """Switch recording on or off"""
+        self.enabled = enabled
+
+    def record(self, name, start, end):
+        """Add a finished span that ran from start to end (perf_counter seconds)"""
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = LatencyStats(name)
+            stats.add(end - start)
+            self.events.append((name, start, end, threading.get_ident()))
+            if self.recent and self.recent[-1] == name:
+                return
+            if name in self.recent:
+                self.recent.remove(name)
+            self.recent.append(name)
+
+    def count(self, name, amount=1):
+        """Increase a counter while recording"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def span(self, name):
+        """Context manager that times a block under name"""
+        return _Span(self, name)
+
+    def summary(self):
+        """Return statistics per operation and the counters as a dictionary"""
+        with self.lock:
+            return {
+                "operations": {name: stats.to_dict() for name, stats in sorted(self.stats.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def readout(self, limit=3):
+        """Return a one-line summary of the most recently used operations"""
+        with self.lock:
+            parts = []
+            for name in reversed(self.recent):
+                stats = self.stats[name]
+                parts.append(f"{name} {stats.last * 1000:.2f}ms (p90 {stats.percentile(0.9) * 1000:.2f})")
+                if len(parts) == limit:
+                    break
+        return " | ".join(parts)
+
+    def chrome_trace(self):
+        """Return the trace events in Chrome's trace event format"""
+        with self.lock:
+            events = list(self.events)
+        threads = {}
+        trace_events = []
+        for name, start, end, thread_id in events:
+            tid = threads.setdefault(thread_id, len(threads) + 1)
+            trace_events.append({
+                "name": name,
+                "cat": "c0lornote",
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": self.pid,
+                "tid": tid,
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def dump(self, path, chrome=False):
+        """Write the summary, or a Chrome trace when chrome is true, to path"""
+        data = self.chrome_trace() if chrome else self.summary()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=None if chrome else 2)
+
+
+class _Span:
+    """Times a with block for a Recorder"""
+
+    __slots__ = ("recorder", "name", "start")
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if self.recorder.enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self.start is not None:
+            self.recorder.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+# The application-wide recorder
+recorder = Recorder()
+
+
+def timed(name):
+    """Decorator that records every call of the function under name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not recorder.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.record(name, start, time.perf_counter())
+        return wrapper
+    return decorator
+
+
+def enabled_from_environment():
+    """Return True if the environment asks for instrumentation"""
+    return os.environ.get(ENV_VAR, "").strip().lower() not in ("", "0", "false", "no", "off")
+
+
+def stall_ms_from_environment():
+    """Return the stall threshold the environment asks for, or 0 if none (or a bad value) is set"""
+    value = os.environ.get(STALL_ENV_VAR, "").strip()
+    if not value:
+        return 0
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Ignoring {STALL_ENV_VAR}={value!r}: not a number of milliseconds", file=sys.stderr)
+        return 0
+
+
+class Stall:
+    """One period in which the event loop did not service its heartbeat"""
+
+    def __init__(self, started, duration, stack, samples):
+        self.started = started  # time.time() when the last heartbeat was seen
+        self.duration = duration  # seconds
+        self.stack = stack  # traceback.StackSummary sampled most often
+        self.samples = samples
+
+    @property
+    def culprit(self):
+        """The innermost application frame of the stack, as 'file:line in function'"""
+        if not self.stack:
+            return "<unknown>"
+        app_frames = [frame for frame in self.stack
+                      if os.path.abspath(frame.filename).startswith(APP_DIR)]
+        frame = (app_frames or self.stack)[-1]
+        return f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}"
+
+
+class StallDetector:
+    """Watchdog thread that logs the main thread's stack when the event loop stalls
+
+    The watchdog can only sample while the main thread lets go of the GIL, so
+    a long call into Qt that holds it is seen as a stall ending in that call
+    rather than being sampled throughout.
+    """
+
+    def __init__(self, threshold=0.25, log_path=None, poll_interval=None,
+                 max_bytes=1024 * 1024, backup_count=3):
+        self.threshold = threshold
+        self.poll_interval = poll_interval or min(0.05, threshold / 4)
+        self.stalls = []
+        self.last_beat = time.monotonic()
+        self.main_thread_id = threading.main_thread().ident
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        self.logger = logging.getLogger("c0lornote.stalls")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.handler = None
+        if log_path:
+            os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+            self.handler = RotatingFileHandler(
+                log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+            )
+            self.handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.logger.addHandler(self.handler)
+
+    def beat(self):
+        """Heartbeat from the event loop; call from a timer on the main thread"""
+        self.last_beat = time.monotonic()
+
+    def start(self):
+        """Start the watchdog thread"""
+        if self.thread is not None:
+            return
+        self.beat()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.watch, name="c0lornote-stall-detector", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the watchdog thread, log the summary and close the log"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.handler is not None:
+            self.logger.info(self.summary())
+            self.logger.removeHandler(self.handler)
+            self.handler.close()
+            self.handler = None
+
+    def sample_main_stack(self):
+        """Return the main thread's current Python stack, outermost frame first"""
+        frame = sys._current_frames().get(self.main_thread_id)
+        if frame is None:
+            return None
+        return traceback.extract_stack(frame)
+
+    def watch(self):
+        """Watchdog loop run on the background thread"""
+        samples = Counter()
+        stacks = {}
+        stall_beat = None
+
+        while not self.stop_event.wait(self.poll_interval):
+            beat = self.last_beat
+            lag = time.monotonic() - beat
+
+            if stall_beat is not None and beat != stall_beat:
+                # The loop came back; the stall lasted until this beat
+                self.finish_stall(stall_beat, beat, samples, stacks)
+                samples.clear()
+                stacks.clear()
+                stall_beat = None
+
+            if lag > self.threshold:
+                stall_beat = beat
+                stack = self.sample_main_stack()
+                if stack is not None:
+                    key = tuple((frame.filename, frame.lineno, frame.name) for frame in stack)
+                    samples[key] += 1
+                    stacks[key] = stack
+
+    def finish_stall(self, beat, next_beat, samples, stacks):
+        """Record and log a stall that ended with next_beat"""
+        duration = next_beat - beat
+        stack = stacks[samples.most_common(1)[0][0]] if samples else None
+        stall = Stall(time.time() - (time.monotonic() - beat), duration, stack, sum(samples.values()))
+        self.stalls.append(stall)
+        recorder.count("event loop stalls")
+
+        lines = [f"Event loop stalled for {duration * 1000:.0f} ms "
+                 f"({stall.samples} stack samples), most often in {stall.culprit}"]
+        if stack:
+            lines.append("".join(stack.format()).rstrip())
+        self.logger.warning("\n".join(lines))
+
+    def worst_offenders(self, limit=5):
+        """Return (culprit, count, total seconds, longest seconds) sorted by total time"""
+        offenders = {}
+        for stall in self.stalls:
+            count, total, longest = offenders.get(stall.culprit, (0, 0.0, 0.0))
+            offenders[stall.culprit] = (count + 1, total + stall.duration, max(longest, stall.duration))
+        ranked = sorted(offenders.items(), key=lambda item: item[1][1], reverse=True)
+        return [(culprit, *values) for culprit, values in ranked[:limit]]
+
+    def summary(self):
+        """Return a text summary of the stalls seen so far"""
+        if not self.stalls:
+            return f"No event loop stalls over {self.threshold * 1000:.0f} ms"
+        total = sum(stall.duration for stall in self.stalls)
+        lines = [f"{len(self.stalls)} event loop stall(s) over {self.threshold * 1000:.0f} ms, "
+                 f"{total:.2f} s in total. Worst offenders:"]
+        for culprit, count, seconds, longest in self.worst_offenders():
+            lines.append(f"  {seconds * 1000:8.0f} ms  {count:4d}x  longest {longest * 1000:6.0f} ms  {culprit}")
+        return "\n".join(lines)
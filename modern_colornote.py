@@ -8,30 +8,65 @@ A sleek, modern note-taking application built with PyQt6, inspired by Notion, Go
 Features include rich text editing, code editing with syntax highlighting, and multiple themes.
 """
 
+import time
+
+# Taken before the heavy imports so --profile-startup can report their cost
+_STARTUP_T0 = time.perf_counter()
+
 import sys
 import os
 import json
-import subprocess
+import codecs
+import shutil
+import argparse
 import datetime
 import platform
+import threading
+import multiprocessing
 from enum import Enum
 from typing import Dict, List, Optional
+from collections import OrderedDict
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QSplitter, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QLineEdit, QTextEdit, QToolBar, QStatusBar, QMenu,
     QMenuBar, QDialog, QFileDialog, QMessageBox, QTabWidget, QComboBox,
     QListWidget, QListWidgetItem, QTreeWidget, QTreeWidgetItem, QCheckBox,
-    QScrollArea, QFrame, QToolButton, QColorDialog
+    QScrollArea, QFrame, QToolButton, QColorDialog, QSpinBox, QDoubleSpinBox,
+    QFormLayout, QProgressBar, QTableWidget, QTableWidgetItem, QHeaderView,
+    QProgressDialog, QInputDialog, QPlainTextEdit, QPlainTextDocumentLayout,
+    QListView, QStyledItemDelegate, QStyle
 )
 from PyQt6.QtGui import (
     QFont, QIcon, QColor, QPalette, QSyntaxHighlighter, QTextCharFormat,
     QKeySequence, QTextCursor, QKeyEvent, QTextDocument, QAction, QPixmap,
-    QShortcut
+    QShortcut, QFontDatabase, QTextDocumentFragment, QPainter, QFontMetrics
 )
 from PyQt6.QtCore import (
-    Qt, QSize, QRect, QPoint, QTimer, QRegularExpression, pyqtSignal, QObject
+    Qt, QSize, QRect, QPoint, QTimer, QRegularExpression, pyqtSignal, QObject,
+    QProcess, QProcessEnvironment, QElapsedTimer, QEvent, QAbstractListModel, QModelIndex
+)
+
+from code_runner import (
+    RunLimits, RunRecord, RunCache, ProfileOptions, ProfileReport, make_profile_path,
+    build_command, default_parallel_runs, write_run_script,
+    remove_run_script, remove_profile_file, select_code_notes, run_batch, format_report
 )
+from note_store import Note, NoteRepository, NOTES_FILE_NAME, default_config_dir, read_notes_file
+from note_import import import_directory
+from note_export import snapshot, export_notes
+from html_convert import html_to_text, preview
+from rich_text import STYLE_SHEET as RICH_TEXT_STYLE_SHEET, compact_html, iter_html_blocks
+from instrumentation import recorder, timed, enabled_from_environment, stall_ms_from_environment, StallDetector
+
+
+# Memory budget for the editor's pool of recently opened note documents
+DOCUMENT_POOL_BUDGET = 64 * 1024 * 1024
+
+# Notes longer than this many characters are loaded into the editor a piece at a time
+PROGRESSIVE_LOAD_THRESHOLD = 256 * 1024
+PROGRESSIVE_LOAD_PIECE = 16 * 1024  # Characters per piece
+PROGRESSIVE_LOAD_SLICE = 0.02  # Seconds of loading per event loop iteration
 
 
 class ThemeType(Enum):
@@ -44,129 +79,349 @@ class ThemeType(Enum):
     MINIMALIST = 6  # Yellow minimalist theme
 
 
+# Built-in themes as plain data; QColor objects are only created when a theme
+# is compiled into a ThemeBundle by the ThemeRegistry
+BUILTIN_THEMES = {
+    ThemeType.MATRIX: {
+        'name': 'Matrix',
+        'main_bg': '#000000',
+        'main_fg': '#00FF00',
+        'accent': '#008F11',
+        'sidebar_bg': '#0D0208',
+        'sidebar_fg': '#3F6844',
+        'editor_bg': '#0D0D0D',
+        'editor_fg': '#00FF41',
+        'toolbar_bg': '#121212',
+        'button_bg': '#003B00',
+        'button_fg': '#00FF41',
+        'border': '#32de84',
+        'highlight': '#00FF41',
+        'code_bg': '#002400',
+        'font_family': 'Consolas, "Courier New", monospace',
+        'code_font_family': 'Consolas, "Courier New", monospace',
+        'syntax': {
+            'keyword': '#569CD6', 'string': '#CE9178', 'comment': '#6A9955',
+            'function': '#DCDCAA', 'class': '#4EC9B0',
+        },
+    },
+    ThemeType.DREAMCORE: {
+        'name': 'Dreamcore',
+        'main_bg': '#2D033B',
+        'main_fg': '#E5B8F4',
+        'accent': '#C147E9',
+        'sidebar_bg': '#810CA8',
+        'sidebar_fg': '#F5E9FF',
+        'editor_bg': '#4E0B5E',
+        'editor_fg': '#F7C8FF',
+        'toolbar_bg': '#3A0647',
+        'button_bg': '#9E35CF',
+        'button_fg': '#FFFFFF',
+        'border': '#C147E9',
+        'highlight': '#C147E9',
+        'code_bg': '#3A0647',
+        'font_family': 'Arial, Helvetica, sans-serif',
+        'code_font_family': 'Consolas, "Courier New", monospace',
+        'syntax': {
+            'keyword': '#0000FF', 'string': '#A31515', 'comment': '#008000',
+            'function': '#795E26', 'class': '#267F99',
+        },
+    },
+    ThemeType.SPACE_RED: {
+        'name': 'Space Red',
+        'main_bg': '#0F0A0A',
+        'main_fg': '#FF3A3A',
+        'accent': '#E60000',
+        'sidebar_bg': '#1A0000',
+        'sidebar_fg': '#FF7070',
+        'editor_bg': '#200000',
+        'editor_fg': '#FFCCCB',
+        'toolbar_bg': '#2C0000',
+        'button_bg': '#D10000',
+        'button_fg': '#FFFFFF',
+        'border': '#7A0000',
+        'highlight': '#FF3A3A',
+        'code_bg': '#300000',
+        'font_family': 'Orbitron, Arial, sans-serif',
+        'code_font_family': 'Source Code Pro, Consolas, monospace',
+        'syntax': {
+            'keyword': '#0000FF', 'string': '#A31515', 'comment': '#008000',
+            'function': '#795E26', 'class': '#267F99',
+        },
+    },
+    ThemeType.APPLE_LIGHT: {
+        'name': 'Apple Light',
+        'main_bg': '#FFFFFF',
+        'main_fg': '#333333',
+        'accent': '#0A84FF',
+        'sidebar_bg': '#F2F2F7',
+        'sidebar_fg': '#1C1C1E',
+        'editor_bg': '#FFFFFF',
+        'editor_fg': '#333333',
+        'toolbar_bg': '#F2F2F7',
+        'button_bg': '#0A84FF',
+        'button_fg': '#FFFFFF',
+        'border': '#E5E5EA',
+        'highlight': '#0A84FF',
+        'code_bg': '#F8F8F8',
+        'font_family': 'SF Pro, -apple-system, BlinkMacSystemFont, Arial, sans-serif',
+        'code_font_family': 'SF Mono, Menlo, Monaco, Consolas, monospace',
+        'syntax': {
+            'keyword': '#0000FF', 'string': '#A31515', 'comment': '#008000',
+            'function': '#795E26', 'class': '#267F99',
+        },
+    },
+    ThemeType.APPLE_DARK: {
+        'name': 'Apple Dark',
+        'main_bg': '#1C1C1E',
+        'main_fg': '#FFFFFF',
+        'accent': '#0A84FF',
+        'sidebar_bg': '#2C2C2E',
+        'sidebar_fg': '#F2F2F7',
+        'editor_bg': '#2C2C2E',
+        'editor_fg': '#FFFFFF',
+        'toolbar_bg': '#3A3A3C',
+        'button_bg': '#0A84FF',
+        'button_fg': '#FFFFFF',
+        'border': '#3A3A3C',
+        'highlight': '#0A84FF',
+        'code_bg': '#2C2C2E',
+        'font_family': 'SF Pro, -apple-system, BlinkMacSystemFont, Arial, sans-serif',
+        'code_font_family': 'SF Mono, Menlo, Monaco, Consolas, monospace',
+        'syntax': {
+            'keyword': '#0000FF', 'string': '#A31515', 'comment': '#008000',
+            'function': '#795E26', 'class': '#267F99',
+        },
+    },
+    ThemeType.MINIMALIST: {
+        'name': 'Minimalist',
+        'main_bg': '#FFFFFA',
+        'main_fg': '#333333',
+        'accent': '#FFD700',
+        'sidebar_bg': '#FFF8E1',
+        'sidebar_fg': '#3A3A3A',
+        'editor_bg': '#FFFFFA',
+        'editor_fg': '#333333',
+        'toolbar_bg': '#FFF8E1',
+        'button_bg': '#FFD700',
+        'button_fg': '#333333',
+        'border': '#FFD700',
+        'highlight': '#FFD700',
+        'code_bg': '#FFFFF0',
+        'font_family': 'Arial, Helvetica, sans-serif',
+        'code_font_family': 'Consolas, "Courier New", monospace',
+        'syntax': {
+            'keyword': '#0000FF', 'string': '#A31515', 'comment': '#008000',
+            'function': '#795E26', 'class': '#267F99',
+        },
+    }
+}
+
+# Color keys every theme must define
+THEME_COLOR_KEYS = [
+    'main_bg', 'main_fg', 'accent', 'sidebar_bg', 'sidebar_fg', 'editor_bg', 'editor_fg',
+    'toolbar_bg', 'button_bg', 'button_fg', 'border', 'highlight', 'code_bg'
+]
+
+# Syntax highlighting elements a theme can color
+SYNTAX_KEYS = ['keyword', 'string', 'comment', 'function', 'class']
+
+# Defaults for the optional parts of a theme file
+THEME_DEFAULTS = {
+    'font_family': 'Arial, Helvetica, sans-serif',
+    'code_font_family': 'Consolas, "Courier New", monospace',
+    'syntax': BUILTIN_THEMES[ThemeType.APPLE_LIGHT]['syntax'],
+}
+
+# Application-wide style sheet template; widgets are targeted by object name
+STYLESHEET_TEMPLATE = """
+QWidget {{ background-color: {main_bg}; color: {main_fg}; }}
+QStatusBar, QStatusBar QLabel {{ background-color: {toolbar_bg}; color: {main_fg}; }}
+#brandingLabel {{ padding-right: 10px; }}
+#sidebar, #sidebar QWidget {{ background-color: {sidebar_bg}; color: {sidebar_fg}; }}
+#sidebar #sidebarHeader {{ color: {accent}; font-weight: bold; }}
+#sidebar #sectionLabel {{ font-weight: bold; font-size: 10px; }}
+#editorToolbar, #editorToolbar QWidget {{ background-color: {toolbar_bg}; }}
+#sidebar QPushButton, #editorToolbar QPushButton {{
+    background-color: {button_bg}; color: {button_fg}; border: 1px solid {border}; padding: 5px;
+}}
+#searchInput {{
+    background-color: {editor_bg}; color: {editor_fg}; border: 1px solid {border}; padding: 5px;
+}}
+#newNoteButton {{ background-color: {accent}; color: white; border: none; padding: 10px; }}
+"""
+
+
+class ThemeError(Exception):
+    """Raised when a theme definition is invalid"""
+
+
+class ThemeBundle:
+    """A theme compiled into ready-to-use Qt objects"""
+    
+    def __init__(self, key, definition):
+        self.key = key
+        
+        # Colors as QColor objects, plus the name and font settings
+        self.colors = {name: QColor(definition[name]) for name in THEME_COLOR_KEYS}
+        self.colors['name'] = definition['name']
+        self.colors['font_family'] = definition['font_family']
+        self.colors['code_font_family'] = definition['code_font_family']
+        
+        # Palette shared by every themed widget
+        self.palette = QPalette()
+        self.palette.setColor(QPalette.ColorRole.Window, self.colors['main_bg'])
+        self.palette.setColor(QPalette.ColorRole.WindowText, self.colors['main_fg'])
+        self.palette.setColor(QPalette.ColorRole.Base, self.colors['editor_bg'])
+        self.palette.setColor(QPalette.ColorRole.Text, self.colors['editor_fg'])
+        self.palette.setColor(QPalette.ColorRole.Button, self.colors['button_bg'])
+        self.palette.setColor(QPalette.ColorRole.ButtonText, self.colors['button_fg'])
+        self.palette.setColor(QPalette.ColorRole.Highlight, self.colors['highlight'])
+        self.palette.setColor(QPalette.ColorRole.HighlightedText, QColor('white'))
+        
+        # Style sheet for the whole window
+        self.stylesheet = STYLESHEET_TEMPLATE.format(
+            **{name: self.colors[name].name() for name in THEME_COLOR_KEYS}
+        )
+        
+        # Character formats for the syntax highlighter
+        self.syntax_formats = {}
+        for name in SYNTAX_KEYS:
+            format = QTextCharFormat()
+            format.setForeground(QColor(definition['syntax'][name]))
+            if name == 'keyword':
+                format.setFontWeight(QFont.Weight.Bold)
+            self.syntax_formats[name] = format
+
+
+class ThemeRegistry:
+    """Registry of built-in and user themes
+
+    Definitions are kept as plain data and compiled into a ThemeBundle the
+    first time a theme is selected. User themes are read from *.yaml files in
+    a themes directory; invalid files are skipped and reported in errors.
+    """
+    
+    def __init__(self):
+        self.definitions = {}  # theme key -> validated definition dict
+        self.bundles = {}  # theme key -> ThemeBundle, built lazily
+        self.errors = []  # Messages about theme files that could not be loaded
+        for theme_type, definition in BUILTIN_THEMES.items():
+            self.definitions[theme_type] = definition
+    
+    def keys(self):
+        """Theme keys in display order: built-in ThemeTypes, then user theme ids"""
+        return list(self.definitions)
+    
+    def name(self, key):
+        """Display name of a theme"""
+        return self.definitions[key]['name']
+    
+    def find(self, name):
+        """Look up a theme key by id, ThemeType name or display name"""
+        name = str(name).lower()
+        for key, definition in self.definitions.items():
+            key_name = key.name.lower() if isinstance(key, ThemeType) else key.lower()
+            if name in (key_name, definition['name'].lower()):
+                return key
+        return None
+    
+    def bundle(self, key):
+        """Get the compiled bundle of a theme, compiling it on first use"""
+        bundle = self.bundles.get(key)
+        if bundle is None:
+            bundle = ThemeBundle(key, self.definitions[key])
+            self.bundles[key] = bundle
+        return bundle
+    
+    def load_user_themes(self, themes_dir):
+        """Load and validate every theme file in themes_dir"""
+        if not os.path.isdir(themes_dir):
+            return
+        try:
+            import yaml
+        except ImportError:
+            self.errors.append("PyYAML is not installed; user themes were not loaded")
+            return
+        
+        for file_name in sorted(os.listdir(themes_dir)):
+            if not file_name.endswith((".yaml", ".yml")):
+                continue
+            path = os.path.join(themes_dir, file_name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = yaml.safe_load(f)
+                if not isinstance(data, dict):
+                    raise ThemeError("a theme must be a mapping of settings")
+                key = str(data.get('id') or os.path.splitext(file_name)[0])
+                self.add_theme(key, data)
+            except (OSError, UnicodeDecodeError, yaml.YAMLError, ThemeError) as e:
+                self.errors.append(f"{file_name}: {e}")
+    
+    def add_theme(self, key, data):
+        """Validate a theme definition and register it under key"""
+        self.definitions[key] = self.validate(key, data)
+        self.bundles.pop(key, None)
+        Theme.invalidate_caches(key)
+    
+    def validate(self, key, data):
+        """Return a complete theme definition, or raise ThemeError"""
+        if not isinstance(data, dict):
+            raise ThemeError("a theme must be a mapping of settings")
+        
+        # Start from the base theme (or the defaults) and overlay the file
+        definition = {'name': key}
+        definition.update(THEME_DEFAULTS)
+        if data.get('base') is not None:
+            base = self.find(data['base'])
+            if base is None:
+                raise ThemeError(f"unknown base theme '{data['base']}'")
+            definition.update(self.definitions[base])
+            definition['name'] = key
+        
+        syntax = dict(definition['syntax'])
+        if data.get('syntax') is not None:
+            if not isinstance(data['syntax'], dict):
+                raise ThemeError("'syntax' must be a mapping")
+            syntax.update(data['syntax'])
+        
+        for name, value in data.items():
+            if name in ('id', 'base', 'syntax'):
+                continue
+            if name not in THEME_COLOR_KEYS and name not in ('name', 'font_family', 'code_font_family'):
+                raise ThemeError(f"unknown setting '{name}'")
+            definition[name] = str(value)
+        definition['syntax'] = syntax
+        
+        missing = [name for name in THEME_COLOR_KEYS if name not in definition]
+        if missing:
+            raise ThemeError(f"missing colors: {', '.join(missing)}")
+        for name in THEME_COLOR_KEYS + [f"syntax.{name}" for name in SYNTAX_KEYS]:
+            value = syntax.get(name[7:]) if name.startswith("syntax.") else definition[name]
+            if value is None or not QColor.isValidColorName(str(value)):
+                raise ThemeError(f"invalid color for '{name}': {value}")
+        return definition
+
+
 class Theme:
     """Class for managing application themes"""
     
-    def __init__(self, theme_type: ThemeType = ThemeType.APPLE_LIGHT):
-        self.theme_type = theme_type
-        
-        # Define color schemes for each theme
-        self.themes = {
-            ThemeType.MATRIX: {
-                'name': 'Matrix',
-                'main_bg': QColor('#000000'),
-                'main_fg': QColor('#00FF00'),
-                'accent': QColor('#008F11'),
-                'sidebar_bg': QColor('#0D0208'),
-                'sidebar_fg': QColor('#3F6844'),
-                'editor_bg': QColor('#0D0D0D'),
-                'editor_fg': QColor('#00FF41'),
-                'toolbar_bg': QColor('#121212'),
-                'button_bg': QColor('#003B00'),
-                'button_fg': QColor('#00FF41'),
-                'border': QColor('#32de84'),
-                'highlight': QColor('#00FF41'),
-                'code_bg': QColor('#002400'),
-                'font_family': 'Consolas, "Courier New", monospace',
-                'code_font_family': 'Consolas, "Courier New", monospace',
-            },
-            ThemeType.DREAMCORE: {
-                'name': 'Dreamcore',
-                'main_bg': QColor('#2D033B'),
-                'main_fg': QColor('#E5B8F4'),
-                'accent': QColor('#C147E9'),
-                'sidebar_bg': QColor('#810CA8'),
-                'sidebar_fg': QColor('#F5E9FF'),
-                'editor_bg': QColor('#4E0B5E'),
-                'editor_fg': QColor('#F7C8FF'),
-                'toolbar_bg': QColor('#3A0647'),
-                'button_bg': QColor('#9E35CF'),
-                'button_fg': QColor('#FFFFFF'),
-                'border': QColor('#C147E9'),
-                'highlight': QColor('#C147E9'),
-                'code_bg': QColor('#3A0647'),
-                'font_family': 'Arial, Helvetica, sans-serif',
-                'code_font_family': 'Consolas, "Courier New", monospace',
-            },
-            ThemeType.SPACE_RED: {
-                'name': 'Space Red',
-                'main_bg': QColor('#0F0A0A'),
-                'main_fg': QColor('#FF3A3A'),
-                'accent': QColor('#E60000'),
-                'sidebar_bg': QColor('#1A0000'),
-                'sidebar_fg': QColor('#FF7070'),
-                'editor_bg': QColor('#200000'),
-                'editor_fg': QColor('#FFCCCB'),
-                'toolbar_bg': QColor('#2C0000'),
-                'button_bg': QColor('#D10000'),
-                'button_fg': QColor('#FFFFFF'),
-                'border': QColor('#7A0000'),
-                'highlight': QColor('#FF3A3A'),
-                'code_bg': QColor('#300000'),
-                'font_family': 'Orbitron, Arial, sans-serif',
-                'code_font_family': 'Source Code Pro, Consolas, monospace',
-            },
-            ThemeType.APPLE_LIGHT: {
-                'name': 'Apple Light',
-                'main_bg': QColor('#FFFFFF'),
-                'main_fg': QColor('#333333'),
-                'accent': QColor('#0A84FF'),
-                'sidebar_bg': QColor('#F2F2F7'),
-                'sidebar_fg': QColor('#1C1C1E'),
-                'editor_bg': QColor('#FFFFFF'),
-                'editor_fg': QColor('#333333'),
-                'toolbar_bg': QColor('#F2F2F7'),
-                'button_bg': QColor('#0A84FF'),
-                'button_fg': QColor('#FFFFFF'),
-                'border': QColor('#E5E5EA'),
-                'highlight': QColor('#0A84FF'),
-                'code_bg': QColor('#F8F8F8'),
-                'font_family': 'SF Pro, -apple-system, BlinkMacSystemFont, Arial, sans-serif',
-                'code_font_family': 'SF Mono, Menlo, Monaco, Consolas, monospace',
-            },
-            ThemeType.APPLE_DARK: {
-                'name': 'Apple Dark',
-                'main_bg': QColor('#1C1C1E'),
-                'main_fg': QColor('#FFFFFF'),
-                'accent': QColor('#0A84FF'),
-                'sidebar_bg': QColor('#2C2C2E'),
-                'sidebar_fg': QColor('#F2F2F7'),
-                'editor_bg': QColor('#2C2C2E'),
-                'editor_fg': QColor('#FFFFFF'),
-                'toolbar_bg': QColor('#3A3A3C'),
-                'button_bg': QColor('#0A84FF'),
-                'button_fg': QColor('#FFFFFF'),
-                'border': QColor('#3A3A3C'),
-                'highlight': QColor('#0A84FF'),
-                'code_bg': QColor('#2C2C2E'),
-                'font_family': 'SF Pro, -apple-system, BlinkMacSystemFont, Arial, sans-serif',
-                'code_font_family': 'SF Mono, Menlo, Monaco, Consolas, monospace',
-            },
-            ThemeType.MINIMALIST: {
-                'name': 'Minimalist',
-                'main_bg': QColor('#FFFFFA'),
-                'main_fg': QColor('#333333'),
-                'accent': QColor('#FFD700'),
-                'sidebar_bg': QColor('#FFF8E1'),
-                'sidebar_fg': QColor('#3A3A3A'),
-                'editor_bg': QColor('#FFFFFA'),
-                'editor_fg': QColor('#333333'),
-                'toolbar_bg': QColor('#FFF8E1'),
-                'button_bg': QColor('#FFD700'),
-                'button_fg': QColor('#333333'),
-                'border': QColor('#FFD700'),
-                'highlight': QColor('#FFD700'),
-                'code_bg': QColor('#FFFFF0'),
-                'font_family': 'Arial, Helvetica, sans-serif',
-                'code_font_family': 'Consolas, "Courier New", monospace',
-            }
-        }
+    # Resolved fonts, built lazily once per theme
+    font_cache = {}  # (theme key, font key, point size, scaling factor) -> QFont
+    family_cache = {}  # font family list -> installed family
+    
+    def __init__(self, theme_type=ThemeType.APPLE_LIGHT, registry: ThemeRegistry = None):
+        self.theme_type = theme_type  # A ThemeType, or the id of a user theme
+        self.registry = registry or ThemeRegistry()
+    
+    def bundle(self):
+        """Get the compiled bundle of the current theme"""
+        return self.registry.bundle(self.theme_type)
     
     def get_current_theme(self):
         """Get the current theme settings"""
-        return self.themes[self.theme_type]
+        return self.bundle().colors
     
-    def set_theme(self, theme_type: ThemeType):
+    def set_theme(self, theme_type):
         """Change the current theme"""
         # Reset any previous theme settings
         self.theme_type = theme_type
@@ -175,33 +430,79 @@ class Theme:
             if highlighter and hasattr(highlighter, 'create_formatting_rules'):
                 highlighter.create_formatting_rules()
     
+    def stylesheet(self):
+        """Get the application style sheet for the current theme"""
+        return self.bundle().stylesheet
+    
+    def palette(self):
+        """Get the resolved palette for the current theme"""
+        return self.bundle().palette
+    
+    def font_family(self, key='font_family'):
+        """Resolve a comma-separated font list from the theme to one installed family"""
+        families = self.get_current_theme()[key]
+        family = Theme.family_cache.get(families)
+        if family is None:
+            family = resolve_font_family(families, fixed_pitch=(key == 'code_font_family'))
+            Theme.family_cache[families] = family
+        return family
+    
+    def font(self, key='font_family', point_size=10, scaling_factor=1.0):
+        """Get a cached font for the current theme; callers must not modify it"""
+        cache_key = (self.theme_type, key, point_size, scaling_factor)
+        font = Theme.font_cache.get(cache_key)
+        if font is None:
+            font = QFont(self.font_family(key))
+            font.setPointSize(int(point_size * scaling_factor))
+            Theme.font_cache[cache_key] = font
+        return font
+    
+    @staticmethod
+    def invalidate_caches(theme_type=None):
+        """Drop resolved fonts after a theme definition changes"""
+        for cache_key in list(Theme.font_cache):
+            if theme_type is None or cache_key[0] == theme_type:
+                del Theme.font_cache[cache_key]
+    
     def apply_theme_to_widget(self, widget: QWidget, scaling_factor=1.0):
         """Apply the current theme to a widget"""
         theme = self.get_current_theme()
         
-        # Create a palette for the widget
-        palette = QPalette()
-        palette.setColor(QPalette.ColorRole.Window, theme['main_bg'])
-        palette.setColor(QPalette.ColorRole.WindowText, theme['main_fg'])
-        palette.setColor(QPalette.ColorRole.Base, theme['editor_bg'])
-        palette.setColor(QPalette.ColorRole.Text, theme['editor_fg'])
-        palette.setColor(QPalette.ColorRole.Button, theme['button_bg'])
-        palette.setColor(QPalette.ColorRole.ButtonText, theme['button_fg'])
-        palette.setColor(QPalette.ColorRole.Highlight, theme['highlight'])
-        palette.setColor(QPalette.ColorRole.HighlightedText, QColor('white'))
-        
         # Apply the palette to the widget
-        widget.setPalette(palette)
+        widget.setPalette(self.palette())
         
         # Apply fonts based on theme
-        if isinstance(widget, QTextEdit) and "code_font_family" in theme:
-            font = QFont(theme['code_font_family'])
-            font.setPointSize(int(11 * scaling_factor))
-            widget.setFont(font)
+        if isinstance(widget, (QTextEdit, QPlainTextEdit)) and "code_font_family" in theme:
+            widget.setFont(self.font('code_font_family', 11, scaling_factor))
         elif "font_family" in theme:
-            font = QFont(theme['font_family'])
-            font.setPointSize(int(10 * scaling_factor))
-            widget.setFont(font)
+            widget.setFont(self.font('font_family', 10, scaling_factor))
+
+
+def resolve_font_family(families, fixed_pitch=False):
+    """Pick the first installed family from a CSS-like comma-separated list
+
+    Generic names such as monospace or sans-serif map to the system fonts, and
+    the system font is used when nothing in the list is installed.
+    """
+    global _installed_families
+    if _installed_families is None:
+        _installed_families = {family.lower(): family for family in QFontDatabase.families()}
+    
+    for candidate in families.split(","):
+        candidate = candidate.strip().strip('"\'')
+        if candidate.lower() in ("monospace", "ui-monospace"):
+            return QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont).family()
+        if candidate.lower() in ("sans-serif", "serif", "system-ui", "-apple-system"):
+            return QFontDatabase.systemFont(QFontDatabase.SystemFont.GeneralFont).family()
+        if candidate.lower() in _installed_families:
+            return _installed_families[candidate.lower()]
+    
+    system_font = QFontDatabase.SystemFont.FixedFont if fixed_pitch else QFontDatabase.SystemFont.GeneralFont
+    return QFontDatabase.systemFont(system_font).family()
+
+
+# Families known to QFontDatabase, looked up once on first use
+_installed_families = None
 
 
 class SyntaxHighlighter(QSyntaxHighlighter):
@@ -223,59 +524,17 @@ class SyntaxHighlighter(QSyntaxHighlighter):
     def create_formatting_rules(self):
         """Define the syntax highlighting rules for programming languages"""
         self.highlighting_rules = []
-        theme_colors = self.theme.get_current_theme()
-        
-        # Keywords format (if, else, for, while, etc.)
-        keyword_format = QTextCharFormat()
-        if self.theme.theme_type == ThemeType.MATRIX:
-            keyword_format.setForeground(QColor("#569CD6"))
-        elif self.theme.theme_type == ThemeType.APPLE_LIGHT:
-            keyword_format.setForeground(QColor("#0000FF"))
-        else:
-            keyword_format.setForeground(QColor("#0000FF"))
-        keyword_format.setFontWeight(QFont.Weight.Bold)
-        
-        # String format (for string literals)
-        string_format = QTextCharFormat()
-        if self.theme.theme_type == ThemeType.MATRIX:
-            string_format.setForeground(QColor("#CE9178"))
-        elif self.theme.theme_type == ThemeType.APPLE_LIGHT:
-            string_format.setForeground(QColor("#A31515"))
-        else:
-            string_format.setForeground(QColor("#A31515"))
-            
-        # Comment format (for code comments)
-        comment_format = QTextCharFormat()
-        if self.theme.theme_type == ThemeType.MATRIX:
-            comment_format.setForeground(QColor("#6A9955"))
-        elif self.theme.theme_type == ThemeType.APPLE_LIGHT:
-            comment_format.setForeground(QColor("#008000"))
-        else:
-            comment_format.setForeground(QColor("#008000"))
-            
-        # Function format (for function names)
-        function_format = QTextCharFormat()
-        if self.theme.theme_type == ThemeType.MATRIX:
-            function_format.setForeground(QColor("#DCDCAA"))
-        elif self.theme.theme_type == ThemeType.APPLE_LIGHT:
-            function_format.setForeground(QColor("#795E26"))
-        else:
-            function_format.setForeground(QColor("#795E26"))
-            
-        # Class format (for class names)
-        class_format = QTextCharFormat()
-        if self.theme.theme_type == ThemeType.MATRIX:
-            class_format.setForeground(QColor("#4EC9B0"))
-        elif self.theme.theme_type == ThemeType.APPLE_LIGHT:
-            class_format.setForeground(QColor("#267F99"))
-        else:
-            class_format.setForeground(QColor("#267F99"))
+        
+        # Formats for keywords, strings, comments, functions and classes are
+        # compiled once per theme in its ThemeBundle
+        formats = self.theme.bundle().syntax_formats
         
         self.highlighting_rules.append((
             QRegularExpression("\\bclass\\s+\\w+"), 
-            class_format
+            formats['class']
         ))
     
+    @timed("highlightBlock")
     def highlightBlock(self, text):
         """Highlight a block of text based on the syntax rules"""
         for pattern, format in self.highlighting_rules:
@@ -285,13 +544,901 @@ class SyntaxHighlighter(QSyntaxHighlighter):
                 self.setFormat(match.capturedStart(), match.capturedLength(), format)
 
 
+class LineNumberArea(QWidget):
+    """Gutter beside the code editor that shows line numbers"""
+    
+    def __init__(self, editor):
+        super().__init__(editor)
+        self.editor = editor
+    
+    def sizeHint(self):
+        return QSize(self.editor.line_number_area_width(), 0)
+    
+    def paintEvent(self, event):
+        self.editor.paint_line_numbers(event)
+
+
+class CodeEditor(QPlainTextEdit):
+    """Plain text editor for code notes, with a line number gutter
+    
+    QPlainTextEdit lays out only the lines scrolled into view and scrolls by
+    line, so large code notes open, scroll and take typing much faster than in
+    a QTextEdit. Lines are not wrapped unless asked for.
+    """
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.line_number_area = LineNumberArea(self)
+        self.line_number_digits = 0
+        
+        # The gutter only grows when the line count gains a digit
+        self.blockCountChanged.connect(self.update_line_number_width)
+        self.updateRequest.connect(self.update_line_number_area)
+        self.update_line_number_width()
+    
+    def setDocument(self, document):
+        """Show another document and size the gutter for its line count"""
+        super().setDocument(document)
+        self.update_line_number_width()
+    
+    def line_number_area_width(self):
+        """Width of the gutter for the current number of digits"""
+        return 10 + self.fontMetrics().horizontalAdvance("9") * self.line_number_digits
+    
+    def update_line_number_width(self, _block_count=0):
+        """Resize the gutter if the line count needs more or fewer digits"""
+        digits = max(len(str(self.blockCount())), 2)
+        if digits == self.line_number_digits:
+            return
+        self.line_number_digits = digits
+        self.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
+        self.resize_line_number_area()
+    
+    def update_line_number_area(self, rect, dy):
+        """Scroll or repaint the gutter along with the text"""
+        if dy:
+            self.line_number_area.scroll(0, dy)
+        else:
+            self.line_number_area.update(0, rect.y(), self.line_number_area.width(), rect.height())
+    
+    def resize_line_number_area(self):
+        """Place the gutter along the left edge of the editor"""
+        rect = self.contentsRect()
+        self.line_number_area.setGeometry(QRect(rect.left(), rect.top(), self.line_number_area_width(), rect.height()))
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resize_line_number_area()
+    
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        # A new font changes the width of the digits
+        if event.type() == QEvent.Type.FontChange:
+            self.line_number_digits = 0
+            self.update_line_number_width()
+    
+    def paint_line_numbers(self, event):
+        """Paint the numbers of the visible lines into the gutter"""
+        painter = QPainter(self.line_number_area)
+        palette = self.palette()
+        painter.fillRect(event.rect(), palette.color(QPalette.ColorRole.Window))
+        number_color = QColor(palette.color(QPalette.ColorRole.WindowText))
+        number_color.setAlpha(140)
+        painter.setPen(number_color)
+        
+        width = self.line_number_area.width() - 5
+        height = self.fontMetrics().height()
+        block = self.firstVisibleBlock()
+        top = round(self.blockBoundingGeometry(block).translated(self.contentOffset()).top())
+        while block.isValid() and top <= event.rect().bottom():
+            bottom = top + round(self.blockBoundingRect(block).height())
+            if block.isVisible() and bottom >= event.rect().top():
+                painter.drawText(0, top, width, height, Qt.AlignmentFlag.AlignRight, str(block.blockNumber() + 1))
+            block = block.next()
+            top = bottom
+
+
+class CodeRun(QObject):
+    """A single execution of a code snippet in its own child interpreter"""
+    
+    output_received = pyqtSignal(str, bool)  # text, is_error
+    status_changed = pyqtSignal(str)  # human readable status
+    finished = pyqtSignal(object)  # the CodeRun itself
+    
+    def __init__(self, code, title, limits: RunLimits, parent=None, cached=None, profile=None):
+        super().__init__(parent)
+        self.code = code
+        self.limits = limits
+        self.cached = cached  # RunCache entry to replay instead of running
+        self.profile = profile  # ProfileOptions when running under the profiler
+        self.profile_path = None
+        self.profile_report = None
+        self.record = RunRecord(title)
+        self.script_path = None
+        self.process = None
+        self.stop_requested = False
+        self.stdout_parts = []
+        self.stderr_parts = []
+        self.done = False  # Set once the pool has recorded the run
+        self.released = False  # Set once nothing shows the run's output any more
+        
+        # Incremental decoders so multi-byte characters split across reads survive
+        self.stdout_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.stderr_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        
+        self.elapsed = QElapsedTimer()
+        self.wall_timer = QTimer(self)
+        self.wall_timer.setSingleShot(True)
+        self.wall_timer.timeout.connect(self.wall_time_exceeded)
+    
+    def is_running(self):
+        """Return True while the child process is alive"""
+        return self.process is not None and self.process.state() != QProcess.ProcessState.NotRunning
+    
+    def start(self):
+        """Write the snippet to its own temp file and start the child interpreter"""
+        self.record.started_at = datetime.datetime.now()
+        if self.cached is not None:
+            self.replay_cached()
+            return
+        self.record.status = "running"
+        try:
+            self.script_path = write_run_script(self.code)
+        except OSError as e:
+            self.output_received.emit(f"Failed to write code to a temp file: {e}\n", True)
+            self.finish("failed")
+            return
+        
+        self.process = QProcess(self)
+        env = QProcessEnvironment.systemEnvironment()
+        env.insert("PYTHONIOENCODING", "utf-8")
+        self.process.setProcessEnvironment(env)
+        self.process.readyReadStandardOutput.connect(self.read_stdout)
+        self.process.readyReadStandardError.connect(self.read_stderr)
+        self.process.finished.connect(self.process_finished)
+        self.process.errorOccurred.connect(self.process_error)
+        
+        if self.profile is not None:
+            self.profile_path = make_profile_path()
+        command = build_command(self.script_path, self.limits, self.profile_path, self.profile)
+        self.elapsed.start()
+        self.process.start(command[0], command[1:])
+        if self.limits.wall_time > 0:
+            self.wall_timer.start(int(self.limits.wall_time * 1000))
+        self.status_changed.emit("Running...")
+    
+    def replay_cached(self):
+        """Show a cached result instead of starting an interpreter"""
+        self.output_received.emit(self.cached["stdout"], False)
+        self.output_received.emit(self.cached["stderr"], True)
+        self.record.status = "cached"
+        self.record.exit_code = self.cached["exit_code"]
+        self.record.duration = self.cached["duration"]
+        self.status_changed.emit(self.record.describe())
+        self.finished.emit(self)
+    
+    def emit_output(self, text, is_error):
+        """Keep and forward a piece of streamed output"""
+        if text:
+            (self.stderr_parts if is_error else self.stdout_parts).append(text)
+            self.output_received.emit(text, is_error)
+    
+    def stdout_text(self):
+        """All stdout received so far"""
+        return "".join(self.stdout_parts)
+    
+    def stderr_text(self):
+        """All stderr received so far"""
+        return "".join(self.stderr_parts)
+    
+    def read_stdout(self):
+        """Stream stdout from the child process"""
+        data = bytes(self.process.readAllStandardOutput())
+        self.emit_output(self.stdout_decoder.decode(data), False)
+    
+    def read_stderr(self):
+        """Stream stderr from the child process"""
+        data = bytes(self.process.readAllStandardError())
+        self.emit_output(self.stderr_decoder.decode(data), True)
+    
+    def stop(self):
+        """Kill the snippet, or cancel it if it is still waiting in the queue"""
+        if self.is_running():
+            self.stop_requested = True
+            self.process.kill()
+            self.status_changed.emit("Stopping...")
+        elif self.record.status == "queued":
+            self.finish("cancelled")
+    
+    def wall_time_exceeded(self):
+        """Kill the snippet once the wall-clock limit has passed"""
+        if self.is_running():
+            self.record.status = "timed out"
+            self.process.kill()
+    
+    def process_finished(self, exit_code, exit_status):
+        """Record the result of the run"""
+        self.emit_output(self.stdout_decoder.decode(b"", final=True), False)
+        self.emit_output(self.stderr_decoder.decode(b"", final=True), True)
+        self.record.exit_code = exit_code
+        if self.record.status == "timed out":
+            status = "timed out"
+        elif self.stop_requested or exit_status == QProcess.ExitStatus.CrashExit:
+            status = "stopped"
+        else:
+            status = "finished"
+        self.finish(status)
+    
+    def process_error(self, error):
+        """Report failures to start the child interpreter"""
+        if error == QProcess.ProcessError.FailedToStart:
+            self.output_received.emit(f"Failed to run code: {self.process.errorString()}\n", True)
+            self.finish("failed")
+    
+    def finish(self, status):
+        """Finalize the run record and clean up the temp file"""
+        if self.record.status not in ("queued", "running", "timed out"):
+            return  # Already finished
+        self.wall_timer.stop()
+        self.record.status = status
+        if self.elapsed.isValid():
+            self.record.duration = self.elapsed.elapsed() / 1000.0
+        if self.script_path:
+            remove_run_script(self.script_path)
+        if self.profile_path:
+            try:
+                self.profile_report = ProfileReport.from_file(self.profile_path)
+            except (OSError, ValueError):
+                self.profile_report = None  # The snippet was killed before reporting
+            remove_profile_file(self.profile_path)
+        if status == "timed out":
+            self.status_changed.emit(
+                f"Killed after exceeding the {self.limits.wall_time:g}s time limit"
+            )
+        else:
+            self.status_changed.emit(self.record.describe())
+        self.finished.emit(self)
+
+
+class RunPool(QObject):
+    """Bounded pool that runs several code snippets in parallel"""
+    
+    run_submitted = pyqtSignal(object)  # CodeRun
+    run_finished = pyqtSignal(object)  # CodeRun
+    
+    def __init__(self, max_parallel=None, history_size=100, parent=None):
+        super().__init__(parent)
+        self.max_parallel = max_parallel or default_parallel_runs()
+        self.history_size = history_size
+        self.pending = []  # Runs waiting for a free slot
+        self.active = []  # Runs currently executing
+        self.history = []  # Finished RunRecords, newest last
+    
+    def submit(self, run: CodeRun):
+        """Queue a run and start it as soon as a slot is free"""
+        run.setParent(self)
+        run.finished.connect(self.handle_finished)
+        if run.cached is not None:
+            # Cached results are replayed immediately and never take a slot
+            self.run_submitted.emit(run)
+            run.start()
+            return
+        self.pending.append(run)
+        self.run_submitted.emit(run)
+        self.start_pending()
+    
+    def start_pending(self):
+        """Start queued runs until the pool is full"""
+        while self.pending and len(self.active) < self.max_parallel:
+            run = self.pending.pop(0)
+            self.active.append(run)
+            run.start()
+    
+    def handle_finished(self, run):
+        """Move a finished run into the history and start the next one"""
+        if run in self.active:
+            self.active.remove(run)
+        if run in self.pending:
+            self.pending.remove(run)
+        self.history.append(run.record)
+        del self.history[:-self.history_size]
+        run.done = True
+        self.run_finished.emit(run)
+        if run.released:
+            run.deleteLater()
+        self.start_pending()
+    
+    def release(self, run):
+        """Let a run go once its output pane is closed; it is deleted when it has finished
+        
+        Only the RunRecord stays in the history, so the captured output of
+        closed runs does not pile up over a session.
+        """
+        run.released = True
+        if run.done:
+            run.deleteLater()
+    
+    def stop_all(self):
+        """Cancel queued runs and kill running ones"""
+        for run in list(self.pending) + list(self.active):
+            run.stop()
+
+
+class RunOutputPane(QWidget):
+    """Output view for one code run"""
+    
+    def __init__(self, run: CodeRun):
+        super().__init__()
+        self.run = run
+        
+        layout = QVBoxLayout(self)
+        
+        self.output_text = QTextEdit()
+        self.output_text.setReadOnly(True)
+        if run.profile is None:
+            layout.addWidget(self.output_text)
+        else:
+            # Profiled runs get sortable tables next to the raw output
+            self.views = QTabWidget()
+            self.views.addTab(self.output_text, "Output")
+            self.functions_table = self.create_table(
+                ["Function", "Location", "Calls", "Self (s)", "Cumulative (s)"]
+            )
+            self.views.addTab(self.functions_table, "Profile")
+            if run.profile.trace_memory:
+                self.memory_label = QLabel("")
+                self.allocations_table = self.create_table(["Location", "Size (KiB)", "Blocks"])
+                memory_view = QWidget()
+                memory_layout = QVBoxLayout(memory_view)
+                memory_layout.setContentsMargins(0, 0, 0, 0)
+                memory_layout.addWidget(self.memory_label)
+                memory_layout.addWidget(self.allocations_table)
+                self.views.addTab(memory_view, "Memory")
+            layout.addWidget(self.views)
+            run.finished.connect(self.show_profile)
+        
+        status_layout = QHBoxLayout()
+        self.status_label = QLabel("Queued")
+        self.stop_btn = QPushButton("Stop")
+        self.stop_btn.clicked.connect(run.stop)
+        if run.cached is not None:
+            # Badge marking results that were served from the run cache
+            cached_badge = QLabel("CACHED")
+            cached_badge.setStyleSheet(
+                "background-color: #0A84FF; color: white; font-weight: bold; "
+                "border-radius: 3px; padding: 1px 6px;"
+            )
+            cached_badge.setToolTip("Result served from the run cache; use Force Re-run (Ctrl+F5) to run again")
+            status_layout.addWidget(cached_badge)
+        status_layout.addWidget(self.status_label)
+        status_layout.addStretch(1)
+        status_layout.addWidget(self.stop_btn)
+        layout.addLayout(status_layout)
+        
+        run.output_received.connect(self.append_output)
+        run.status_changed.connect(self.status_label.setText)
+        run.finished.connect(lambda _run: self.stop_btn.setEnabled(False))
+    
+    def create_table(self, headers):
+        """Create a read-only, sortable table for profile data"""
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        return table
+    
+    def fill_table(self, table, rows):
+        """Fill a table with rows of (text, sort key) cells"""
+        table.setSortingEnabled(False)
+        table.setRowCount(len(rows))
+        for row, cells in enumerate(rows):
+            for column, (text, key) in enumerate(cells):
+                table.setItem(row, column, SortableTableItem(text, key))
+        table.setSortingEnabled(True)
+    
+    def show_profile(self, run):
+        """Render the profile report of a finished run"""
+        report = run.profile_report
+        if report is None:
+            self.views.setTabText(1, "Profile (unavailable)")
+            return
+        
+        rows = []
+        for entry in report.functions:
+            location = f"{os.path.basename(entry['file'])}:{entry['line']}"
+            calls = entry['calls']
+            calls_text = str(calls) if calls == entry['primitive_calls'] else f"{calls}/{entry['primitive_calls']}"
+            rows.append([
+                (entry['function'], entry['function']),
+                (location, location),
+                (calls_text, calls),
+                (f"{entry['total_time']:.6f}", entry['total_time']),
+                (f"{entry['cumulative_time']:.6f}", entry['cumulative_time'])
+            ])
+        self.fill_table(self.functions_table, rows)
+        self.functions_table.sortItems(3, Qt.SortOrder.DescendingOrder)
+        self.views.setCurrentIndex(1)
+        
+        if run.profile.trace_memory:
+            if report.peak_memory is not None:
+                self.memory_label.setText(f"Peak traced memory: {report.peak_memory / 1024:.1f} KiB")
+            rows = []
+            for entry in report.allocations:
+                location = f"{os.path.basename(entry['file'])}:{entry['line']}"
+                rows.append([
+                    (location, location),
+                    (f"{entry['size'] / 1024:.1f}", entry['size']),
+                    (str(entry['count']), entry['count'])
+                ])
+            self.fill_table(self.allocations_table, rows)
+            self.allocations_table.sortItems(1, Qt.SortOrder.DescendingOrder)
+    
+    def append_output(self, text, is_error=False):
+        """Append streamed output to the end of the output view"""
+        if not text:
+            return
+        cursor = self.output_text.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        format = QTextCharFormat()
+        if is_error:
+            format.setForeground(QColor("#FF5555"))
+        cursor.insertText(text, format)
+        self.output_text.setTextCursor(cursor)
+        self.output_text.ensureCursorVisible()
+
+
+class RunConsole(QDialog):
+    """Non-modal window with one output pane per run and the run history"""
+    
+    def __init__(self, parent, pool: RunPool):
+        super().__init__(parent)
+        self.pool = pool
+        self.setWindowTitle("Code Output")
+        self.setMinimumSize(600, 400)
+        
+        layout = QVBoxLayout(self)
+        
+        self.tabs = QTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.tabs.tabCloseRequested.connect(self.close_tab)
+        layout.addWidget(self.tabs)
+        
+        # Run history with timings
+        self.history_tree = QTreeWidget()
+        self.history_tree.setHeaderLabels(["Note", "Started", "Queued", "Duration", "Result"])
+        self.history_tree.setRootIsDecorated(False)
+        self.tabs.addTab(self.history_tree, "History")
+        self.tabs.tabBar().setTabButton(0, self.tabs.tabBar().ButtonPosition.RightSide, None)
+        
+        button_layout = QHBoxLayout()
+        stop_all_btn = QPushButton("Stop All")
+        stop_all_btn.clicked.connect(pool.stop_all)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.hide)
+        button_layout.addStretch(1)
+        button_layout.addWidget(stop_all_btn)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+        
+        pool.run_submitted.connect(self.add_run)
+        pool.run_finished.connect(self.add_history_entry)
+    
+    def add_run(self, run):
+        """Open an output pane for a newly submitted run"""
+        pane = RunOutputPane(run)
+        index = self.tabs.addTab(pane, run.record.title)
+        self.tabs.setCurrentIndex(index)
+        self.show()
+        self.raise_()
+    
+    def add_history_entry(self, run):
+        """Record a finished run in the history tab"""
+        record = run.record
+        started = record.started_at.strftime("%H:%M:%S") if record.started_at else "-"
+        queued = f"{record.wait_time:.2f}s" if record.wait_time is not None else "-"
+        duration = f"{record.duration:.2f}s" if record.duration is not None else "-"
+        result = record.status if record.exit_code is None else f"{record.status} ({record.exit_code})"
+        self.history_tree.insertTopLevelItem(
+            0, QTreeWidgetItem([record.title, started, queued, duration, result])
+        )
+        while self.history_tree.topLevelItemCount() > self.pool.history_size:
+            self.history_tree.takeTopLevelItem(self.history_tree.topLevelItemCount() - 1)
+    
+    def close_tab(self, index):
+        """Close a run's output pane, stopping the run if needed"""
+        pane = self.tabs.widget(index)
+        if isinstance(pane, RunOutputPane):
+            pane.run.stop()
+            self.tabs.removeTab(index)
+            self.pool.release(pane.run)
+            pane.run = None
+            pane.deleteLater()
+
+
+class SortableTableItem(QTableWidgetItem):
+    """Table item that sorts by a separate key, e.g. numbers shown as text"""
+    
+    def __init__(self, text, key):
+        super().__init__(text)
+        self.sort_key = key
+    
+    def __lt__(self, other):
+        if isinstance(other, SortableTableItem):
+            try:
+                return self.sort_key < other.sort_key
+            except TypeError:
+                return str(self.sort_key) < str(other.sort_key)
+        return super().__lt__(other)
+
+
+class BatchRunSignals(QObject):
+    """Signals used to report batch progress from the worker thread"""
+    
+    progress = pyqtSignal(int, int, object)  # done, total, SnippetResult
+    finished = pyqtSignal(object)  # list of SnippetResults
+
+
+class BatchRunDialog(QDialog):
+    """Dialog that runs every matching code note and shows a summary table"""
+    
+    def __init__(self, parent, notes, categories, tags, limits: RunLimits):
+        super().__init__(parent)
+        self.notes = notes
+        self.limits = limits
+        self.results = []
+        self.cancel_event = None
+        self.setWindowTitle("Run All Code Notes")
+        self.setMinimumSize(700, 450)
+        
+        layout = QVBoxLayout(self)
+        
+        # Filters and pool settings
+        form = QFormLayout()
+        self.tag_combo = QComboBox()
+        self.tag_combo.addItem("(All)")
+        self.tag_combo.addItems(tags)
+        form.addRow("Tag:", self.tag_combo)
+        
+        self.category_combo = QComboBox()
+        self.category_combo.addItem("(All)")
+        self.category_combo.addItems(categories)
+        form.addRow("Category:", self.category_combo)
+        
+        self.jobs_input = QSpinBox()
+        self.jobs_input.setRange(1, 64)
+        self.jobs_input.setValue(default_parallel_runs())
+        form.addRow("Parallel runs:", self.jobs_input)
+        
+        self.timeout_input = QDoubleSpinBox()
+        self.timeout_input.setRange(0, 24 * 3600)
+        self.timeout_input.setSuffix(" s")
+        self.timeout_input.setSpecialValueText("Unlimited")
+        self.timeout_input.setValue(limits.wall_time)
+        form.addRow("Timeout per note:", self.timeout_input)
+        layout.addLayout(form)
+        
+        self.progress_bar = QProgressBar()
+        layout.addWidget(self.progress_bar)
+        
+        # Summary table
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Note", "Exit", "Status", "Time (s)", "Digest"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.currentCellChanged.connect(self.show_result_output)
+        layout.addWidget(self.table)
+        
+        self.output_text = QTextEdit()
+        self.output_text.setReadOnly(True)
+        self.output_text.setMaximumHeight(120)
+        layout.addWidget(self.output_text)
+        
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+        
+        button_layout = QHBoxLayout()
+        self.run_btn = QPushButton("Run")
+        self.run_btn.clicked.connect(self.start)
+        self.stop_btn = QPushButton("Stop")
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.clicked.connect(self.stop)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        button_layout.addStretch(1)
+        button_layout.addWidget(self.run_btn)
+        button_layout.addWidget(self.stop_btn)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+        
+        self.signals = BatchRunSignals()
+        self.signals.progress.connect(self.batch_progress)
+        self.signals.finished.connect(self.batch_finished)
+    
+    def start(self):
+        """Start the batch on a background thread"""
+        tag = self.tag_combo.currentText()
+        category = self.category_combo.currentText()
+        jobs = select_code_notes(
+            self.notes,
+            tag=None if tag == "(All)" else tag,
+            category=None if category == "(All)" else category
+        )
+        if not jobs:
+            self.summary_label.setText("No code notes match the selected filters")
+            return
+        
+        limits = RunLimits(self.timeout_input.value(), self.limits.cpu_time, self.limits.memory_mb)
+        self.cancel_event = threading.Event()
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(0)
+        self.output_text.clear()
+        self.progress_bar.setRange(0, len(jobs))
+        self.progress_bar.setValue(0)
+        self.summary_label.setText(f"Running {len(jobs)} code notes...")
+        self.run_btn.setEnabled(False)
+        self.stop_btn.setEnabled(True)
+        
+        worker = threading.Thread(
+            target=self.run_jobs,
+            args=(jobs, limits, self.jobs_input.value(), self.cancel_event),
+            daemon=True
+        )
+        worker.start()
+    
+    def run_jobs(self, jobs, limits, max_workers, cancel_event):
+        """Worker thread body; results are handed back through signals"""
+        results = run_batch(
+            jobs, limits, max_workers,
+            progress=lambda done, total, result: self.signals.progress.emit(done, total, result),
+            cancel_event=cancel_event
+        )
+        self.signals.finished.emit(results)
+    
+    def stop(self):
+        """Cancel the remaining notes and kill running ones"""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.stop_btn.setEnabled(False)
+    
+    def batch_progress(self, done, total, result):
+        """Add a finished note to the summary table"""
+        self.progress_bar.setValue(done)
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        exit_code = "-" if result.exit_code is None else str(result.exit_code)
+        values = [
+            (result.title, result.title),
+            (exit_code, -1 if result.exit_code is None else result.exit_code),
+            (result.status, result.status),
+            (f"{result.duration:.2f}", result.duration),
+            (result.digest, result.digest)
+        ]
+        for column, (text, key) in enumerate(values):
+            item = SortableTableItem(text, key)
+            if column == 0:
+                item.setData(Qt.ItemDataRole.UserRole, result)
+            if not result.ok:
+                item.setForeground(QColor("#FF5555"))
+            self.table.setItem(row, column, item)
+    
+    def batch_finished(self, results):
+        """Show the batch summary"""
+        self.results = results
+        self.table.setSortingEnabled(True)
+        self.run_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+        passed = sum(1 for r in results if r.ok)
+        total_time = sum(r.duration for r in results)
+        self.summary_label.setText(
+            f"{passed}/{len(results)} passed, {len(results) - passed} failed, "
+            f"{total_time:.2f}s of run time"
+        )
+    
+    def show_result_output(self, row, column, previous_row, previous_column):
+        """Show the captured output of the selected note"""
+        item = self.table.item(row, 0)
+        if item is None:
+            return
+        result = item.data(Qt.ItemDataRole.UserRole)
+        self.output_text.setPlainText(result.stdout + result.stderr)
+    
+    def closeEvent(self, event):
+        """Stop the batch when the dialog is closed"""
+        self.stop()
+        event.accept()
+
+
+class PooledDocument:
+    """A live document for one note, kept by the DocumentPool"""
+    
+    def __init__(self, note_id, document, highlighter, content, is_code, theme_type):
+        self.note_id = note_id
+        self.document = document
+        self.highlighter = highlighter  # None for rich text
+        self.content = content  # Note content the document was built from or last saved as
+        self.is_code = is_code
+        self.theme_type = theme_type  # Theme the highlighting was done with
+        self.cost = 0
+        self.loader = None  # ProgressiveLoader while the content is still being loaded
+    
+    def estimate_cost(self):
+        """Rough memory use of the document in bytes: text, formats and layout"""
+        self.cost = self.document.characterCount() * 16 + self.document.blockCount() * 256
+        return self.cost
+
+
+class DocumentPool:
+    """LRU pool of live documents keyed by note id, kept within a memory budget
+    
+    Switching back to a pooled note swaps its document into the editor instead of
+    parsing the content again, and keeps its undo history.
+    """
+    
+    def __init__(self, budget=DOCUMENT_POOL_BUDGET):
+        self.budget = budget
+        self.entries = OrderedDict()  # note id -> PooledDocument, least recently used first
+        self.used = 0
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def get(self, note_id):
+        """Return the pooled document for note_id and mark it as recently used"""
+        entry = self.entries.get(note_id)
+        if entry is not None:
+            self.entries.move_to_end(note_id)
+        return entry
+    
+    def put(self, note_id, entry):
+        """Add a document as the most recently used; return the entry it replaced, or None"""
+        old = self.remove(note_id)
+        self.entries[note_id] = entry
+        self.used += entry.estimate_cost()
+        return old if old is not entry else None
+    
+    def touch(self, note_id):
+        """Re-measure a document after it was edited"""
+        entry = self.entries.get(note_id)
+        if entry is not None:
+            self.used -= entry.cost
+            self.used += entry.estimate_cost()
+    
+    def trim(self):
+        """Evict least recently used documents until the pool fits its budget; return them"""
+        released = []
+        # The most recently used document stays even if it alone is over budget
+        while self.used > self.budget and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.used -= evicted.cost
+            released.append(evicted)
+        return released
+    
+    def remove(self, note_id):
+        """Take a document out of the pool and return it, or None"""
+        entry = self.entries.pop(note_id, None)
+        if entry is not None:
+            self.used -= entry.cost
+        return entry
+    
+    def clear(self):
+        """Empty the pool and return everything that was in it"""
+        released = list(self.entries.values())
+        self.entries.clear()
+        self.used = 0
+        return released
+
+
+def iter_lines(content, size):
+    """Yield text in pieces of at least size characters that end after a newline"""
+    start = 0
+    while start < len(content):
+        end = content.find("\n", start + size)
+        end = len(content) if end < 0 else end + 1
+        yield content[start:end]
+        start = end
+
+
+class ProgressiveLoader(QObject):
+    """Fills a document with note content a piece at a time from the event loop
+    
+    Each event loop iteration inserts pieces for PROGRESSIVE_LOAD_SLICE seconds,
+    so the editor stays responsive and lays out and highlights only what was
+    just added. Undo is off until the load is done.
+    """
+    
+    progress = pyqtSignal(int)  # Percent of the content loaded
+    finished = pyqtSignal()
+    
+    def __init__(self, document, content, is_code, parent=None):
+        super().__init__(parent)
+        self.document = document
+        self.is_code = is_code
+        self.total = len(content)
+        self.loaded = 0
+        if is_code:
+            self.pieces = iter_lines(content, PROGRESSIVE_LOAD_PIECE)
+        else:
+            self.pieces = iter_html_blocks(content, PROGRESSIVE_LOAD_PIECE)
+        self.cursor = None  # Created with the first piece
+        self.timer = QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.load_slice)
+    
+    def start(self):
+        """Load the first piece now and the rest from the event loop"""
+        self.document.setUndoRedoEnabled(False)
+        self.load_piece(next(self.pieces, ""))
+        self.timer.start()
+    
+    def stop(self):
+        """Stop loading, e.g. because the document is being deleted"""
+        self.timer.stop()
+    
+    def percent(self):
+        """Return how much of the content has been loaded, in percent"""
+        return self.loaded * 100 // max(self.total, 1)
+    
+    def load_piece(self, piece):
+        """Append one piece of the content to the document"""
+        self.loaded += len(piece)
+        if self.cursor is None:
+            if self.is_code:
+                self.document.setPlainText(piece)
+            else:
+                self.document.setHtml(piece)
+            self.cursor = QTextCursor(self.document)
+            return
+        
+        self.cursor.movePosition(QTextCursor.MoveOperation.End)
+        if self.is_code:
+            self.cursor.insertText(piece)
+            return
+        
+        # Pieces after the first start with a paragraph; inserting a fragment
+        # would merge it into the last one, so give it a block of its own format
+        part = QTextDocument()
+        part.setDefaultFont(self.document.defaultFont())
+        part.setDefaultStyleSheet(self.document.defaultStyleSheet())
+        part.setHtml(piece)
+        first = part.begin()
+        self.cursor.insertBlock(first.blockFormat(), first.charFormat())
+        self.cursor.insertFragment(QTextDocumentFragment(part))
+    
+    def load_slice(self):
+        """Insert pieces for one time slice and report progress"""
+        deadline = time.perf_counter() + PROGRESSIVE_LOAD_SLICE
+        while time.perf_counter() < deadline:
+            piece = next(self.pieces, None)
+            if piece is None:
+                self.timer.stop()
+                self.document.setUndoRedoEnabled(True)
+                self.document.setModified(False)
+                self.finished.emit()
+                return
+            self.load_piece(piece)
+        self.progress.emit(self.percent())
+
+
 class NoteEditor(QWidget):
     """Rich text and code editor for notes"""
     
-    def __init__(self, theme_instance):
+    def __init__(self, theme_instance, defer_code_editor=False):
         super().__init__()
         self.theme = theme_instance
         self.mode = "text"  # Either "text" or "code"
+        self.note_title = ""
+        self.run_limits = RunLimits()
+        self.run_cache = RunCache()
+        self.run_cache_enabled = False
+        self.trace_allocations = False
+        self.run_pool = RunPool(parent=self)
+        self.run_console = None  # Created on first use
+        self.documents = DocumentPool()
+        self.current_document = None  # PooledDocument shown in the active editor
+        self.unpooled_document = None  # Document for content shown without a note id
         
         # Set up the layout
         self.layout = QVBoxLayout(self)
@@ -300,22 +1447,29 @@ class NoteEditor(QWidget):
         # Create the editor toolbar
         self.create_toolbar()
         
+        # Progress of a large note that is still loading
+        self.load_progress = QProgressBar()
+        self.load_progress.setFormat("Loading note... %p%")
+        self.load_progress.setVisible(False)
+        self.layout.addWidget(self.load_progress)
+        
         # Create the tab widget for different editor modes
         self.tab_widget = QTabWidget()
         self.text_editor = QTextEdit()
-        self.code_editor = QTextEdit()
         
-        # Add syntax highlighter to code editor
-        self.highlighter = SyntaxHighlighter(self.code_editor.document(), self.theme)
+        # Each editor has a blank document of its own to show when no note is open
+        self.blank_text = self.create_document(None, "", False)
+        self.text_editor.setDocument(self.blank_text.document)
         
-        # Set monospace font for code editor
-        code_font = QFont(self.theme.get_current_theme()['code_font_family'])
-        code_font.setPointSize(12)
-        self.code_editor.setFont(code_font)
+        # The code editor and its highlighter can be built after the first paint;
+        # until then the Code tab holds an empty placeholder
+        self.code_editor = None
+        self.blank_code = None
+        self.highlighter = None  # Highlighter of the document in the code editor
         
         # Add the editors to the tab widget
         self.tab_widget.addTab(self.text_editor, "Rich Text")
-        self.tab_widget.addTab(self.code_editor, "Code")
+        self.tab_widget.addTab(QWidget(), "Code")
         
         # Connect tab change signal
         self.tab_widget.currentChanged.connect(self.tab_changed)
@@ -325,10 +1479,51 @@ class NoteEditor(QWidget):
         
         # Apply theme
         self.apply_theme()
+        
+        if not defer_code_editor:
+            self.build_code_editor()
+    
+    def build_code_editor(self):
+        """Create the code editor and its syntax highlighter (once)"""
+        if self.code_editor is not None:
+            return
+        self.code_editor = CodeEditor()
+        
+        # Set monospace font for code editor
+        self.code_editor.setFont(self.theme.font('code_font_family', 12))
+        self.theme.apply_theme_to_widget(self.code_editor)
+        
+        # Start with a blank document and its syntax highlighter
+        self.blank_code = self.create_document(None, "", True)
+        self.code_editor.setDocument(self.blank_code.document)
+        self.highlighter = self.blank_code.highlighter
+        
+        # Swap the placeholder for the real editor without emitting tab changes
+        current_index = self.tab_widget.currentIndex()
+        self.tab_widget.blockSignals(True)
+        placeholder = self.tab_widget.widget(1)
+        self.tab_widget.removeTab(1)
+        self.tab_widget.insertTab(1, self.code_editor, "Code")
+        self.tab_widget.setCurrentIndex(current_index)
+        self.tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+    
+    def show_run_console(self):
+        """Show the code output window, creating it on first use"""
+        if self.run_console is None:
+            self.run_console = RunConsole(self, self.run_pool)
+        self.run_console.show()
+    
+    def submit_run(self, run):
+        """Hand a run to the pool, making sure its output pane exists"""
+        if self.run_console is None:
+            self.run_console = RunConsole(self, self.run_pool)
+        self.run_pool.submit(run)
     
     def create_toolbar(self):
         """Create the editor toolbar with formatting options"""
         self.toolbar = QWidget()
+        self.toolbar.setObjectName("editorToolbar")
         toolbar_layout = QHBoxLayout(self.toolbar)
         toolbar_layout.setContentsMargins(5, 5, 5, 5)
         
@@ -356,7 +1551,7 @@ class NoteEditor(QWidget):
         # Add run code button (for code mode)
         self.run_btn = QPushButton("▶ Run")
         self.run_btn.setToolTip("Run Code (F5)")
-        self.run_btn.clicked.connect(self.run_code)
+        self.run_btn.clicked.connect(lambda: self.run_code())
         self.run_btn.setVisible(False)  # Hidden initially
         
         # Add buttons to toolbar
@@ -381,6 +1576,7 @@ class NoteEditor(QWidget):
             self.run_btn.setVisible(False)
         else:  # Code mode
             self.mode = "code"
+            self.build_code_editor()
             self.italic_btn.setVisible(False)
             self.underline_btn.setVisible(False)
             self.color_btn.setVisible(False)
@@ -388,31 +1584,22 @@ class NoteEditor(QWidget):
     
     def apply_theme(self):
         """Apply the current theme to all editor components"""
-        theme = self.theme.get_current_theme()
-        
-        # Apply theme to toolbar
-        self.toolbar.setStyleSheet(f"background-color: {theme['toolbar_bg'].name()};")
+        # Colors of the toolbar and its buttons come from the application style sheet
         
         # Apply theme to editors
         self.theme.apply_theme_to_widget(self.text_editor)
-        self.theme.apply_theme_to_widget(self.code_editor)
-        
-        # Apply theme to buttons
-        for btn in [self.bold_btn, self.italic_btn, self.underline_btn, self.color_btn, self.run_btn]:
-            btn.setStyleSheet(
-                f"background-color: {theme['button_bg'].name()}; "
-                f"color: {theme['button_fg'].name()}; "
-                f"border: 1px solid {theme['border'].name()}; "
-                f"padding: 5px;"
-            )
+        if self.code_editor is not None:
+            self.theme.apply_theme_to_widget(self.code_editor)
         
         # Completely recreate syntax highlighting rules for code editor
-        if hasattr(self, 'highlighter'):
+        if self.highlighter is not None:
             # Force recreation of highlighting rules
             self.highlighter.create_formatting_rules()
             
             # Force rehighlighting of the entire document
             self.highlighter.rehighlight()
+            if self.current_document is not None and self.current_document.highlighter is self.highlighter:
+                self.current_document.theme_type = self.theme.theme_type
     
     def format_bold(self):
         """Apply bold formatting to selected text"""
@@ -459,117 +1646,290 @@ class NoteEditor(QWidget):
                     cursor.mergeCharFormat(format)
                     self.text_editor.setTextCursor(cursor)
     
-    def run_code(self):
-        """Run the code in the code editor"""
+    @timed("run_code")
+    def run_code(self, force=False):
+        """Run the code in the code editor without blocking the GUI"""
         if self.mode == "code":
             code = self.code_editor.toPlainText()
             if code:
-                try:
-                    # Create a temporary file for the code
-                    temp_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp_code.py")
-                    with open(temp_file, "w") as f:
-                        f.write(code)
-                    
-                    # Execute the code and capture output
-                    result = subprocess.run(
-                        [sys.executable, temp_file], 
-                        capture_output=True, 
-                        text=True
-                    )
-                    
-                    # Show the output in a dialog
-                    output_dialog = QDialog(self)
-                    output_dialog.setWindowTitle("Code Output")
-                    output_dialog.setMinimumSize(600, 400)
-                    
-                    layout = QVBoxLayout(output_dialog)
-                    
-                    output_text = QTextEdit()
-                    output_text.setReadOnly(True)
-                    
-                    # Format and display output
-                    if result.stdout:
-                        output_text.append("--- STDOUT ---\n")
-                        output_text.append(result.stdout)
-                    
-                    if result.stderr:
-                        output_text.append("\n--- STDERR ---\n")
-                        output_text.append(result.stderr)
-                    
-                    close_btn = QPushButton("Close")
-                    close_btn.clicked.connect(output_dialog.accept)
-                    
-                    layout.addWidget(output_text)
-                    layout.addWidget(close_btn)
-                    
-                    output_dialog.exec()
-                    
-                    # Clean up the temp file
-                    try:
-                        os.remove(temp_file)
-                    except:
-                        pass
+                cached = None
+                if self.run_cache_enabled and not force:
+                    cached = self.run_cache.get(code)
                 
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Failed to run code: {str(e)}")
+                # Each run gets its own temp file and output pane in the run console
+                run = CodeRun(code, self.note_title, self.run_limits, cached=cached)
+                if self.run_cache_enabled and cached is None:
+                    run.finished.connect(self.cache_run_result)
+                self.submit_run(run)
+    
+    def profile_code(self):
+        """Run the code under cProfile and show the hot functions"""
+        if self.mode == "code":
+            code = self.code_editor.toPlainText()
+            if code:
+                profile = ProfileOptions(trace_memory=self.trace_allocations)
+                self.submit_run(
+                    CodeRun(code, self.note_title, self.run_limits, profile=profile)
+                )
     
+    def set_trace_allocations(self, enabled):
+        """Also record allocations with tracemalloc when profiling"""
+        self.trace_allocations = enabled
+    
+    def force_run_code(self):
+        """Run the code even if a cached result exists"""
+        self.run_code(force=True)
+    
+    def set_run_cache_enabled(self, enabled):
+        """Turn the run result cache on or off"""
+        self.run_cache_enabled = enabled
+    
+    def cache_run_result(self, run):
+        """Store the output of a completed run in the run cache"""
+        if run.record.status == "finished":
+            self.run_cache.put(
+                run.code, run.stdout_text(), run.stderr_text(),
+                run.record.exit_code, run.record.duration
+            )
+    
+    def edit_run_limits(self):
+        """Edit the wall-clock, CPU-time and memory limits for code runs"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Run Limits")
+        dialog.setMinimumWidth(300)
+        
+        layout = QVBoxLayout(dialog)
+        form = QFormLayout()
+        
+        wall_input = QDoubleSpinBox()
+        wall_input.setRange(0, 24 * 3600)
+        wall_input.setSuffix(" s")
+        wall_input.setSpecialValueText("Unlimited")
+        wall_input.setValue(self.run_limits.wall_time)
+        form.addRow("Wall-clock time:", wall_input)
+        
+        cpu_input = QSpinBox()
+        cpu_input.setRange(0, 24 * 3600)
+        cpu_input.setSuffix(" s")
+        cpu_input.setSpecialValueText("Unlimited")
+        cpu_input.setValue(self.run_limits.cpu_time)
+        form.addRow("CPU time:", cpu_input)
+        
+        memory_input = QSpinBox()
+        memory_input.setRange(0, 1024 * 1024)
+        memory_input.setSuffix(" MiB")
+        memory_input.setSpecialValueText("Unlimited")
+        memory_input.setValue(self.run_limits.memory_mb)
+        form.addRow("Memory:", memory_input)
+        
+        layout.addLayout(form)
+        
+        button_layout = QHBoxLayout()
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(dialog.reject)
+        
+        save_btn = QPushButton("Save")
+        save_btn.clicked.connect(dialog.accept)
+        
+        button_layout.addWidget(cancel_btn)
+        button_layout.addWidget(save_btn)
+        
+        layout.addLayout(button_layout)
+        
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.run_limits = RunLimits(
+                wall_time=wall_input.value(),
+                cpu_time=cpu_input.value(),
+                memory_mb=memory_input.value()
+            )
+    
+    @timed("get_content")
     def get_content(self):
         """Get the content from the active editor"""
+        # A note that is still loading has not changed from its content
+        entry = self.current_document
+        if entry is not None and entry.loader is not None and entry.document is self.active_editor().document():
+            return entry.content
+        
         if self.mode == "text":
-            return self.text_editor.toHtml()
+            content = compact_html(self.text_editor.toHtml())
         else:
-            return self.code_editor.toPlainText()
+            content = self.code_editor.toPlainText()
+        
+        # The pooled document now matches this content
+        if entry is not None and entry.document is self.active_editor().document():
+            entry.content = content
+        return content
+    
+    def active_editor(self):
+        """Return the editor of the current mode"""
+        return self.text_editor if self.mode == "text" else self.code_editor
+    
+    def is_modified(self):
+        """Return True if the active editor was edited since its content was loaded or saved"""
+        entry = self.current_document
+        if entry is not None and entry.loader is not None and entry.document is self.active_editor().document():
+            return False
+        return self.active_editor().document().isModified()
+    
+    def mark_saved(self):
+        """Record that the active editor's content has been saved"""
+        self.active_editor().document().setModified(False)
     
-    def set_content(self, content, is_code=False):
-        """Set the content in the appropriate editor"""
+    def create_document(self, note_id, content, is_code):
+        """Build a document for note content, with its highlighter for code"""
+        document = QTextDocument(self)
+        highlighter = None
         if is_code:
-            self.tab_widget.setCurrentIndex(1)
-            self.code_editor.setPlainText(content)
+            # The code editor is a QPlainTextEdit, which needs the plain text layout
+            document.setDocumentLayout(QPlainTextDocumentLayout(document))
+            document.setDefaultFont(self.code_editor.font())
+            highlighter = SyntaxHighlighter(document, self.theme)
+        else:
+            document.setDefaultFont(self.text_editor.font())
+            # Rich text is stored in the compact form, which leaves paragraph defaults out
+            document.setDefaultStyleSheet(RICH_TEXT_STYLE_SHEET)
+        entry = PooledDocument(note_id, document, highlighter, content, is_code, self.theme.theme_type)
+        
+        # Large notes are loaded a piece at a time so the window stays responsive
+        if len(content) > PROGRESSIVE_LOAD_THRESHOLD:
+            entry.loader = ProgressiveLoader(document, content, is_code, self)
+            entry.loader.progress.connect(lambda percent: self.load_progress_changed(entry, percent))
+            entry.loader.finished.connect(lambda: self.document_loaded(entry))
+            entry.loader.start()
+        else:
+            self.load_document(document, content, is_code)
+        return entry
+    
+    def load_document(self, document, content, is_code):
+        """Replace a document's text with note content"""
+        if is_code:
+            document.setPlainText(content)
         else:
-            self.tab_widget.setCurrentIndex(0)
             try:
-                self.text_editor.setHtml(content)
+                document.setHtml(content)
             except:
-                self.text_editor.setPlainText(content)
-
-
-class Note:
-    """Class representing a note"""
+                document.setPlainText(content)
+        document.setModified(False)
     
-    def __init__(self, title="", content="", is_code=False, tags=None, category=None):
-        self.title = title
-        self.content = content
-        self.is_code = is_code
-        self.tags = tags or []
-        self.category = category
-        self.created_date = datetime.datetime.now()
-        self.modified_date = self.created_date
+    def load_progress_changed(self, entry, percent):
+        """Show the loading progress of the current note"""
+        if entry is self.current_document:
+            self.load_progress.setValue(percent)
     
-    def to_dict(self):
-        """Convert note to dictionary for serialization"""
-        return {
-            "title": self.title,
-            "content": self.content,
-            "is_code": self.is_code,
-            "tags": self.tags,
-            "category": self.category,
-            "created_date": self.created_date.isoformat(),
-            "modified_date": self.modified_date.isoformat()
-        }
+    def document_loaded(self, entry):
+        """Finish a progressive load: measure the document and make it editable"""
+        entry.loader.deleteLater()
+        entry.loader = None
+        if entry.note_id is not None and self.documents.get(entry.note_id) is entry:
+            self.documents.touch(entry.note_id)
+            for released in self.documents.trim():
+                self.release_document(released)
+        if entry is self.current_document:
+            self.show_load_state()
     
-    @classmethod
-    def from_dict(cls, data):
-        """Create note from dictionary"""
-        note = cls(
-            title=data.get("title", ""),
-            content=data.get("content", ""),
-            is_code=data.get("is_code", False),
-            tags=data.get("tags", []),
-            category=data.get("category")
-        )
-        note.created_date = datetime.datetime.fromisoformat(data.get("created_date", datetime.datetime.now().isoformat()))
-        note.modified_date = datetime.datetime.fromisoformat(data.get("modified_date", datetime.datetime.now().isoformat()))
-        return note
+    def show_load_state(self):
+        """Keep the editor read-only, with a progress bar, while the current note loads"""
+        entry = self.current_document
+        loading = entry is not None and entry.loader is not None
+        self.load_progress.setVisible(loading)
+        if loading:
+            self.load_progress.setValue(entry.loader.percent())
+        for editor in (self.text_editor, self.code_editor):
+            if editor is not None:
+                editor.setReadOnly(loading and editor.document() is entry.document)
+    
+    def release_document(self, entry):
+        """Delete a document that left the pool, taking it out of the editors first"""
+        if entry.loader is not None:
+            entry.loader.stop()
+            entry.loader.deleteLater()
+            entry.loader = None
+        if self.text_editor.document() is entry.document:
+            self.blank_text.document.clear()
+            self.text_editor.setDocument(self.blank_text.document)
+        if self.code_editor is not None and self.code_editor.document() is entry.document:
+            self.blank_code.document.clear()
+            self.code_editor.setDocument(self.blank_code.document)
+            self.highlighter = self.blank_code.highlighter
+        if entry.highlighter in SyntaxHighlighter.instances:
+            SyntaxHighlighter.instances.remove(entry.highlighter)
+        if self.current_document is entry:
+            self.current_document = None
+            self.show_load_state()
+        entry.document.deleteLater()
+    
+    def forget_note(self, note_id):
+        """Drop the pooled document of a note that was removed"""
+        entry = self.documents.remove(note_id)
+        if entry is not None:
+            self.release_document(entry)
+    
+    def clear_documents(self):
+        """Drop every pooled document, e.g. when the notebook is replaced"""
+        for entry in self.documents.clear():
+            self.release_document(entry)
+    
+    def document_for(self, note_id, content, is_code):
+        """Return a live document for a note, from the pool when it is still current"""
+        entry = self.documents.get(note_id) if note_id is not None else None
+        if entry is not None and entry.is_code == is_code and entry.content == content:
+            return entry
+        
+        if note_id is None:
+            # Content without a note is shown in a document that is reused, not pooled
+            entry = self.unpooled_document
+            if entry is not None and entry.is_code == is_code and entry.loader is None:
+                self.load_document(entry.document, content, is_code)
+                entry.content = content
+                return entry
+            if entry is not None:
+                self.release_document(entry)
+            entry = self.unpooled_document = self.create_document(None, content, is_code)
+            return entry
+        
+        entry = self.create_document(note_id, content, is_code)
+        replaced = self.documents.put(note_id, entry)
+        if replaced is not None:
+            self.release_document(replaced)
+        return entry
+    
+    def refresh_highlighting(self):
+        """Re-highlight the code on show if the theme changed since it was highlighted"""
+        entry = self.current_document
+        if entry is not None and entry.is_code and entry.theme_type != self.theme.theme_type:
+            entry.highlighter.rehighlight()
+            entry.theme_type = self.theme.theme_type
+    
+    @timed("set_content")
+    def set_content(self, content, is_code=False, title="", note_id=None):
+        """Show a note's content in the appropriate editor
+        
+        With a note_id the note's document is kept in the pool, so switching back
+        to it later swaps the live document in instead of parsing the content again.
+        """
+        self.note_title = title
+        if is_code:
+            self.build_code_editor()
+        
+        # Keep the size of the document being left up to date
+        if self.current_document is not None and self.current_document.note_id is not None:
+            self.documents.touch(self.current_document.note_id)
+        
+        entry = self.document_for(note_id, content, is_code)
+        editor = self.code_editor if is_code else self.text_editor
+        if entry.document.defaultFont() != editor.font():
+            entry.document.setDefaultFont(editor.font())
+        if editor.document() is not entry.document:
+            editor.setDocument(entry.document)
+        if is_code:
+            self.highlighter = entry.highlighter
+        self.current_document = entry
+        for released in self.documents.trim():
+            self.release_document(released)
+        self.refresh_highlighting()
+        self.show_load_state()
+        self.tab_widget.setCurrentIndex(1 if is_code else 0)
 
 
 class SidebarWidget(QWidget):
@@ -577,11 +1937,12 @@ class SidebarWidget(QWidget):
     
     note_filter_changed = pyqtSignal(str, str)  # filter_type, filter_value
     
-    def __init__(self, theme_instance):
+    def __init__(self, theme_instance, repository):
         super().__init__()
+        self.setObjectName("sidebar")
         self.theme = theme_instance
-        self.categories = []
-        self.tags = []
+        self.repository = repository
+        self.repository.subscribe(self.repository_changed)
         
         # Set up the layout
         self.layout = QVBoxLayout(self)
@@ -589,8 +1950,9 @@ class SidebarWidget(QWidget):
         
         # Add header with app title
         self.header = QLabel("C0lorNote")
+        self.header.setObjectName("sidebarHeader")
         self.header.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        font = QFont(self.theme.get_current_theme()['font_family'])
+        font = QFont(self.theme.font_family())
         font.setPointSize(16)
         font.setBold(True)
         self.header.setFont(font)
@@ -612,14 +1974,11 @@ class SidebarWidget(QWidget):
         
         # Add theme selector
         self.create_theme_selector()
-        
-        # Apply theme
-        self.apply_theme()
     
     def create_smart_views(self):
         """Create the smart views section"""
         self.smart_views_label = QLabel("SMART VIEWS")
-        self.smart_views_label.setStyleSheet("font-weight: bold; font-size: 10px;")
+        self.smart_views_label.setObjectName("sectionLabel")
         self.layout.addWidget(self.smart_views_label)
         
         # Add buttons for smart views
@@ -651,7 +2010,7 @@ class SidebarWidget(QWidget):
         header_layout.setContentsMargins(0, 10, 0, 5)
         
         self.categories_label = QLabel("CATEGORIES")
-        self.categories_label.setStyleSheet("font-weight: bold; font-size: 10px;")
+        self.categories_label.setObjectName("sectionLabel")
         
         self.add_category_btn = QPushButton("+")
         self.add_category_btn.setFixedSize(24, 24)
@@ -683,7 +2042,7 @@ class SidebarWidget(QWidget):
         header_layout.setContentsMargins(0, 10, 0, 5)
         
         self.tags_label = QLabel("TAGS")
-        self.tags_label.setStyleSheet("font-weight: bold; font-size: 10px;")
+        self.tags_label.setObjectName("sectionLabel")
         
         self.add_tag_btn = QPushButton("+")
         self.add_tag_btn.setFixedSize(24, 24)
@@ -707,15 +2066,14 @@ class SidebarWidget(QWidget):
         
         theme_label = QLabel("Theme:")
         self.theme_combo = QComboBox()
-        self.theme_combo.addItem("Matrix")
-        self.theme_combo.addItem("Dreamcore")
-        self.theme_combo.addItem("Space Red")
-        self.theme_combo.addItem("Apple Light")
-        self.theme_combo.addItem("Apple Dark")
-        self.theme_combo.addItem("Minimalist")
+        
+        # One entry per registered theme, built-in and user themes alike
+        self.theme_keys = self.theme.registry.keys()
+        for key in self.theme_keys:
+            self.theme_combo.addItem(self.theme.registry.name(key))
         
         # Set current theme
-        self.theme_combo.setCurrentIndex(self.theme.theme_type.value - 1)
+        self.theme_combo.setCurrentIndex(self.theme_keys.index(self.theme.theme_type))
         
         # Connect signal
         self.theme_combo.currentIndexChanged.connect(self.theme_changed)
@@ -725,33 +2083,11 @@ class SidebarWidget(QWidget):
         
         self.layout.addLayout(theme_layout)
     
-    def apply_theme(self):
-        """Apply the current theme to all sidebar components"""
-        theme = self.theme.get_current_theme()
-        
-        # Apply theme to the whole sidebar
-        self.setStyleSheet(f"background-color: {theme['sidebar_bg'].name()}; color: {theme['sidebar_fg'].name()};")
-        
-        # Apply theme to header
-        self.header.setStyleSheet(f"color: {theme['accent'].name()}; font-weight: bold;")
-        
-        # Apply theme to buttons
-        for btn in [self.all_notes_btn, self.recent_btn, self.code_notes_btn, self.add_category_btn, self.add_tag_btn]:
-            btn.setStyleSheet(
-                f"background-color: {theme['button_bg'].name()}; "
-                f"color: {theme['button_fg'].name()}; "
-                f"border: 1px solid {theme['border'].name()}; "
-                f"padding: 5px;"
-            )
-    
     def theme_changed(self, index):
         """Handle theme change from the dropdown"""
-        theme_type = ThemeType(index + 1)
+        theme_type = self.theme_keys[index]
         self.theme.set_theme(theme_type)
         
-        # Apply the new theme to this widget first
-        self.apply_theme()
-        
         # Emit a signal that will be caught by the main window
         self.note_filter_changed.emit("theme_changed", "")
     
@@ -783,11 +2119,7 @@ class SidebarWidget(QWidget):
         layout.addLayout(button_layout)
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            category_name = name_input.text().strip()
-            if category_name:
-                if category_name not in self.categories:
-                    self.categories.append(category_name)
-                    self.update_categories_list()
+            self.repository.add_category(name_input.text().strip())
     
     def add_tag(self):
         """Add a new tag"""
@@ -817,22 +2149,24 @@ class SidebarWidget(QWidget):
         layout.addLayout(button_layout)
         
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            tag_name = name_input.text().strip()
-            if tag_name:
-                if tag_name not in self.tags:
-                    self.tags.append(tag_name)
-                    self.update_tags_list()
+            self.repository.add_tag(name_input.text().strip())
+    
+    def repository_changed(self, event, notes):
+        """Refresh the category and tag lists when they change"""
+        if event in (NoteRepository.BULK, NoteRepository.LABELS):
+            self.update_categories_list()
+            self.update_tags_list()
     
     def update_categories_list(self):
         """Update the categories list widget"""
         self.categories_list.clear()
-        for category in self.categories:
+        for category in self.repository.categories:
             self.categories_list.addItem(category)
     
     def update_tags_list(self):
         """Update the tags list widget"""
         self.tags_list.clear()
-        for tag in self.tags:
+        for tag in self.repository.tags:
             self.tags_list.addItem(tag)
     
     def category_clicked(self, item):
@@ -846,16 +2180,202 @@ class SidebarWidget(QWidget):
         self.note_filter_changed.emit("tag", tag)
 
 
+class NoteListModel(QAbstractListModel):
+    """List model over the notes shown in the note list
+    
+    Notes come from a NoteCursor a page at a time: the first page when the
+    cursor is set, the next ones when the view scrolls to the end. Row text
+    (title, preview and date) is built when a row is first painted and kept in
+    a bounded cache, so showing a list costs nothing per note and memory does
+    not grow with the notebook.
+    """
+    
+    NoteIdRole = Qt.ItemDataRole.UserRole
+    RowRole = Qt.ItemDataRole.UserRole + 1  # (title, preview, date, is_code)
+    CACHE_SIZE = 4096  # Rows whose text is kept
+    PAGE_SIZE = 200  # Notes fetched at a time
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cursor = None
+        self.notes = []  # Notes fetched from the cursor so far
+        self.rows = OrderedDict()  # note id -> (modified date, row text), least recently used first
+    
+    def set_cursor(self, cursor):
+        """Show the notes of another cursor, starting with its first page"""
+        self.beginResetModel()
+        self.cursor = cursor
+        self.notes = cursor.fetch(self.PAGE_SIZE)
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.notes)
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.cursor is not None and not self.cursor.at_end()
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        batch = self.cursor.fetch(self.PAGE_SIZE)
+        if not batch:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.notes), len(self.notes) + len(batch) - 1)
+        self.notes.extend(batch)
+        self.endInsertRows()
+    
+    def note_changed(self, note):
+        """Update a changed note's row in place; return False if the list has to be rebuilt"""
+        if self.cursor is None:
+            return False
+        predicate = self.cursor.predicate
+        matches = predicate is None or predicate(note)
+        try:
+            row = self.notes.index(note)
+        except ValueError:
+            row = None
+        
+        if row is not None:
+            if matches:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+            else:
+                # The note no longer fits the filter, e.g. a tag was removed
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.notes[row]
+                self.endRemoveRows()
+            return True
+        
+        # Notes the cursor has not reached yet are tested when they are fetched;
+        # one it already passed over that now matches needs a new cursor
+        return not matches or self.cursor.notes.index(note) >= self.cursor.position
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        note = self.notes[index.row()]
+        if role == self.NoteIdRole:
+            return note.id
+        if role == self.RowRole:
+            return self.row_text(note)
+        if role == Qt.ItemDataRole.DisplayRole:
+            return note.title or "Untitled"
+        return None
+    
+    def row_text(self, note):
+        """Return the text painted for a note, from the cache while the note is unchanged"""
+        cached = self.rows.get(note.id)
+        if cached is not None and cached[0] == note.modified_date:
+            self.rows.move_to_end(note.id)
+            return cached[1]
+        
+        text = (
+            note.title or "Untitled",
+            preview(note.content, note.is_code),
+            note.modified_date.strftime("%Y-%m-%d %H:%M"),
+            note.is_code,
+        )
+        self.rows[note.id] = (note.modified_date, text)
+        self.rows.move_to_end(note.id)
+        while len(self.rows) > self.CACHE_SIZE:
+            self.rows.popitem(last=False)
+        return text
+
+
+class NoteItemDelegate(QStyledItemDelegate):
+    """Paints a note as its title, a preview line and its date, with a badge for code
+    
+    Every row has the same height, so the view can place rows without measuring them.
+    """
+    
+    PADDING = 6
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title_font = None  # Bold version of the view font, made on first paint
+    
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), 3 * option.fontMetrics.height() + 2 * self.PADDING)
+    
+    def paint(self, painter, option, index):
+        title, preview_text, date_text, is_code = index.data(NoteListModel.RowRole)
+        
+        # Background, selection and hover as the style draws them
+        style = option.widget.style() if option.widget is not None else QApplication.style()
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+        
+        painter.save()
+        palette = option.palette
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        text_color = palette.color(QPalette.ColorRole.HighlightedText if selected else QPalette.ColorRole.Text)
+        rect = option.rect.adjusted(self.PADDING, self.PADDING, -self.PADDING, -self.PADDING)
+        line_height = option.fontMetrics.height()
+        
+        if self.title_font is None or self.title_font.family() != option.font.family() \
+                or self.title_font.pointSize() != option.font.pointSize():
+            self.title_font = QFont(option.font)
+            self.title_font.setBold(True)
+        title_metrics = QFontMetrics(self.title_font)
+        
+        # Code badge at the right of the title line
+        title_width = rect.width()
+        if is_code:
+            badge_width = option.fontMetrics.horizontalAdvance("Code") + 8
+            badge = QRect(rect.right() - badge_width + 1, rect.top(), badge_width, line_height)
+            # Inverted colors on a selected row, which is already highlighted
+            fill, ink = QPalette.ColorRole.Highlight, QPalette.ColorRole.HighlightedText
+            if selected:
+                fill, ink = ink, fill
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(palette.color(fill))
+            painter.drawRoundedRect(badge, 3, 3)
+            painter.setPen(palette.color(ink))
+            painter.drawText(badge, Qt.AlignmentFlag.AlignCenter, "Code")
+            title_width -= badge_width + 6
+        
+        # Title, preview and date, each on one line
+        painter.setPen(text_color)
+        painter.setFont(self.title_font)
+        painter.drawText(QRect(rect.left(), rect.top(), title_width, line_height), Qt.AlignmentFlag.AlignVCenter,
+                         title_metrics.elidedText(title, Qt.TextElideMode.ElideRight, title_width))
+        painter.setFont(option.font)
+        faded = QColor(text_color)
+        faded.setAlpha(190)
+        painter.setPen(faded)
+        painter.drawText(QRect(rect.left(), rect.top() + line_height, rect.width(), line_height), Qt.AlignmentFlag.AlignVCenter,
+                         option.fontMetrics.elidedText(preview_text, Qt.TextElideMode.ElideRight, rect.width()))
+        faded.setAlpha(130)
+        painter.setPen(faded)
+        painter.drawText(QRect(rect.left(), rect.top() + 2 * line_height, rect.width(), line_height), Qt.AlignmentFlag.AlignVCenter,
+                         date_text)
+        painter.restore()
+
+
+class NoteListView(QListView):
+    """List view for notes that says so when there are none"""
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.model() is not None and self.model().rowCount() == 0:
+            painter = QPainter(self.viewport())
+            painter.setPen(self.palette().color(QPalette.ColorRole.Text))
+            painter.drawText(self.viewport().rect().adjusted(6, 6, -6, -6),
+                             Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft, "No notes found")
+
+
 class NoteListWidget(QWidget):
     """Widget for displaying a list of notes"""
     
-    note_selected = pyqtSignal(int)  # Emitted when a note is selected
+    note_selected = pyqtSignal(str)  # Emitted with the note id when a note is selected
     
-    def __init__(self, theme_instance):
+    def __init__(self, theme_instance, repository):
         super().__init__()
         self.theme = theme_instance
-        self.notes = []  # List of Note objects
-        self.filtered_notes = []  # Filtered list based on categories/tags
+        self.repository = repository
+        self.repository.subscribe(self.repository_changed)
+        self.filter = ("all", "")  # Current filter type and value
+        self.updates_paused = False  # Set during bulk imports
+        self.refresh_pending = False
         
         # Set up the layout
         self.layout = QVBoxLayout(self)
@@ -864,13 +2384,22 @@ class NoteListWidget(QWidget):
         # Create the search bar
         self.create_search_bar()
         
-        # Create the notes list
-        self.list_widget = QListWidget()
-        self.list_widget.itemClicked.connect(self.note_clicked)
-        self.layout.addWidget(self.list_widget)
+        # Create the notes list; rows all have the same height and are laid out
+        # in batches, so long lists show at once and scroll smoothly
+        self.model = NoteListModel(self)
+        self.list_view = NoteListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(NoteItemDelegate(self.list_view))
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.list_view.setBatchSize(2000)
+        self.list_view.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.list_view.clicked.connect(self.note_clicked)
+        self.layout.addWidget(self.list_view)
         
         # Create new note button
         self.new_note_btn = QPushButton("+ New Note")
+        self.new_note_btn.setObjectName("newNoteButton")
         self.new_note_btn.clicked.connect(self.create_new_note)
         self.layout.addWidget(self.new_note_btn)
         
@@ -882,6 +2411,7 @@ class NoteListWidget(QWidget):
         search_layout = QHBoxLayout()
         
         self.search_input = QLineEdit()
+        self.search_input.setObjectName("searchInput")
         self.search_input.setPlaceholderText("Search notes...")
         self.search_input.textChanged.connect(self.search_notes)
         
@@ -890,59 +2420,37 @@ class NoteListWidget(QWidget):
     
     def apply_theme(self):
         """Apply the current theme to the note list widget"""
-        theme = self.theme.get_current_theme()
-        
-        # Apply theme to the widget
+        # The search input and new note button are styled by the application style sheet
         self.theme.apply_theme_to_widget(self)
-        
-        # Apply theme to search input
-        self.search_input.setStyleSheet(
-            f"background-color: {theme['editor_bg'].name()}; "
-            f"color: {theme['editor_fg'].name()}; "
-            f"border: 1px solid {theme['border'].name()}; "
-            f"padding: 5px;"
-        )
-        
-        # Apply theme to new note button
-        self.new_note_btn.setStyleSheet(
-            f"background-color: {theme['accent'].name()}; "
-            f"color: white; "
-            f"border: none; "
-            f"padding: 10px;"
-        )
     
-    def set_notes(self, notes):
-        """Set the notes list"""
-        self.notes = notes
-        self.filtered_notes = notes
-        self.update_list()
+    def repository_changed(self, event, notes):
+        """Re-apply the current filter when notes are added or removed, and update edited rows"""
+        if event == NoteRepository.LABELS:
+            return
+        if self.updates_paused:
+            # Refresh once when the bulk operation is done
+            self.refresh_pending = True
+        elif event == NoteRepository.BULK:
+            # A new notebook starts unfiltered
+            self.filter_notes("all", "")
+        elif event == NoteRepository.UPDATED:
+            # Edits keep the rows already fetched, the scroll position and the selection
+            if not all(self.model.note_changed(note) for note in notes):
+                self.filter_notes(*self.filter)
+        else:
+            self.filter_notes(*self.filter)
+    
+    def set_updates_paused(self, paused):
+        """Pause list refreshes while many changes arrive, refreshing once afterwards"""
+        self.updates_paused = paused
+        if not paused and self.refresh_pending:
+            self.refresh_pending = False
+            self.filter_notes(*self.filter)
     
+    @timed("filter_notes")
     def filter_notes(self, filter_type, filter_value):
         """Filter notes based on category or tag"""
-        if filter_type == "all":
-            self.filtered_notes = self.notes
-        elif filter_type == "recent":
-            # Filter notes from the last 7 days
-            seven_days_ago = datetime.datetime.now() - datetime.timedelta(days=7)
-            self.filtered_notes = [note for note in self.notes if note.modified_date >= seven_days_ago]
-        elif filter_type == "code":
-            # Filter code notes
-            self.filtered_notes = [note for note in self.notes if note.is_code]
-        elif filter_type == "category":
-            # Filter by category
-            self.filtered_notes = [note for note in self.notes if note.category == filter_value]
-        elif filter_type == "tag":
-            # Filter by tag
-            self.filtered_notes = [note for note in self.notes if filter_value in note.tags]
-        elif filter_type == "search":
-            # Filter by search term
-            term = filter_value.lower()
-            self.filtered_notes = [
-                note for note in self.notes 
-                if term in note.title.lower() or 
-                   term in (note.content.lower() if not note.is_code else note.content.lower())
-            ]
-        
+        self.filter = (filter_type, filter_value)
         self.update_list()
     
     def search_notes(self, text):
@@ -952,45 +2460,16 @@ class NoteListWidget(QWidget):
         else:
             self.filter_notes("all", "")
     
+    @timed("update_list")
     def update_list(self):
-        """Update the list widget with current notes"""
-        self.list_widget.clear()
-        
-        if not self.filtered_notes:
-            # Add a "No notes" message
-            no_notes_item = QListWidgetItem("No notes found")
-            no_notes_item.setFlags(Qt.ItemFlag.NoItemFlags)
-            self.list_widget.addItem(no_notes_item)
-            return
-        
-        # Add notes to the list
-        for i, note in enumerate(self.filtered_notes):
-            # Create a formatted list item
-            item = QListWidgetItem()
-            
-            # Format item text with title and preview
-            title = note.title or "Untitled"
-            preview = note.content[:50].replace("\n", " ") + "..." if len(note.content) > 50 else note.content
-            
-            # Add note type indicator
-            type_indicator = "[Code] " if note.is_code else ""
-            
-            # Format date
-            date_str = note.modified_date.strftime("%Y-%m-%d %H:%M")
-            
-            item_text = f"{type_indicator}{title}\n{preview}\n{date_str}"
-            item.setText(item_text)
-            
-            # Set item data to associate with note index
-            item.setData(Qt.ItemDataRole.UserRole, i)
-            
-            self.list_widget.addItem(item)
+        """Show the first page of the current filter's notes; more are fetched on scrolling"""
+        self.model.set_cursor(self.repository.filter_notes(*self.filter))
     
-    def note_clicked(self, item):
+    def note_clicked(self, index):
         """Handle note selection"""
-        index = item.data(Qt.ItemDataRole.UserRole)
-        if index is not None:
-            self.note_selected.emit(index)
+        note_id = index.data(NoteListModel.NoteIdRole)
+        if note_id is not None:
+            self.note_selected.emit(note_id)
     
     def create_new_note(self):
         """Create a new note"""
@@ -1014,7 +2493,7 @@ class NoteListWidget(QWidget):
         
         # Add all categories to the combo box
         category_combo.addItem("(None)")
-        for category in self.parent().findChild(SidebarWidget).categories:
+        for category in self.repository.categories:
             category_combo.addItem(category)
         
         category_layout.addWidget(category_label)
@@ -1058,34 +2537,100 @@ class NoteListWidget(QWidget):
             
             # Create the note
             note = Note(title=title, content="", is_code=is_code, tags=tags, category=category)
-            self.notes.append(note)
-            self.filtered_notes = self.notes
-            self.update_list()
             
-            # Select the new note
-            self.note_selected.emit(len(self.notes) - 1)
+            # Show all notes so the new one is visible; the repository
+            # registers any new tags and the list refreshes itself
+            self.filter = ("all", "")
+            self.repository.add_note(note)
             
-            # Add any new tags to the sidebar
-            sidebar = self.parent().findChild(SidebarWidget)
-            for tag in tags:
-                if tag not in sidebar.tags:
-                    sidebar.tags.append(tag)
-            sidebar.update_tags_list()
+            # Select the new note
+            self.note_selected.emit(note.id)
+
+
+class ImportSignals(QObject):
+    """Signals used to hand imported notes from the worker thread to the GUI"""
+    
+    batch = pyqtSignal(object)  # list of Notes
+    progress = pyqtSignal(int, str)  # files imported so far, current file
+    finished = pyqtSignal(object)  # ImportResult
+
+
+class ExportSignals(QObject):
+    """Signals used to report export progress from the worker thread"""
+    
+    progress = pyqtSignal(int)  # notes exported so far
+    finished = pyqtSignal(object)  # ExportResult or the exception that stopped it
+
+
+class StartupProfiler(QObject):
+    """Record how long each startup phase takes and report it after the first paint"""
+    
+    def __init__(self, stream=None):
+        super().__init__()
+        self.stream = stream or sys.stderr
+        self.phases = []  # (phase name, seconds since process start)
+        self.reported = False
+        self.mark("imports")
+    
+    def mark(self, phase):
+        """Record the end of a startup phase"""
+        self.phases.append((phase, time.perf_counter() - _STARTUP_T0))
+    
+    def watch(self, window):
+        """Report once the window has painted for the first time"""
+        window.installEventFilter(self)
+    
+    def eventFilter(self, obj, event):
+        """Catch the window's first paint event"""
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            # Mark once the paint itself has finished
+            QTimer.singleShot(0, lambda: self.mark("first paint"))
+        return False
+    
+    def finish(self, phase):
+        """Record a final phase and print the breakdown once"""
+        self.mark(phase)
+        if not self.reported:
+            self.reported = True
+            self.report()
+    
+    def report(self):
+        """Print each phase with its own duration and the running total"""
+        previous = 0.0
+        self.stream.write("C0lorNote startup profile\n")
+        for phase, elapsed in self.phases:
+            self.stream.write(
+                f"  {phase:<24}{(elapsed - previous) * 1000:8.1f} ms"
+                f"{elapsed * 1000:10.1f} ms total\n"
+            )
+            previous = elapsed
+        self.stream.flush()
 
 
 class MainWindow(QMainWindow):
     """Main window for the C0lorNote application"""
     
-    def __init__(self):
+    def __init__(self, defer_startup=False, startup_profiler=None):
+        self.startup_pending = False  # Set before Qt can deliver events
         super().__init__()
-        self.notes = []  # List of Note objects
-        self.current_note_index = -1  # Index of the currently selected note
+        self.repository = NoteRepository()  # Owns the notes, categories and tags
+        self.repository.subscribe(self.repository_changed)
+        self.current_note = None  # The note open in the editor
+        self.startup_profiler = startup_profiler
+        self.defer_startup = defer_startup
         
         # Get platform-specific settings
         self.platform_settings = detect_platform()
         
+        # Load the built-in themes and any user themes from the config directory
+        self.theme_registry = ThemeRegistry()
+        self.theme_registry.load_user_themes(
+            os.path.join(self.platform_settings['config_dir'], "themes")
+        )
+        
         # Set default theme based on platform
-        self.theme = Theme(self.platform_settings['default_theme'])
+        self.theme = Theme(self.platform_settings['default_theme'], self.theme_registry)
         
         # Apply font scaling based on platform
         self.font_scaling = self.platform_settings['font_scaling']
@@ -1108,8 +2653,17 @@ class MainWindow(QMainWindow):
         self.status_message = QLabel("Ready")
         self.status_bar.addWidget(self.status_message) # addWidget aligns left by default
 
+        # Live readout of the instrumented hot paths (only while recording)
+        self.perf_label = QLabel()
+        self.perf_label.setVisible(False)
+        self.status_bar.addPermanentWidget(self.perf_label)
+        self.perf_timer = QTimer(self)
+        self.perf_timer.setInterval(1000)
+        self.perf_timer.timeout.connect(self.update_perf_readout)
+
         # Branding label (aligned right)
         self.branding_label = QLabel("@marbleceo")
+        self.branding_label.setObjectName("brandingLabel")
         self.branding_label.setAlignment(Qt.AlignmentFlag.AlignRight)
         # addPermanentWidget aligns right
         self.status_bar.addPermanentWidget(self.branding_label)
@@ -1121,11 +2675,52 @@ class MainWindow(QMainWindow):
         # Add keyboard shortcuts
         self.create_shortcuts()
         
-        # Load existing notes if available
-        self.load_notes()
+        # Show the readout if recording was switched on from the command line
+        self.perf_action.setChecked(recorder.enabled)
         
         # Apply the initial theme
         self.apply_theme()
+        self.mark_startup("window shell")
+        
+        # In fast startup mode the window is painted with just its shell; the
+        # code editor and the notes are filled in after that first paint
+        self.startup_pending = defer_startup
+        if defer_startup:
+            self.status_message.setText("Loading notes...")
+        else:
+            self.finish_startup()
+    
+    def event(self, event):
+        """Finish a deferred startup once the window has been painted"""
+        if self.startup_pending and event.type() == QEvent.Type.Paint:
+            self.startup_pending = False
+            QTimer.singleShot(0, self.finish_startup)
+        return super().event(event)
+    
+    def mark_startup(self, phase):
+        """Record a startup phase when profiling startup"""
+        if self.startup_profiler is not None:
+            self.startup_profiler.mark(phase)
+    
+    def finish_startup(self):
+        """Build the deferred widgets and load the notes"""
+        self.note_editor.build_code_editor()
+        self.mark_startup("code editor")
+        
+        # Load existing notes if available
+        self.status_message.setText("Ready")
+        self.load_notes()
+        self.mark_startup("load notes")
+        
+        # Report theme files that could not be loaded
+        if self.theme_registry.errors:
+            self.status_message.setText(
+                f"Skipped {len(self.theme_registry.errors)} invalid theme file(s): "
+                + "; ".join(self.theme_registry.errors)
+            )
+        
+        if self.startup_profiler is not None:
+            self.startup_profiler.finish("ready")
     
     def create_layout(self):
         """Create the main window layout with splitters"""
@@ -1139,18 +2734,21 @@ class MainWindow(QMainWindow):
         self.main_splitter = QSplitter(Qt.Orientation.Horizontal)
         
         # Create and add sidebar
-        self.sidebar = SidebarWidget(self.theme)
+        self.sidebar = SidebarWidget(self.theme, self.repository)
         self.sidebar.setMinimumWidth(200)
         self.sidebar.setMaximumWidth(300)
         self.main_splitter.addWidget(self.sidebar)
         
         # Create and add note list
-        self.note_list = NoteListWidget(self.theme)
+        self.note_list = NoteListWidget(self.theme, self.repository)
         self.note_list.setMinimumWidth(250)
         self.main_splitter.addWidget(self.note_list)
         
         # Create and add note editor
-        self.note_editor = NoteEditor(self.theme)
+        self.note_editor = NoteEditor(self.theme, defer_code_editor=self.defer_startup)
+        self.note_editor.run_cache = RunCache(
+            os.path.join(self.platform_settings['config_dir'], "run_cache.json")
+        )
         self.main_splitter.addWidget(self.note_editor)
         
         # Set initial splitter sizes
@@ -1191,6 +2789,18 @@ class MainWindow(QMainWindow):
         export_action.triggered.connect(self.export_note)
         file_menu.addAction(export_action)
         
+        export_all_action = QAction("Export All Notes...", self)
+        export_all_action.triggered.connect(lambda: self.export_notes(filtered=False))
+        file_menu.addAction(export_all_action)
+        
+        export_filtered_action = QAction("Export Filtered Notes...", self)
+        export_filtered_action.triggered.connect(lambda: self.export_notes(filtered=True))
+        file_menu.addAction(export_filtered_action)
+        
+        import_folder_action = QAction("Import Folder...", self)
+        import_folder_action.triggered.connect(self.import_folder)
+        file_menu.addAction(import_folder_action)
+        
         file_menu.addSeparator()
         
         # Exit action
@@ -1211,9 +2821,49 @@ class MainWindow(QMainWindow):
         # Run code action (for code editor)
         run_action = QAction("Run Code", self)
         run_action.setShortcut(QKeySequence("F5"))
-        run_action.triggered.connect(self.note_editor.run_code)
+        run_action.triggered.connect(lambda: self.note_editor.run_code())
         edit_menu.addAction(run_action)
         
+        # Force re-run action, bypassing the run cache
+        force_run_action = QAction("Force Re-run", self)
+        force_run_action.setShortcut(QKeySequence("Ctrl+F5"))
+        force_run_action.triggered.connect(self.note_editor.force_run_code)
+        edit_menu.addAction(force_run_action)
+        
+        # Profiler actions
+        profile_action = QAction("Run with Profiler", self)
+        profile_action.setShortcut(QKeySequence("Shift+F5"))
+        profile_action.triggered.connect(self.note_editor.profile_code)
+        edit_menu.addAction(profile_action)
+        
+        trace_action = QAction("Trace Allocations When Profiling", self)
+        trace_action.setCheckable(True)
+        trace_action.setChecked(self.note_editor.trace_allocations)
+        trace_action.toggled.connect(self.note_editor.set_trace_allocations)
+        edit_menu.addAction(trace_action)
+        
+        # Run cache toggle (opt-in)
+        cache_action = QAction("Cache Run Results", self)
+        cache_action.setCheckable(True)
+        cache_action.setChecked(self.note_editor.run_cache_enabled)
+        cache_action.toggled.connect(self.note_editor.set_run_cache_enabled)
+        edit_menu.addAction(cache_action)
+        
+        # Code output action
+        run_console_action = QAction("Code Output", self)
+        run_console_action.triggered.connect(self.note_editor.show_run_console)
+        edit_menu.addAction(run_console_action)
+        
+        # Batch run action
+        run_all_action = QAction("Run All Code Notes...", self)
+        run_all_action.triggered.connect(self.run_all_code_notes)
+        edit_menu.addAction(run_all_action)
+        
+        # Run limits action
+        run_limits_action = QAction("Run Limits...", self)
+        run_limits_action.triggered.connect(self.note_editor.edit_run_limits)
+        edit_menu.addAction(run_limits_action)
+        
         # View menu
         view_menu = menu_bar.addMenu("View")
         
@@ -1221,35 +2871,32 @@ class MainWindow(QMainWindow):
         theme_menu = view_menu.addMenu("Theme")
         
         # Add theme actions
-        matrix_action = QAction("Matrix", self)
-        matrix_action.triggered.connect(lambda: self.change_theme(ThemeType.MATRIX))
-        theme_menu.addAction(matrix_action)
-        
-        dreamcore_action = QAction("Dreamcore", self)
-        dreamcore_action.triggered.connect(lambda: self.change_theme(ThemeType.DREAMCORE))
-        theme_menu.addAction(dreamcore_action)
-        
-        space_red_action = QAction("Space Red", self)
-        space_red_action.triggered.connect(lambda: self.change_theme(ThemeType.SPACE_RED))
-        theme_menu.addAction(space_red_action)
-        
-        apple_light_action = QAction("Apple Light", self)
-        apple_light_action.triggered.connect(lambda: self.change_theme(ThemeType.APPLE_LIGHT))
-        theme_menu.addAction(apple_light_action)
-        
-        apple_dark_action = QAction("Apple Dark", self)
-        apple_dark_action.triggered.connect(lambda: self.change_theme(ThemeType.APPLE_DARK))
-        theme_menu.addAction(apple_dark_action)
-        
-        minimalist_action = QAction("Minimalist", self)
-        minimalist_action.triggered.connect(lambda: self.change_theme(ThemeType.MINIMALIST))
-        theme_menu.addAction(minimalist_action)
+        for key in self.theme.registry.keys():
+            theme_action = QAction(self.theme.registry.name(key), self)
+            theme_action.triggered.connect(lambda checked=False, key=key: self.change_theme(key))
+            theme_menu.addAction(theme_action)
+        
+        view_menu.addSeparator()
+        
+        # Performance instrumentation
+        self.perf_action = QAction("Performance Overlay", self)
+        self.perf_action.setCheckable(True)
+        self.perf_action.toggled.connect(self.set_instrumentation_enabled)
+        view_menu.addAction(self.perf_action)
+        
+        save_perf_action = QAction("Save Performance Data...", self)
+        save_perf_action.triggered.connect(self.save_performance_data)
+        view_menu.addAction(save_perf_action)
+        
+        reset_perf_action = QAction("Reset Performance Data", self)
+        reset_perf_action.triggered.connect(recorder.reset)
+        view_menu.addAction(reset_perf_action)
     
     def create_shortcuts(self):
         """Create keyboard shortcuts"""
         # F5 to run code
         run_shortcut = QShortcut(QKeySequence("F5"), self)
-        run_shortcut.activated.connect(self.note_editor.run_code)
+        run_shortcut.activated.connect(lambda: self.note_editor.run_code())
         
         # Ctrl+S to save
         save_shortcut = QShortcut(QKeySequence.StandardKey.Save, self)
@@ -1257,32 +2904,24 @@ class MainWindow(QMainWindow):
     
     def apply_theme(self):
         """Apply the current theme to all components"""
-        # Get the current theme data
-        theme = self.theme.get_current_theme()
-        
         # Apply theme to components with font scaling
         self.theme.apply_theme_to_widget(self.sidebar, self.font_scaling)
         self.theme.apply_theme_to_widget(self.note_list, self.font_scaling)
         self.theme.apply_theme_to_widget(self.note_editor, self.font_scaling)
         
-        # Apply theme to main window
-        self.setStyleSheet(f"background-color: {theme['main_bg'].name()}; color: {theme['main_fg'].name()};")
-        
-        # Apply theme to status bar
-        self.status_bar.setStyleSheet(
-            f"background-color: {theme['toolbar_bg'].name()}; color: {theme['main_fg'].name()};"
-        )
-        
-        # Ensure branding label color is also set
-        self.branding_label.setStyleSheet(f"color: {theme['main_fg'].name()}; padding-right: 10px;") # Add some padding
+        # One cached style sheet for the whole window tree, so Qt repolishes it only once.
+        # It is set on the main window rather than on QApplication: dialogs are parented
+        # to the window and inherit it, and an application-level sheet measured about
+        # twice as slow to switch (see benchmarks/theme_switch.py).
+        self.setStyleSheet(self.theme.stylesheet())
         
         # Force the note editor to refresh its theme
         self.note_editor.apply_theme()
         
         # Update the current note display if one is open
-        if self.current_note_index >= 0:
-            note = self.note_list.filtered_notes[self.current_note_index]
-            self.note_editor.set_content(note.content, note.is_code)
+        if self.current_note is not None:
+            note = self.current_note
+            self.note_editor.set_content(note.content, note.is_code, note.title, note.id)
     
     def handle_filter_change(self, filter_type, filter_value):
         """Handle changes to note filtering"""
@@ -1293,39 +2932,51 @@ class MainWindow(QMainWindow):
             # Filter has changed, update the note list
             self.note_list.filter_notes(filter_type, filter_value)
     
-    def handle_note_selection(self, index):
+    def repository_changed(self, event, notes):
+        """Close the editor's note, and drop pooled documents, when notes leave the notebook"""
+        if event == NoteRepository.BULK or (event == NoteRepository.REMOVED and self.current_note in notes):
+            self.current_note = None
+        if event == NoteRepository.BULK:
+            self.note_editor.clear_documents()
+        elif event == NoteRepository.REMOVED:
+            for note in notes:
+                self.note_editor.forget_note(note.id)
+    
+    def handle_note_selection(self, note_id):
         """Handle note selection from the list"""
-        if index < 0 or index >= len(self.note_list.filtered_notes):
+        note = self.repository.get(note_id)
+        if note is None:
             return
         
         # Save the current note if one is active
-        if self.current_note_index >= 0:
+        if self.current_note is not None:
             self.save_current_note()
         
-        # Set the current note index
-        self.current_note_index = index
-        note = self.note_list.filtered_notes[index]
+        # Set the current note
+        self.current_note = note
         
         # Update the editor with the note content
-        self.note_editor.set_content(note.content, note.is_code)
+        self.note_editor.set_content(note.content, note.is_code, note.title, note.id)
         
 
         # Update status bar message
         self.status_message.setText(f"Editing: {note.title} | Last modified: {note.modified_date.strftime('%Y-%m-%d %H:%M')}")
     def save_current_note(self):
         """Save the current note"""
-        if self.current_note_index < 0:
+        if self.current_note is None:
             return
         
-        # Get the current note
-        note = self.note_list.filtered_notes[self.current_note_index]
-        
-        # Update the note content from the editor
-        note.content = self.note_editor.get_content()
-        note.modified_date = datetime.datetime.now()
+        # Nothing was edited since the note was loaded or saved: skip the
+        # serialization, the timestamp and the file write
+        if not self.note_editor.is_modified():
+            if self.repository.dirty:
+                self.save_notes()
+            return
         
-        # Update the note list
-        self.note_list.update_list()
+        # Update the note content from the editor; the note list refreshes itself
+        note = self.current_note
+        self.repository.update_note(note, content=self.note_editor.get_content())
+        self.note_editor.mark_saved()
         
 
         # Update status bar message
@@ -1335,16 +2986,12 @@ class MainWindow(QMainWindow):
     
     def delete_current_note(self):
         """Delete the current note"""
-        if self.current_note_index < 0:
-            return
-        
-        # Make sure the index is valid
-        if self.current_note_index >= len(self.note_list.filtered_notes):
+        if self.current_note is None:
             self.status_message.setText("No note selected to delete")
             return
         
         # Get the current note
-        note = self.note_list.filtered_notes[self.current_note_index]
+        note = self.current_note
         
         # Confirm deletion
         confirm = QMessageBox.question(
@@ -1355,36 +3002,22 @@ class MainWindow(QMainWindow):
         )
         
         if confirm == QMessageBox.StandardButton.Yes:
-            # Find the note in the unfiltered list
-            note_index = -1
-            for i, n in enumerate(self.notes):
-                if n is note:
-                    note_index = i
-                    break
+            # Remove the note; the list and the current note follow the repository
+            self.repository.remove_note(note)
+            
+            # Save the notes
+            self.save_notes()
             
-            if note_index >= 0:
-                # Remove the note
-                self.notes.pop(note_index)
-                
-                # Reset the current note index
-                self.current_note_index = -1
-                
-                # Update the filtered list
-                self.note_list.set_notes(self.notes)
-                
-                # Save the notes
-                self.save_notes()
-                
 
-                # Update status bar message
-                self.status_message.setText(f"Note '{note.title}' deleted")
+            # Update status bar message
+            self.status_message.setText(f"Note '{note.title}' deleted")
     def export_note(self):
         """Export the current note to a file"""
-        if self.current_note_index < 0:
+        if self.current_note is None:
             return
         
         # Get the current note
-        note = self.note_list.filtered_notes[self.current_note_index]
+        note = self.current_note
         
         # Determine the default file format based on note type
         default_extension = ".py" if note.is_code else ".html"
@@ -1410,8 +3043,7 @@ class MainWindow(QMainWindow):
                     # For rich text, consider if we need to export as plain text
                     if file_name.lower().endswith(".txt"):
                         # Export as plain text (strip HTML)
-                        text_content = self.note_editor.text_editor.toPlainText()
-                        f.write(text_content)
+                        f.write(html_to_text(note.content))
                     else:
                         # Export as HTML
                         f.write(note.content)
@@ -1426,6 +3058,166 @@ class MainWindow(QMainWindow):
                 f"Failed to export note: {str(e)}"
             )
     
+    def export_notes(self, filtered=False):
+        """Export all notes, or the notes in the list, into an archive"""
+        if self.current_note is not None:
+            self.save_current_note()
+        
+        notes = list(self.repository.filter_notes(*self.note_list.filter)) if filtered else self.repository.notes
+        if not notes:
+            self.status_message.setText("No notes to export")
+            return
+        
+        # Pick the format, then the archive
+        formats = {
+            "HTML": "html",
+            "Plain text": "txt",
+            "Markdown": "md",
+            "Source (HTML for rich text, .py for code)": "source"
+        }
+        format_name, ok = QInputDialog.getItem(
+            self, "Export Notes", "Export format:", list(formats), 0, False
+        )
+        if not ok:
+            return
+        
+        file_name, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export Notes",
+            os.path.expanduser("~/c0lornote-export.zip"),
+            "Zip Archive (*.zip);;Tar Archive (*.tar.gz *.tar)"
+        )
+        if not file_name:
+            return
+        
+        # Workers get snapshots, never the live notes
+        snapshots = [snapshot(note) for note in notes]
+        fmt = formats[format_name]
+        
+        self.export_cancel = threading.Event()
+        self.export_signals = ExportSignals()
+        self.export_signals.progress.connect(self.export_progress)
+        self.export_signals.finished.connect(self.export_finished)
+        
+        self.export_dialog = QProgressDialog("Exporting notes...", "Cancel", 0, len(snapshots), self)
+        self.export_dialog.setWindowTitle("Export Notes")
+        self.export_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.export_dialog.setMinimumDuration(0)
+        self.export_dialog.canceled.connect(self.export_cancel.set)
+        self.export_dialog.show()
+        
+        signals = self.export_signals
+        cancel_event = self.export_cancel
+        
+        def work():
+            try:
+                # Spawn the workers: forking would copy the Qt application's threads and state
+                result = export_notes(
+                    snapshots, file_name, fmt,
+                    progress=signals.progress.emit, cancel_event=cancel_event,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            except Exception as e:
+                result = e
+            signals.finished.emit(result)
+        
+        threading.Thread(target=work, daemon=True).start()
+    
+    def export_progress(self, exported):
+        """Show export progress"""
+        self.export_dialog.setValue(exported)
+    
+    def export_finished(self, result):
+        """Report the export"""
+        self.export_dialog.reset()
+        self.export_dialog.deleteLater()
+        if isinstance(result, Exception):
+            QMessageBox.critical(self, "Export Error", f"Failed to export notes: {str(result)}")
+            return
+        self.status_message.setText(result.describe())
+    
+    def import_folder(self):
+        """Import every text and source file below a folder as notes"""
+        folder = QFileDialog.getExistingDirectory(self, "Import Folder", os.path.expanduser("~"))
+        if not folder:
+            return
+        
+        if self.current_note is not None:
+            self.save_current_note()
+        
+        # The worker thread reads files; batches are added to the repository here.
+        # At most two batches wait for the GUI so memory stays bounded.
+        self.import_slots = threading.Semaphore(2)
+        self.import_cancel = threading.Event()
+        self.import_signals = ImportSignals()
+        self.import_signals.batch.connect(self.import_batch_ready)
+        self.import_signals.progress.connect(self.import_progress)
+        self.import_signals.finished.connect(self.import_finished)
+        
+        self.import_dialog = QProgressDialog("Importing files...", "Cancel", 0, 0, self)
+        self.import_dialog.setWindowTitle("Import Folder")
+        self.import_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.import_dialog.setMinimumDuration(0)
+        self.import_dialog.canceled.connect(self.import_cancel.set)
+        self.import_dialog.show()
+        
+        # Refresh the note list once at the end instead of after every batch
+        self.note_list.set_updates_paused(True)
+        
+        signals = self.import_signals
+        slots = self.import_slots
+        cancel_event = self.import_cancel
+        
+        def add_batch(notes):
+            slots.acquire()
+            signals.batch.emit(notes)
+        
+        def progress(result, path):
+            if result.imported % 100 == 0:
+                signals.progress.emit(result.imported, path)
+        
+        def work():
+            result = import_directory(folder, add_batch, progress=progress, cancel_event=cancel_event)
+            signals.finished.emit(result)
+        
+        threading.Thread(target=work, daemon=True).start()
+    
+    def import_batch_ready(self, notes):
+        """Add a batch of imported notes to the notebook"""
+        self.repository.add_notes(notes)
+        self.import_slots.release()
+    
+    def import_progress(self, imported, path):
+        """Show import progress"""
+        self.import_dialog.setLabelText(f"Imported {imported} files\n{os.path.basename(path)}")
+    
+    def import_finished(self, result):
+        """Save the notebook and report the import"""
+        self.import_dialog.reset()
+        self.import_dialog.deleteLater()
+        self.note_list.set_updates_paused(False)
+        self.save_notes()
+        self.status_message.setText(result.describe())
+        if result.errors:
+            QMessageBox.warning(
+                self,
+                "Import Folder",
+                f"{result.describe()}\n\n" + "\n".join(
+                    f"{path}: {message}" for path, message in result.errors[:20]
+                )
+            )
+    
+    def run_all_code_notes(self):
+        """Open the batch runner for all code notes"""
+        if self.current_note is not None:
+            self.save_current_note()
+        dialog = BatchRunDialog(
+            self, self.repository.notes, self.repository.categories, self.repository.tags,
+            self.note_editor.run_limits
+        )
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.show()
+    
     def change_theme(self, theme_type):
         """Change the application theme"""
         self.theme.set_theme(theme_type)
@@ -1433,26 +3225,24 @@ class MainWindow(QMainWindow):
         # Completely refresh all theme elements
         self.apply_theme()
         
-        # Refresh all editors to ensure syntax highlighting is updated
-        if hasattr(self.note_editor, 'code_editor'):
-            # Get the current content
-            content = self.note_editor.code_editor.toPlainText()
-            # Clear and reset the content to force refresh
-            self.note_editor.code_editor.clear()
-            self.note_editor.code_editor.setPlainText(content)
+        # The code on show was re-highlighted by apply_theme; pooled documents
+        # are re-highlighted when they are next shown
         
-        # Update theme selector in sidebar
-        self.sidebar.theme_combo.setCurrentIndex(theme_type.value - 1)
+        # Update theme selector in sidebar without re-applying the theme
+        self.sidebar.theme_combo.blockSignals(True)
+        self.sidebar.theme_combo.setCurrentIndex(self.sidebar.theme_keys.index(theme_type))
+        self.sidebar.theme_combo.blockSignals(False)
         
         # Update status bar message
         theme_name = self.theme.get_current_theme()['name']
         self.status_message.setText(f"Theme changed to {theme_name}")
+    @timed("load_notes")
     def load_notes(self):
         """Load notes from disk"""
         # Define the notes file path using platform settings
         notes_dir = self.platform_settings['config_dir']
         os.makedirs(notes_dir, exist_ok=True)
-        notes_file = os.path.join(notes_dir, "notes.json")
+        notes_file = os.path.join(notes_dir, NOTES_FILE_NAME)
         
         # Check if the file exists
         if not os.path.exists(notes_file):
@@ -1461,25 +3251,17 @@ class MainWindow(QMainWindow):
             return
         
         try:
-            # Load the notes from the file
-            with open(notes_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            # Parse the notes
-            self.notes = [Note.from_dict(note_data) for note_data in data.get("notes", [])]
-            
-            # Load categories and tags
-            self.sidebar.categories = data.get("categories", [])
-            self.sidebar.tags = data.get("tags", [])
-            
-            # Update the UI
-            self.sidebar.update_categories_list()
-            self.sidebar.update_tags_list()
-            self.note_list.set_notes(self.notes)
-            
+            # Load the notes, categories and tags; the widgets refresh themselves
+            migrated = self.repository.load(notes_file)
+            if migrated and self.backup_notes_file(notes_file):
+                # Keep the converted notes so the conversion only happens once
+                self.save_notes()
 
             # Update status bar message
-            self.status_message.setText(f"Loaded {len(self.notes)} notes")
+            message = f"Loaded {len(self.repository)} notes"
+            if migrated:
+                message += f" ({migrated} converted to the compact rich text format, original kept as {NOTES_FILE_NAME}.pre-compact)"
+            self.status_message.setText(message)
         except Exception as e:
             QMessageBox.warning(
                 self,
@@ -1488,6 +3270,20 @@ class MainWindow(QMainWindow):
             )
             self.create_sample_notes()
     
+    def backup_notes_file(self, notes_file):
+        """Copy the notebook aside before its first conversion; return False if that failed"""
+        backup_file = notes_file + ".pre-compact"
+        if os.path.exists(backup_file):
+            return True  # The original from before the first conversion is kept
+        try:
+            shutil.copy2(notes_file, backup_file)
+            return True
+        except OSError as e:
+            # Without a copy, leave the file on disk as it is unless the user edits a note
+            self.repository.dirty = False
+            print(f"Could not back up {notes_file}: {e}", file=sys.stderr)
+            return False
+    
     def create_sample_notes(self):
         """Create sample notes for a new user"""
         # Create a welcome note
@@ -1508,40 +3304,28 @@ class MainWindow(QMainWindow):
             category="Code Snippets"
         )
         
-        # Add the notes
-        self.notes = [welcome_note, code_note]
-        
-        # Add categories and tags
-        self.sidebar.categories = ["Getting Started", "Code Snippets", "Personal", "Work"]
-        self.sidebar.tags = ["welcome", "tutorial", "python", "example", "important"]
-        
-        # Update the UI
-        self.sidebar.update_categories_list()
-        self.sidebar.update_tags_list()
-        self.note_list.set_notes(self.notes)
+        # Add the notes, categories and tags
+        self.repository.replace(
+            [welcome_note, code_note],
+            ["Getting Started", "Code Snippets", "Personal", "Work"],
+            ["welcome", "tutorial", "python", "example", "important"]
+        )
     
+    @timed("save_notes")
     def save_notes(self):
         """Save all notes to disk"""
         # Define the notes file path using platform settings
         notes_dir = self.platform_settings['config_dir']
         os.makedirs(notes_dir, exist_ok=True)
-        notes_file = os.path.join(notes_dir, "notes.json")
+        notes_file = os.path.join(notes_dir, NOTES_FILE_NAME)
         
         try:
-            # Prepare the data
-            data = {
-                "notes": [note.to_dict() for note in self.notes],
-                "categories": self.sidebar.categories,
-                "tags": self.sidebar.tags
-            }
-            
-            # Save the data to the file
-            with open(notes_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            # Save the notes, categories and tags to the file
+            self.repository.save(notes_file)
             
 
             # Update status bar message
-            self.status_message.setText(f"Saved {len(self.notes)} notes")
+            self.status_message.setText(f"Saved {len(self.repository)} notes")
         except Exception as e:
             QMessageBox.critical(
                 self,
@@ -1549,19 +3333,106 @@ class MainWindow(QMainWindow):
                 f"Failed to save notes: {str(e)}"
             )
     
+    def set_instrumentation_enabled(self, enabled):
+        """Start or stop recording hot-path timings and the status bar readout"""
+        recorder.enable(enabled)
+        self.perf_label.setVisible(enabled)
+        if enabled:
+            self.perf_timer.start()
+            self.update_perf_readout()
+        else:
+            self.perf_timer.stop()
+    
+    def update_perf_readout(self):
+        """Show the latest timings of the instrumented operations"""
+        self.perf_label.setText(recorder.readout() or "Recording timings...")
+    
+    def save_performance_data(self):
+        """Save the recorded timings as a summary or a Chrome trace"""
+        summary_filter = "Latency Summary (*.json)"
+        trace_filter = "Chrome Trace (*.json)"
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            "Save Performance Data",
+            os.path.expanduser("~/c0lornote-performance.json"),
+            f"{summary_filter};;{trace_filter}"
+        )
+        if not file_path:
+            return
+        
+        try:
+            recorder.dump(file_path, chrome=(selected_filter == trace_filter))
+            self.status_message.setText(f"Performance data saved to {file_path}")
+        except OSError as e:
+            QMessageBox.critical(self, "Save Error", f"Failed to save performance data: {str(e)}")
+    
     def closeEvent(self, event):
         """Handle application close event"""
         # Save the current note if one is active
-        if self.current_note_index >= 0:
+        if self.current_note is not None:
             self.save_current_note()
         
-        # Save all notes
-        self.save_notes()
+        # Save all notes if anything changed since the last save
+        if self.repository.dirty:
+            self.save_notes()
+        
+        # Do not leave code runs behind
+        self.note_editor.run_pool.stop_all()
         
         # Accept the close event
         event.accept()
 
 
+def run_code_notes(args):
+    """Run code notes without the GUI and print a summary report"""
+    notes_file = args.notes_file or os.path.join(detect_platform()['config_dir'], NOTES_FILE_NAME)
+    try:
+        notes, _, _ = read_notes_file(notes_file)
+    except (OSError, ValueError) as e:
+        print(f"Failed to load notes from {notes_file}: {e}", file=sys.stderr)
+        return 2
+    
+    jobs = select_code_notes(notes, tag=args.tag, category=args.category)
+    limits = RunLimits(wall_time=args.timeout)
+    
+    def progress(done, total, result):
+        if not args.json:
+            print(f"[{done}/{total}] {result.status:<9} {result.title}", file=sys.stderr)
+    
+    results = run_batch(jobs, limits, args.jobs, progress=progress)
+    
+    if args.json:
+        print(json.dumps([result.to_dict() for result in results], indent=2))
+    else:
+        print(format_report(results))
+    return 0 if all(result.ok for result in results) else 1
+
+
+def parse_arguments(argv):
+    """Parse command line options, leaving unknown ones for Qt"""
+    parser = argparse.ArgumentParser(description="C0lorNote note-taking application")
+    parser.add_argument("--run-code-notes", action="store_true",
+                        help="run every code note headlessly and print a report")
+    parser.add_argument("--tag", help="only run code notes with this tag")
+    parser.add_argument("--category", help="only run code notes in this category")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="number of code notes to run in parallel")
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="wall-clock limit per code note in seconds (0 = unlimited)")
+    parser.add_argument("--notes-file", help="notes.json to use instead of the default one")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long each startup phase takes to stderr")
+    parser.add_argument("--instrument", action="store_true",
+                        help="record hot-path timings (also enabled by C0LORNOTE_INSTRUMENT=1)")
+    parser.add_argument("--trace-file",
+                        help="write the recorded timings as a Chrome trace to this file on exit")
+    parser.add_argument("--detect-stalls", type=int, nargs="?", const=250, default=None, metavar="MS",
+                        help="log event loop stalls longer than MS milliseconds (default 250) "
+                             "to stalls.log in the config directory")
+    return parser.parse_known_args(argv)
+
+
 def detect_platform():
     """Detect the current platform and return platform-specific settings"""
     system = platform.system().lower()
@@ -1570,45 +3441,89 @@ def detect_platform():
         return {
             'default_theme': ThemeType.MATRIX,
             'font_scaling': 1.0,
-            'config_dir': os.path.join(os.path.expanduser("~"), ".config", "c0lornote")
+            'config_dir': default_config_dir()
         }
     elif system == 'darwin':  # macOS
         return {
             'default_theme': ThemeType.APPLE_LIGHT,
             'font_scaling': 1.2,  # macOS often needs larger fonts
-            'config_dir': os.path.join(os.path.expanduser("~"), "Library", "Application Support", "c0lornote")
+            'config_dir': default_config_dir()
         }
     elif system == 'windows':
         return {
             'default_theme': ThemeType.SPACE_RED,
             'font_scaling': 1.0,
-            'config_dir': os.path.join(os.getenv('APPDATA'), "c0lornote")
+            'config_dir': default_config_dir()
         }
     elif 'android' in system:
         return {
             'default_theme': ThemeType.DREAMCORE,
             'font_scaling': 1.3,  # Mobile needs larger fonts
-            'config_dir': os.path.join(os.path.expanduser("~"), ".c0lornote")
+            'config_dir': default_config_dir()
         }
     else:  # Default fallback
         return {
             'default_theme': ThemeType.MATRIX,
             'font_scaling': 1.0,
-            'config_dir': os.path.join(os.path.expanduser("~"), ".c0lornote")
+            'config_dir': default_config_dir()
         }
 
 
 def main():
     """Main application entry point"""
+    # Let export worker processes start in frozen builds
+    multiprocessing.freeze_support()
+    
+    args, qt_args = parse_arguments(sys.argv[1:])
+    
+    # Headless batch run of code notes
+    if args.run_code_notes:
+        sys.exit(run_code_notes(args))
+    
+    # Opt-in hot-path instrumentation
+    if args.instrument or args.trace_file or enabled_from_environment():
+        recorder.enable()
+    
     # Create the application
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
+    
+    # Watchdog for event loop stalls, fed by a heartbeat timer on the main thread
+    stall_ms = args.detect_stalls or stall_ms_from_environment()
+    stall_detector = None
+    if stall_ms > 0:
+        stall_detector = StallDetector(
+            stall_ms / 1000,
+            log_path=os.path.join(detect_platform()['config_dir'], "stalls.log")
+        )
+        heartbeat = QTimer(app)
+        heartbeat.setInterval(max(10, stall_ms // 5))
+        heartbeat.timeout.connect(stall_detector.beat)
+        heartbeat.start()
+        stall_detector.start()
+    
+    profiler = StartupProfiler() if args.profile_startup else None
+    if profiler is not None:
+        profiler.mark("QApplication")
     
-    # Create and show the main window
-    window = MainWindow()
+    # Create and show the main window; notes load right after the first paint
+    window = MainWindow(defer_startup=True, startup_profiler=profiler)
+    if profiler is not None:
+        profiler.watch(window)
     window.show()
     
     # Run the application event loop
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    
+    if stall_detector is not None:
+        stall_detector.stop()
+        print(stall_detector.summary(), file=sys.stderr)
+    
+    if args.trace_file:
+        try:
+            recorder.dump(args.trace_file, chrome=True)
+        except OSError as e:
+            print(f"Failed to write trace file {args.trace_file}: {e}", file=sys.stderr)
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Command line tool for C0lorNote notebooks
+
+Works directly on notes.json through note_store, without PyQt6, so bulk
+maintenance of large notebooks runs in seconds. Results are printed as they
+are found; --json prints one JSON object per line.
+
+Usage:
+    python note_cli.py [--notes-file FILE] list [--tag T] [--category C] [--code | --text] [--json]
+    python note_cli.py search TERM [filters] [--json]
+    python note_cli.py export OUTPUT [filters] [--format html|txt|md|source]
+    python note_cli.py import PATH [PATH ...] [--category C] [--tag T]   (files, folders or .json notebooks)
+    python note_cli.py tag TAG [filters] [--remove]
+    python note_cli.py retag OLD NEW
+    python note_cli.py stats [--json]
+    python note_cli.py compact
+"""
+
+import os
+import sys
+import json
+import argparse
+from collections import Counter
+
+from note_store import NoteRepository, default_notes_file, read_notes_file
+from note_import import note_from_file, import_directory
+from note_export import FORMATS, snapshot, export_notes
+
+
+def add_filter_arguments(parser, match=True):
+    """Add the note selection options shared by several commands"""
+    parser.add_argument("--tag", help="only notes with this tag")
+    parser.add_argument("--category", help="only notes in this category")
+    kind = parser.add_mutually_exclusive_group()
+    kind.add_argument("--code", action="store_true", help="only code notes")
+    kind.add_argument("--text", action="store_true", help="only rich text notes")
+    if match:
+        parser.add_argument("--match", help="only notes whose title or content contains this text")
+
+
+def select_notes(notes, args):
+    """Yield the notes matching the filter options in args"""
+    term = args.match.lower() if getattr(args, "match", None) else None
+    for note in notes:
+        if args.tag and args.tag not in note.tags:
+            continue
+        if args.category and note.category != args.category:
+            continue
+        if args.code and not note.is_code:
+            continue
+        if args.text and note.is_code:
+            continue
+        if term and not note.matches(term):
+            continue
+        yield note
+
+
+def summary_line(note):
+    """Format a note as one line of text output"""
+    kind = "code" if note.is_code else "text"
+    tags = ",".join(note.tags)
+    return (f"{note.id[:8]}  {note.modified_date:%Y-%m-%d %H:%M}  {kind:<4}  "
+            f"{note.category or '-':<16}  {note.title}" + (f"  [{tags}]" if tags else ""))
+
+
+def print_notes(notes, as_json, limit=None):
+    """Print notes as they come and return how many were printed"""
+    count = 0
+    for note in notes:
+        if as_json:
+            data = note.to_dict()
+            data.pop("content")
+            print(json.dumps(data))
+        else:
+            print(summary_line(note))
+        count += 1
+        if limit and count >= limit:
+            break
+    return count
+
+
+def command_list(args, repository):
+    """List notes"""
+    count = print_notes(select_notes(repository, args), args.json, args.limit)
+    if not args.json:
+        print(f"{count} note(s)", file=sys.stderr)
+    return 0
+
+
+def command_search(args, repository):
+    """Search titles and content"""
+    args.match = args.term
+    count = print_notes(select_notes(repository, args), args.json, args.limit)
+    if not args.json:
+        print(f"{count} match(es)", file=sys.stderr)
+    return 0 if count else 1
+
+
+def command_export(args, repository):
+    """Render the selected notes into a folder or a zip or tar archive"""
+    notes = (snapshot(note) for note in select_notes(repository, args))
+    result = export_notes(notes, args.output, args.format, max_workers=args.jobs)
+    print(result.describe(), file=sys.stderr)
+    return 0
+
+
+def command_import(args, repository):
+    """Add notes from files, directory trees, or the notes of other notebooks (.json)"""
+    imported = []
+    failed = 0
+
+    def add_batch(notes):
+        for note in notes:
+            print(summary_line(note))
+        repository.add_notes(notes)
+
+    for path in args.paths:
+        if os.path.isdir(path):
+            # Each file's folder becomes its category
+            result = import_directory(path, add_batch, tags=args.tag)
+            for error_path, message in result.errors:
+                print(f"Skipping {error_path}: {message}", file=sys.stderr)
+            failed += len(result.errors)
+            print(f"{path}: {result.describe()}", file=sys.stderr)
+            continue
+        try:
+            if path.lower().endswith(".json"):
+                new_notes, new_categories, new_tags = read_notes_file(path)
+                new_notes = [note for note in new_notes if repository.get(note.id) is None]
+                for category in new_categories:
+                    repository.add_category(category)
+                for tag in new_tags:
+                    repository.add_tag(tag)
+            else:
+                note = note_from_file(path, args.category, args.tag)
+                if note is None:
+                    raise ValueError("not a text file")
+                new_notes = [note]
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Skipping {path}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        for note in new_notes:
+            print(summary_line(note))
+        imported.extend(new_notes)
+
+    repository.add_notes(imported)
+    repository.save(args.notes_file)
+    if imported:
+        print(f"Imported {len(imported)} note(s)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def command_tag(args, repository):
+    """Add a tag to, or remove it from, the selected notes"""
+    changed = 0
+    for note in list(select_notes(repository, args)):
+        if args.remove:
+            if args.name not in note.tags:
+                continue
+            tags = [tag for tag in note.tags if tag != args.name]
+        else:
+            if args.name in note.tags:
+                continue
+            tags = note.tags + [args.name]
+        repository.update_note(note, tags=tags)
+        changed += 1
+        print(summary_line(note))
+
+    if repository.dirty:
+        repository.save(args.notes_file)
+    print(f"{'Untagged' if args.remove else 'Tagged'} {changed} note(s)", file=sys.stderr)
+    return 0
+
+
+def command_retag(args, repository):
+    """Rename a tag on every note"""
+    changed = 0
+    for note in repository:
+        if args.old not in note.tags:
+            continue
+        # Merging into an existing tag must not leave it twice on a note
+        tags = list(dict.fromkeys(args.new if tag == args.old else tag for tag in note.tags))
+        repository.update_note(note, tags=tags)
+        changed += 1
+        print(summary_line(note))
+
+    tags = repository.tags
+    if args.old in tags:
+        if args.new in tags:
+            tags.remove(args.old)
+        else:
+            tags[tags.index(args.old)] = args.new
+    repository.save(args.notes_file)
+    print(f"Renamed '{args.old}' to '{args.new}' on {changed} note(s)", file=sys.stderr)
+    return 0
+
+
+def command_stats(args, repository):
+    """Print counts and sizes for the notebook"""
+    notes, categories, tags = repository.notes, repository.categories, repository.tags
+    code = sum(1 for note in notes if note.is_code)
+    sizes = [len(note.content) for note in notes]
+    stats = {
+        "notes": len(notes),
+        "code_notes": code,
+        "text_notes": len(notes) - code,
+        "content_chars": sum(sizes),
+        "largest_note_chars": max(sizes, default=0),
+        "categories": len(categories),
+        "tags": len(tags),
+        "notes_per_category": dict(Counter(note.category or "(none)" for note in notes).most_common(10)),
+        "notes_per_tag": dict(Counter(tag for note in notes for tag in note.tags).most_common(10)),
+        "oldest": min((note.created_date for note in notes), default=None),
+        "last_modified": max((note.modified_date for note in notes), default=None),
+    }
+
+    if args.json:
+        print(json.dumps(stats, default=str, indent=2))
+        return 0
+
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            print(f"{key}:")
+            for name, count in value.items():
+                print(f"  {count:>8}  {name}")
+        else:
+            print(f"{key}: {value}")
+    return 0
+
+
+def command_compact(args, repository):
+    """Save rich text notes stored as full Qt documents in the compact format"""
+    # Loading the notebook has already converted them
+    if not repository.dirty:
+        print("All rich text notes are already compact", file=sys.stderr)
+        return 0
+    before = os.path.getsize(args.notes_file)
+    repository.save(args.notes_file)
+    after = os.path.getsize(args.notes_file)
+    print(f"Compacted {args.notes_file}: {before:,} -> {after:,} bytes", file=sys.stderr)
+    return 0
+
+
+def parse_arguments(argv):
+    """Parse the command line"""
+    parser = argparse.ArgumentParser(description="Work with C0lorNote notebooks without the GUI")
+    parser.add_argument("--notes-file", default=default_notes_file(),
+                        help="notes.json to use instead of the default one")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="list notes")
+    add_filter_arguments(list_parser)
+    list_parser.add_argument("--limit", type=int, help="stop after this many notes")
+    list_parser.add_argument("--json", action="store_true", help="print one JSON object per line")
+    list_parser.set_defaults(func=command_list)
+
+    search_parser = commands.add_parser("search", help="search note titles and content")
+    search_parser.add_argument("term", type=str.lower)
+    add_filter_arguments(search_parser, match=False)
+    search_parser.add_argument("--limit", type=int, help="stop after this many matches")
+    search_parser.add_argument("--json", action="store_true", help="print one JSON object per line")
+    search_parser.set_defaults(func=command_search)
+
+    export_parser = commands.add_parser("export", help="render notes into a folder or a zip/tar archive")
+    export_parser.add_argument("output", help="folder, or archive ending in .zip, .tar, .tar.gz, ...")
+    add_filter_arguments(export_parser)
+    export_parser.add_argument("--format", choices=sorted(FORMATS), default="source",
+                               help="html, txt, md, or source (HTML for rich text, .py for code)")
+    export_parser.add_argument("--jobs", type=int, help="number of worker processes")
+    export_parser.set_defaults(func=command_export)
+
+    import_parser = commands.add_parser("import", help="add files, folders or notebooks as notes")
+    import_parser.add_argument("paths", nargs="+", metavar="PATH")
+    import_parser.add_argument("--category", help="category for the imported notes")
+    import_parser.add_argument("--tag", action="append", help="tag for the imported notes (repeatable)")
+    import_parser.set_defaults(func=command_import)
+
+    tag_parser = commands.add_parser("tag", help="add a tag to the selected notes")
+    tag_parser.add_argument("name", metavar="TAG")
+    add_filter_arguments(tag_parser)
+    tag_parser.add_argument("--remove", action="store_true", help="remove the tag instead")
+    tag_parser.set_defaults(func=command_tag)
+
+    retag_parser = commands.add_parser("retag", help="rename a tag on every note")
+    retag_parser.add_argument("old")
+    retag_parser.add_argument("new")
+    retag_parser.set_defaults(func=command_retag)
+
+    stats_parser = commands.add_parser("stats", help="show notebook statistics")
+    stats_parser.add_argument("--json", action="store_true", help="print the statistics as JSON")
+    stats_parser.set_defaults(func=command_stats)
+
+    compact_parser = commands.add_parser("compact", help="store rich text notes in the compact format")
+    compact_parser.set_defaults(func=command_compact)
+
+    return parser.parse_args(argv)
+
+
+def load_notebook(notes_file, must_exist):
+    """Return a NoteRepository for notes_file, empty if the file does not exist yet"""
+    repository = NoteRepository()
+    if os.path.exists(notes_file) or must_exist:
+        repository.load(notes_file)
+    return repository
+
+
+def main(argv=None):
+    """Command line entry point"""
+    args = parse_arguments(sys.argv[1:] if argv is None else argv)
+    try:
+        repository = load_notebook(args.notes_file, must_exist=(args.command != "import"))
+    except (OSError, ValueError) as e:
+        print(f"Failed to load notes from {args.notes_file}: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        return args.func(args, repository)
+    except BrokenPipeError:
+        # Output was piped into something like head that stopped reading;
+        # point stdout at devnull so the exit flush does not fail again
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bulk export of C0lorNote notes
+
+Renders notes to HTML, plain text, Markdown or their source form in worker
+processes and streams the files into a zip or tar archive (or a folder) as
+they come back. Only a bounded number of chunks is in flight at any time, so
+memory stays flat however large the notebook is.
+
+This module does not import PyQt6 and never touches widgets; callers pass
+snapshots of the notes (see snapshot()).
+"""
+
+import io
+import os
+import re
+import html
+import time
+import tarfile
+import zipfile
+import threading
+from collections import deque
+
+from html_convert import html_to_text, html_to_markdown
+
+# Export formats and the file extension used for rich text notes in each
+FORMATS = {
+    "html": ".html",
+    "txt": ".txt",
+    "md": ".md",
+    "source": ".html",  # rich text stays HTML, code notes become .py files
+}
+
+# Notes rendered per task sent to a worker process
+CHUNK_SIZE = 64
+
+
+def snapshot(note):
+    """Return the picklable fields of a note needed for export"""
+    return (note.id, note.title, note.content, note.is_code, note.category)
+
+
+def safe_file_name(title):
+    """Turn a note title into a file name"""
+    name = re.sub(r"[^\w\- .]+", "_", title).strip(" .")
+    return name[:100] or "Untitled"
+
+
+def render(note, fmt):
+    """Render one note snapshot and return (extension, bytes)"""
+    _, title, content, is_code, _ = note
+    if is_code:
+        if fmt == "html":
+            body = f"<pre><code>{html.escape(content)}</code></pre>"
+            text = f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head>\n<body>{body}</body></html>\n"
+            return ".html", text.encode("utf-8")
+        if fmt == "md":
+            return ".md", f"# {title}\n\n```python\n{content}\n```\n".encode("utf-8")
+        if fmt == "txt":
+            return ".txt", content.encode("utf-8")
+        return ".py", content.encode("utf-8")
+
+    if fmt == "txt":
+        return ".txt", html_to_text(content).encode("utf-8")
+    if fmt == "md":
+        return ".md", f"# {title}\n\n{html_to_markdown(content)}".encode("utf-8")
+    return ".html", content.encode("utf-8")
+
+
+def render_chunk(notes, fmt):
+    """Render a list of note snapshots; runs in a worker process"""
+    return [render(note, fmt) for note in notes]
+
+
+class DirectoryWriter:
+    """Writes exported files into a folder"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def add(self, name, data):
+        target = os.path.join(self.path, *name.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+
+class ZipWriter:
+    """Streams exported files into a zip archive"""
+
+    def __init__(self, path):
+        self.archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def add(self, name, data):
+        self.archive.writestr(name, data)
+
+    def close(self):
+        self.archive.close()
+
+
+class TarWriter:
+    """Streams exported files into a tar archive, compressed by its extension"""
+
+    def __init__(self, path):
+        mode = "w"
+        if path.endswith((".tar.gz", ".tgz")):
+            mode = "w:gz"
+        elif path.endswith(".tar.bz2"):
+            mode = "w:bz2"
+        elif path.endswith(".tar.xz"):
+            mode = "w:xz"
+        self.archive = tarfile.open(path, mode)
+        self.mtime = time.time()
+
+    def add(self, name, data):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = self.mtime
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.archive.close()
+
+
+def open_writer(path):
+    """Return a writer for path: a zip or tar archive by extension, otherwise a folder"""
+    lower = path.lower()
+    if lower.endswith(".zip"):
+        return ZipWriter(path)
+    if lower.endswith((".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")):
+        return TarWriter(path)
+    return DirectoryWriter(path)
+
+
+class ExportResult:
+    """Counts of what an export did"""
+
+    def __init__(self, path):
+        self.path = path
+        self.exported = 0
+        self.cancelled = False
+
+    def describe(self):
+        """Return a one-line summary"""
+        text = f"Exported {self.exported} note(s) to {self.path}"
+        if self.cancelled:
+            text += " (cancelled)"
+        return text
+
+
+def export_notes(notes, path, fmt="html", max_workers=None, progress=None, cancel_event=None, mp_context=None):
+    """Render note snapshots in parallel and stream them to path
+
+    notes is an iterable of snapshot() tuples. Files are named
+    category/title.ext. progress(done) is called after every chunk, and
+    setting cancel_event stops the export after the chunks in flight.
+    mp_context picks how the worker processes are started; a GUI must pass
+    a "spawn" context, since forking a running Qt application is unsafe.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    max_workers = max_workers or os.cpu_count() or 1
+    window = max_workers * 2  # Most chunks in flight at once
+    cancel_event = cancel_event or threading.Event()
+    result = ExportResult(path)
+    used_names = set()
+    pending = deque()
+    writer = open_writer(path)
+
+    def collect(chunk, future):
+        for note, (extension, data) in zip(chunk, future.result()):
+            note_id, title, _, _, category = note
+            folder = safe_file_name(category) + "/" if category else ""
+            name = folder + safe_file_name(title)
+            if (name + extension).lower() in used_names:
+                name = f"{name}-{note_id[:8]}"
+            used_names.add((name + extension).lower())
+            writer.add(name + extension, data)
+            result.exported += 1
+        if progress:
+            progress(result.exported)
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+            chunk = []
+            for note in notes:
+                chunk.append(note)
+                if len(chunk) < CHUNK_SIZE:
+                    continue
+                if cancel_event.is_set():
+                    result.cancelled = True
+                    break
+                pending.append((chunk, executor.submit(render_chunk, chunk, fmt)))
+                chunk = []
+                if len(pending) >= window:
+                    collect(*pending.popleft())
+            if chunk and not result.cancelled:
+                pending.append((chunk, executor.submit(render_chunk, chunk, fmt)))
+
+            while pending:
+                collect(*pending.popleft())
+    finally:
+        writer.close()
+    return result
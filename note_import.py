@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bulk import of files into a C0lorNote notebook
+
+Walks a directory tree and turns every text, markdown, HTML and source file
+into a Note: source files become code notes, and the folder a file is in
+(relative to the imported directory) becomes its category. Files are read
+and decoded on a thread pool with a bounded number of reads in flight, and
+notes are handed to the caller in batches, so large trees are imported
+without reading them all into memory first.
+
+This module does not import PyQt6; the GUI and note_cli.py both use it.
+"""
+
+import os
+import html
+import threading
+from collections import deque
+
+from note_store import Note
+
+# File extensions imported as code notes
+CODE_EXTENSIONS = {
+    ".py", ".pyw", ".js", ".ts", ".c", ".h", ".cpp", ".hpp", ".java", ".go", ".rs",
+    ".rb", ".sh", ".sql", ".css", ".yaml", ".yml", ".toml", ".ini", ".cfg"
+}
+
+# File extensions imported as rich text notes without conversion
+HTML_EXTENSIONS = {".html", ".htm"}
+
+# File extensions imported as rich text notes from plain text
+TEXT_EXTENSIONS = {".txt", ".md", ".markdown", ".rst", ".log"}
+
+# Files larger than this are skipped
+MAX_FILE_BYTES = 5 * 1024 * 1024
+
+
+class ImportResult:
+    """Counts of what an import did"""
+
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []  # (path, message)
+        self.cancelled = False
+
+    def describe(self):
+        """Return a one-line summary"""
+        text = f"Imported {self.imported} file(s)"
+        if self.skipped:
+            text += f", skipped {self.skipped}"
+        if self.errors:
+            text += f", {len(self.errors)} error(s)"
+        if self.cancelled:
+            text += " (cancelled)"
+        return text
+
+
+def is_importable(path):
+    """Return True if the file extension is one the importer understands"""
+    extension = os.path.splitext(path)[1].lower()
+    return extension in CODE_EXTENSIONS or extension in HTML_EXTENSIONS or extension in TEXT_EXTENSIONS
+
+
+def iter_files(root):
+    """Yield importable files under root, skipping hidden files and folders"""
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(name for name in subdirectories if not name.startswith("."))
+        for name in sorted(files):
+            if not name.startswith(".") and is_importable(name):
+                yield os.path.join(directory, name)
+
+
+def text_to_html(text):
+    """Convert plain text to rich text paragraphs"""
+    return "".join(f"<p>{html.escape(line)}</p>" for line in text.splitlines())
+
+
+def decode(data):
+    """Decode file contents, or return None for binary data"""
+    if b"\0" in data[:8192]:
+        return None
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def note_from_file(path, category=None, tags=None):
+    """Create a note from a source, HTML or text file, or return None if it is not text"""
+    if os.path.getsize(path) > MAX_FILE_BYTES:
+        return None
+    with open(path, "rb") as f:
+        content = decode(f.read())
+    if content is None:
+        return None
+
+    title, extension = os.path.splitext(os.path.basename(path))
+    extension = extension.lower()
+    tags = list(tags or [])
+    if extension in CODE_EXTENSIONS:
+        return Note(title=title, content=content, is_code=True, tags=tags, category=category)
+    if extension not in HTML_EXTENSIONS:
+        content = text_to_html(content)
+    return Note(title=title, content=content, tags=tags, category=category)
+
+
+def folder_category(path, root):
+    """Return the category for a file: its folder relative to root"""
+    folder = os.path.relpath(os.path.dirname(path), root)
+    if folder == ".":
+        return os.path.basename(os.path.abspath(root))
+    return folder.replace(os.sep, "/")
+
+
+def import_directory(root, add_batch, batch_size=500, max_workers=None, tags=None,
+                     progress=None, cancel_event=None):
+    """Import every file under root and return an ImportResult
+
+    add_batch(notes) is called with lists of up to batch_size notes, in file
+    order. progress(result, path) is called after every file. Setting
+    cancel_event stops the import after the files already being read.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    max_workers = max_workers or min(8, (os.cpu_count() or 1) + 2)
+    window = max_workers * 4  # Most reads in flight at once
+    cancel_event = cancel_event or threading.Event()
+    result = ImportResult()
+    batch = []
+    pending = deque()
+    categories = {}  # folder -> category, worked out once per folder
+
+    def collect(path, future):
+        try:
+            note = future.result()
+        except (OSError, ValueError) as e:
+            result.errors.append((path, str(e)))
+        else:
+            if note is None:
+                result.skipped += 1
+            else:
+                batch.append(note)
+                result.imported += 1
+        if progress:
+            progress(result, path)
+        if len(batch) >= batch_size:
+            add_batch(list(batch))
+            batch.clear()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for path in iter_files(root):
+            if cancel_event.is_set():
+                result.cancelled = True
+                break
+            folder = os.path.dirname(path)
+            category = categories.get(folder)
+            if category is None:
+                category = categories[folder] = folder_category(path, root)
+            future = executor.submit(note_from_file, path, category, tags)
+            pending.append((path, future))
+            if len(pending) >= window:
+                collect(*pending.popleft())
+
+        while pending:
+            collect(*pending.popleft())
+
+    if batch:
+        add_batch(batch)
+    return result
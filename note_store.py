@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Note data layer for C0lorNote
+
+The Note model and reading and writing of the notes.json file. This module
+does not import PyQt6, so the command line tools can work on a notebook
+without starting Qt.
+"""
+
+import os
+import html
+import json
+import uuid
+import hashlib
+import datetime
+import platform
+
+from html_convert import html_to_text
+from rich_text import migrate_notes
+
+# Name of the notebook file inside the config directory
+NOTES_FILE_NAME = "notes.json"
+
+
+class Note:
+    """Class representing a note"""
+
+    def __init__(self, title="", content="", is_code=False, tags=None, category=None, note_id=None):
+        self.id = note_id or uuid.uuid4().hex
+        self.title = title
+        self.content = content
+        self.is_code = is_code
+        self.tags = tags or []
+        self.category = category
+        self.created_date = datetime.datetime.now()
+        self.modified_date = self.created_date
+
+    def to_dict(self):
+        """Convert note to dictionary for serialization"""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "content": self.content,
+            "is_code": self.is_code,
+            "tags": self.tags,
+            "category": self.category,
+            "created_date": self.created_date.isoformat(),
+            "modified_date": self.modified_date.isoformat()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create note from dictionary"""
+        note = cls(
+            title=data.get("title", ""),
+            content=data.get("content", ""),
+            is_code=data.get("is_code", False),
+            tags=data.get("tags", []),
+            category=data.get("category"),
+            note_id=data.get("id") or derived_id(data)
+        )
+        note.created_date = datetime.datetime.fromisoformat(data.get("created_date", datetime.datetime.now().isoformat()))
+        note.modified_date = datetime.datetime.fromisoformat(data.get("modified_date", datetime.datetime.now().isoformat()))
+        return note
+
+    def matches(self, term):
+        """Return True if the lowercase term occurs in the title or the note's text"""
+        if term in self.title.lower():
+            return True
+        content = self.content.lower()
+        if self.is_code:
+            return term in content
+        # Only convert rich text whose HTML could contain the term; Qt escapes
+        # double quotes but not single ones, other writers may escape both
+        escaped = html.escape(term, quote=False)
+        forms = (term, escaped, escaped.replace('"', "&quot;"), html.escape(term))
+        if not any(form in content for form in forms):
+            return False
+        return term in html_to_text(self.content).lower()
+
+
+def derived_id(data, occurrence=0):
+    """Return a stable id for a stored note that has none
+
+    The id is a hash of the note's title, content and creation date, so it is
+    the same every time the notebook is loaded. occurrence tells apart
+    otherwise identical notes.
+    """
+    key = json.dumps([data.get("title", ""), data.get("content", ""), data.get("created_date"), occurrence])
+    return hashlib.blake2b(key.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+def default_config_dir():
+    """Return the platform's C0lorNote configuration directory"""
+    system = platform.system().lower()
+
+    if system == 'linux':
+        return os.path.join(os.path.expanduser("~"), ".config", "c0lornote")
+    elif system == 'darwin':  # macOS
+        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", "c0lornote")
+    elif system == 'windows':
+        return os.path.join(os.getenv('APPDATA'), "c0lornote")
+    else:  # Android and other systems
+        return os.path.join(os.path.expanduser("~"), ".c0lornote")
+
+
+def default_notes_file():
+    """Return the path of the notebook the GUI uses"""
+    return os.path.join(default_config_dir(), NOTES_FILE_NAME)
+
+
+def read_notes_file(notes_file):
+    """Read notes, categories and tags from a notes.json file"""
+    with open(notes_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    notes = []
+    seen = set()
+    for note_data in data.get("notes", []):
+        note = Note.from_dict(note_data)
+        # Identical notes without ids would get the same derived id
+        occurrence = 0
+        while not note_data.get("id") and note.id in seen:
+            occurrence += 1
+            note.id = derived_id(note_data, occurrence)
+        seen.add(note.id)
+        notes.append(note)
+    return notes, data.get("categories", []), data.get("tags", [])
+
+
+def write_notes_file(notes_file, notes, categories, tags):
+    """Write notes, categories and tags to a notes.json file"""
+    directory = os.path.dirname(notes_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    data = {
+        "notes": [note.to_dict() for note in notes],
+        "categories": categories,
+        "tags": tags
+    }
+    with open(notes_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+class NoteCursor:
+    """Lazy, resumable walk over the notes that match a filter
+
+    Notes are only tested as they are fetched, so the first page of a search
+    is ready as soon as enough matches are found, and no list of every
+    matching note is built. Iterating a cursor yields the notes it has not
+    fetched yet.
+    """
+
+    def __init__(self, notes, predicate=None):
+        self.notes = notes
+        self.predicate = predicate  # None matches every note
+        self.position = 0  # Index in notes of the next note to test
+
+    def at_end(self):
+        """Return True when every note has been tested"""
+        return self.position >= len(self.notes)
+
+    def fetch(self, count):
+        """Return up to count more matching notes"""
+        notes = self.notes
+        predicate = self.predicate
+        if predicate is None:
+            batch = notes[self.position:self.position + count]
+            self.position += len(batch)
+            return batch
+
+        batch = []
+        position = self.position
+        while position < len(notes) and len(batch) < count:
+            note = notes[position]
+            position += 1
+            if predicate(note):
+                batch.append(note)
+        self.position = position
+        return batch
+
+    def __iter__(self):
+        while not self.at_end():
+            yield from self.fetch(1000)
+
+
+class NoteRepository:
+    """Owns a notebook's notes, categories and tags and reports every change
+
+    Listeners registered with subscribe() are called as listener(event, notes)
+    where event is one of ADDED, UPDATED, REMOVED, BULK (the whole notebook was
+    replaced) or LABELS (the category or tag lists changed), and notes is the
+    list of affected notes (empty for BULK and LABELS).
+    """
+
+    ADDED = "added"
+    UPDATED = "updated"
+    REMOVED = "removed"
+    BULK = "bulk"
+    LABELS = "labels"
+
+    def __init__(self):
+        self.notes = []
+        self.categories = []
+        self.tags = []
+        self.by_id = {}
+        self.listeners = []
+        self.dirty = False  # True when there are changes that have not been saved
+
+    def __len__(self):
+        return len(self.notes)
+
+    def __iter__(self):
+        return iter(self.notes)
+
+    def subscribe(self, listener):
+        """Call listener(event, notes) after every change"""
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """Stop calling listener"""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, event, notes=()):
+        """Report a change to every listener"""
+        for listener in list(self.listeners):
+            listener(event, list(notes))
+
+    def get(self, note_id):
+        """Return the note with note_id, or None"""
+        return self.by_id.get(note_id)
+
+    def load(self, notes_file):
+        """Replace the notebook with the contents of a notes.json file
+
+        Rich text notes saved as full Qt documents are converted to the compact
+        format; returns how many were, and leaves the notebook dirty if any were.
+        """
+        notes, categories, tags = read_notes_file(notes_file)
+        migrated = migrate_notes(notes)
+        self.replace(notes, categories, tags)
+        self.dirty = migrated > 0
+        return migrated
+
+    def save(self, notes_file):
+        """Write the notebook to a notes.json file"""
+        write_notes_file(notes_file, self.notes, self.categories, self.tags)
+        self.dirty = False
+
+    def replace(self, notes, categories, tags):
+        """Replace all notes, categories and tags at once"""
+        self.notes = list(notes)
+        self.categories = list(categories)
+        self.tags = list(tags)
+        self.by_id = {note.id: note for note in self.notes}
+        self.dirty = True
+        self.notify(self.BULK)
+
+    def add_note(self, note):
+        """Add a single note"""
+        self.add_notes([note])
+
+    def add_notes(self, notes):
+        """Add several notes, registering any new categories and tags"""
+        notes = list(notes)
+        if not notes:
+            return
+        for note in notes:
+            self.notes.append(note)
+            self.by_id[note.id] = note
+        self.dirty = True
+        self.remember_labels(notes)
+        self.notify(self.ADDED, notes)
+
+    def update_note(self, note, **changes):
+        """Change attributes of a note and stamp its modification date"""
+        for name, value in changes.items():
+            setattr(note, name, value)
+        note.modified_date = datetime.datetime.now()
+        self.dirty = True
+        self.remember_labels([note])
+        self.notify(self.UPDATED, [note])
+
+    def remove_note(self, note):
+        """Remove a note"""
+        if self.by_id.pop(note.id, None) is None:
+            return
+        self.notes.remove(note)
+        self.dirty = True
+        self.notify(self.REMOVED, [note])
+
+    def add_category(self, name):
+        """Add a category if it is new"""
+        if name and name not in self.categories:
+            self.categories.append(name)
+            self.dirty = True
+            self.notify(self.LABELS)
+
+    def add_tag(self, name):
+        """Add a tag if it is new"""
+        if name and name not in self.tags:
+            self.tags.append(name)
+            self.dirty = True
+            self.notify(self.LABELS)
+
+    def remember_labels(self, notes):
+        """Add categories and tags used by notes to the notebook's lists"""
+        changed = False
+        for note in notes:
+            if note.category and note.category not in self.categories:
+                self.categories.append(note.category)
+                changed = True
+            for tag in note.tags:
+                if tag not in self.tags:
+                    self.tags.append(tag)
+                    changed = True
+        if changed:
+            self.notify(self.LABELS)
+
+    def filter_notes(self, filter_type, filter_value=""):
+        """Return a NoteCursor over the notes matching one of the sidebar filters or a search term"""
+        if filter_type == "recent":
+            # Notes from the last 7 days
+            seven_days_ago = datetime.datetime.now() - datetime.timedelta(days=7)
+            return NoteCursor(self.notes, lambda note: note.modified_date >= seven_days_ago)
+        elif filter_type == "code":
+            return NoteCursor(self.notes, lambda note: note.is_code)
+        elif filter_type == "category":
+            return NoteCursor(self.notes, lambda note: note.category == filter_value)
+        elif filter_type == "tag":
+            return NoteCursor(self.notes, lambda note: filter_value in note.tags)
+        elif filter_type == "search":
+            term = filter_value.lower()
+            return NoteCursor(self.notes, lambda note: note.matches(term))
+        return NoteCursor(self.notes)
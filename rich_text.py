@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compact storage format for C0lorNote's rich text notes
+
+QTextEdit.toHtml() writes a full HTML document for even a one-line note: a
+DOCTYPE, meta tags, a style block, and the same margin and indent styles on
+every paragraph. compact_html() keeps only what differs from the defaults:
+
+    <p>Hello <b>bold</b> <i><u>words</u></i> in <font color="#ff0000">red</font></p>
+
+Bold, italic, underline and color become <b>, <i>, <u> and <font color>;
+any other style is kept as it was, so the conversion loses nothing. The
+editor reads the compact form back with STYLE_SHEET as its document's
+default style sheet, which restores the paragraph defaults Qt leaves out.
+
+This module does not import PyQt6.
+"""
+
+import re
+import html
+from html.parser import HTMLParser
+
+# Default style sheet for documents showing compact rich text
+STYLE_SHEET = "p, li { white-space: pre-wrap; } p { margin-top: 0px; margin-bottom: 0px; }"
+
+# Block style properties Qt writes with these values on every paragraph
+_BLOCK_DEFAULTS = {
+    "margin-left": "0px",
+    "margin-right": "0px",
+    "-qt-block-indent": "0",
+    "text-indent": "0px",
+    "-qt-list-indent": "1",
+}
+
+# Elements whose top and bottom margins are 0px unless a style says otherwise
+_NO_MARGIN = {"p", "li"}
+
+# Span styles with a tag of their own
+_SPAN_TAGS = {
+    ("font-weight", "700"): "b",
+    ("font-style", "italic"): "i",
+    ("text-decoration", "underline"): "u",
+}
+
+# Elements that hold blocks rather than text
+_CONTAINERS = {"ul", "ol", "table", "thead", "tbody", "tr", "td", "th"}
+
+# Elements without content or end tag
+_VOID = {"br", "hr", "img", "meta"}
+
+# Start and end tags, for splitting content between elements
+_TAG = re.compile(r"<(/?)([A-Za-z][A-Za-z0-9]*)[^>]*?(/?)>")
+_PARAGRAPH = re.compile(r"<p[\s>]", re.IGNORECASE)
+
+# Marks documents written by QTextEdit.toHtml()
+_QT_DOCUMENT = re.compile(r"\s*<!DOCTYPE HTML PUBLIC|\s*<html><head><meta name=\"qrichtext\"", re.IGNORECASE)
+
+
+def is_qt_html(content):
+    """Return True if content is a full QTextEdit.toHtml() document"""
+    return bool(_QT_DOCUMENT.match(content))
+
+
+def parse_style(style):
+    """Split a style attribute into a list of (property, value) pairs"""
+    properties = []
+    for declaration in style.split(";"):
+        name, colon, value = declaration.partition(":")
+        if colon:
+            properties.append((name.strip().lower(), value.strip()))
+    return properties
+
+
+def format_style(properties):
+    """Join (property, value) pairs into a style attribute"""
+    return " ".join(f"{name}:{value};" for name, value in properties)
+
+
+class _Compactor(HTMLParser):
+    """Rewrites the body of a Qt HTML document in the compact form"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.in_body = False
+        self.hidden = 0
+        self.closers = []  # (tag, end tags to write) for each open element
+
+    def attributes(self, attrs, drop=()):
+        text = ""
+        for name, value in attrs:
+            if name in drop:
+                continue
+            if value is None:
+                text += f" {name}"
+            else:
+                text += f' {name}="{html.escape(value, quote=False).replace(chr(34), "&quot;")}"'
+        return text
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("head", "style", "title", "script") and not self.in_body:
+            self.hidden += 1
+            return
+        if tag in ("html", "meta"):
+            return
+        if tag == "body":
+            self.in_body = True
+            return
+
+        style = dict(attrs).get("style")
+        if tag == "span":
+            self.start_span(attrs, style or "")
+            return
+
+        if style is not None:
+            kept = [(name, value) for name, value in parse_style(style)
+                    if _BLOCK_DEFAULTS.get(name) != value
+                    and not (tag in _NO_MARGIN and name in ("margin-top", "margin-bottom") and value == "0px")]
+            attrs = [(name, value) for name, value in attrs if name != "style"]
+            if kept:
+                attrs.append(("style", format_style(kept)))
+        self.out.append(f"<{tag}{self.attributes(attrs)}>")
+        if tag not in _VOID:
+            self.closers.append((tag, f"</{tag}>"))
+
+    def start_span(self, attrs, style):
+        """Write a span as <b>, <i>, <u> and <font color> where it can be"""
+        opening = ""
+        closing = ""
+        kept = []
+        for name, value in parse_style(style):
+            tag = _SPAN_TAGS.get((name, value))
+            if tag:
+                opening += f"<{tag}>"
+                closing = f"</{tag}>" + closing
+            elif name == "color" and re.fullmatch(r"#[0-9a-fA-F]{6}", value):
+                opening += f'<font color="{value}">'
+                closing = "</font>" + closing
+            else:
+                kept.append((name, value))
+
+        other = [(name, value) for name, value in attrs if name != "style"]
+        if kept or other:
+            if kept:
+                other.append(("style", format_style(kept)))
+            opening = f"<span{self.attributes(other)}>" + opening
+            closing += "</span>"
+        self.out.append(opening)
+        self.closers.append(("span", closing))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID and tag not in ("html", "meta", "body"):
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in ("head", "style", "title", "script") and self.hidden:
+            self.hidden -= 1
+            return
+        if tag in ("html", "body", "meta") or tag in _VOID:
+            return
+        for position in range(len(self.closers) - 1, -1, -1):
+            if self.closers[position][0] == tag:
+                break
+        else:
+            return
+        while len(self.closers) > position:
+            _, closing = self.closers.pop()
+            self.out.append(closing)
+
+    def handle_data(self, data):
+        if self.hidden:
+            return
+        # Qt writes line breaks in the text as <br />; newlines only make the source readable
+        data = data.replace("\n", "")
+        if not data or (not self.closers and not data.strip()):
+            return
+        self.out.append(html.escape(data, quote=False))
+
+    def result(self):
+        self.close()
+        return "".join(self.out)
+
+
+def compact_html(content):
+    """Return the compact form of a QTextEdit.toHtml() document
+
+    Content that is not a Qt document (already compact, or plain HTML from an
+    import) is returned unchanged.
+    """
+    if not is_qt_html(content):
+        return content
+    compactor = _Compactor()
+    compactor.feed(content)
+    return compactor.result()
+
+
+def iter_html_blocks(content, size):
+    """Yield content in pieces of at least size characters, cut between top-level paragraphs
+
+    Each piece is valid HTML on its own and, apart from the first, starts with a
+    plain <p>, so a large note can be loaded into a document piece by piece.
+    Content without such cuts (a full Qt document, one huge list or table)
+    comes out as one piece.
+    """
+    depth = 0
+    start = 0
+    for match in _TAG.finditer(content):
+        closing, tag, empty = match.groups()
+        tag = tag.lower()
+        if tag in _VOID or empty:
+            continue
+        if not closing:
+            depth += 1
+            continue
+        depth = max(depth - 1, 0)
+        if (depth == 0 and tag == "p" and match.end() - start >= size
+                and _PARAGRAPH.match(content, match.end())):
+            yield content[start:match.end()]
+            start = match.end()
+    if start < len(content):
+        yield content[start:]
+
+
+def migrate_notes(notes):
+    """Convert rich text notes stored as full Qt documents; return how many changed"""
+    changed = 0
+    for note in notes:
+        if not note.is_code and is_qt_html(note.content):
+            note.content = compact_html(note.content)
+            changed += 1
+    return changed